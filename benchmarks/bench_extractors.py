@@ -0,0 +1,120 @@
+'''times the extractors and the history functions at several data sizes, and saves
+   the timings so that a later run can be compared against them.
+
+   extractors run on synthetic pages with 10, 100 and 1000 senses, plus every page
+   recorded in a `greb.replay.PageStore` directory when `--pages` is given.
+
+   usage: python -m benchmarks.bench_extractors [--pages DIR] [--save FILE] [--compare FILE]
+'''
+from __future__ import absolute_import, print_function
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+from greb import meaning
+from greb.history import History
+
+from .bench_history import build_store
+from .pages import load_recorded_pages, synthetic_suggestion_page, synthetic_word_page
+
+SIZES = (10, 100, 1000)
+HISTORY_SIZES = (1000, 10000, 100000)
+REPEAT = 20
+WORD_EXTRACTORS = OrderedDict([
+    ('find_meaning', lambda tree: meaning.find_meaning(tree)),
+    ('find_sentences', lambda tree: meaning.find_sentences(tree, 'awesome')),
+    ('find_synonyms', lambda tree: meaning.find_synonyms(tree)),
+    ('find_antonyms', lambda tree: meaning.find_antonyms(tree)),
+])
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'latest.json')
+
+
+def best_of(function, repeat=REPEAT):
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def bench_extractors(results, pages_directory=None):
+    pages = [('synthetic-{}'.format(size), synthetic_word_page(senses=size), 200) for size in SIZES]
+    pages += [('suggestions-{}'.format(size), synthetic_suggestion_page(suggestions=size), 404) for size in SIZES]
+    if pages_directory:
+        pages += load_recorded_pages(pages_directory)
+    for name, html, status_code in pages:
+        tree = meaning.parse_page(html)
+        if status_code == 200:
+            for extractor_name, extractor in WORD_EXTRACTORS.items():
+                results['{} {}'.format(extractor_name, name)] = best_of(lambda: extractor(tree))
+        elif status_code == 404:
+            results['find_suggestions {}'.format(name)] = best_of(lambda: meaning.find_suggestions(tree))
+
+
+def bench_history(results):
+    directory = tempfile.mkdtemp()
+    try:
+        for size in HISTORY_SIZES:
+            path = os.path.join(directory, 'history-{}.sqlite3'.format(size))
+            build_store(path, size)
+            counter = [0]
+
+            def write_new_word():
+                counter[0] += 1
+                meaning.write_meaning_to_file({'word': 'new{}'.format(counter[0]), 'meaning': [': new']},
+                                              file_path=path)
+            results['write_meaning_to_file {}'.format(size)] = best_of(write_new_word)
+            results['find_meaning_from_history {}'.format(size)] = best_of(
+                lambda: meaning.find_meaning_from_history(file_path=path))
+            history = History(path)
+            results['history duplicate check {}'.format(size)] = best_of(lambda: 'word1' in history)
+    finally:
+        shutil.rmtree(directory)
+
+
+def report(results, baseline=None):
+    print('{:<48}  {:>10}  {:>10}  {:>7}'.format('benchmark', 'time', 'baseline', 'ratio'))
+    for name, seconds in results.items():
+        line = '{:<48}  {:>8.3f}ms'.format(name, seconds * 1000)
+        if baseline and name in baseline:
+            line += '  {:>8.3f}ms  {:>6.2f}x'.format(baseline[name] * 1000, seconds / baseline[name])
+        print(line)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='times greb extractors and history functions')
+    parser.add_argument('--pages', help='directory of pages recorded by greb.replay.PageStore')
+    parser.add_argument('--save', default=DEFAULT_RESULTS, help='where to save the timings as json')
+    parser.add_argument('--compare', help='timings saved by an earlier run to compare against, '
+                                          'by default the ones at the --save path')
+    args = parser.parse_args(argv)
+
+    results = OrderedDict()
+    bench_extractors(results, args.pages)
+    bench_history(results)
+
+    baseline = None
+    compare = args.compare or args.save
+    if os.path.isfile(compare):
+        with io.open(compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    report(results, baseline)
+
+    directory = os.path.dirname(args.save)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with io.open(args.save, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'created': time.time(), 'python': sys.version.split()[0], 'results': results},
+                           indent=2))
+    print('saved to {}'.format(args.save))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,117 @@
+'''measures the latency percentiles of fetching a page through `greb.fetch` against a
+   local stand-in for Merriam Webster with a long tail: most answers are quick, some
+   are slow, a few stall and a few fail with a 503.
+
+   each policy runs against a fresh stand-in drawing from the same seed, so their p99 can be compared.
+
+   usage: python -m benchmarks.bench_fetch [requests]
+'''
+from __future__ import absolute_import, print_function
+import random
+import sys
+import threading
+import time
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from greb import fetch
+from greb import meaning
+
+from .pages import synthetic_word_page
+
+REQUESTS = 300
+# (share of answers, seconds before answering, status code)
+LATENCY_PROFILE = (
+    (0.93, (0.005, 0.02), 200),
+    (0.05, (0.15, 0.3), 200),
+    (0.01, (1.5, 1.5), 200),
+    (0.01, (0.005, 0.01), 503),
+)
+POLICIES = (
+    ('single attempt', {'retries': 0}),
+    ('retries', {'retries': 2}),
+    ('retries, hedge at 50ms', {'retries': 2, 'hedge_after': 0.05}),
+)
+
+
+def draw_answer(rng):
+    roll = rng.random()
+    for share, (low, high), status_code in LATENCY_PROFILE:
+        roll -= share
+        if roll <= 0:
+            return (rng.uniform(low, high), status_code)
+    return (LATENCY_PROFILE[0][1][0], 200)
+
+
+class StandIn(ThreadingMixIn, HTTPServer):
+    '''answers every request with a word page after a delay drawn from `LATENCY_PROFILE`'''
+
+    daemon_threads = True
+
+    def __init__(self, seed=0):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StandInHandler)
+        self.page = synthetic_word_page().encode('utf-8')
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def next_answer(self):
+        with self.lock:
+            return draw_answer(self.rng)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        delay, status_code = self.server.next_answer()
+        time.sleep(delay)
+        body = self.server.page if status_code == 200 else b''
+        self.send_response(status_code)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(url, requests, **policy):
+    session = meaning.get_session()
+    latencies = []
+    failures = 0
+    for _ in range(requests):
+        start = time.time()
+        response, status_code = fetch.fetch(session, url, connect_timeout=1, read_timeout=5, **policy)
+        latencies.append(time.time() - start)
+        failures += status_code != 200
+    return (latencies, failures)
+
+
+def main(requests):
+    print('{:>24}  {:>8}  {:>8}  {:>8}  {:>8}  {:>8}'.format('policy', 'p50', 'p95', 'p99', 'max', 'failed'))
+    for label, policy in POLICIES:
+        server = StandIn()
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            url = 'http://127.0.0.1:{}/dictionary/awesome'.format(server.server_address[1])
+            latencies, failures = measure(url, requests, **policy)
+        finally:
+            server.shutdown()
+            server.server_close()
+        print('{:>24}  {:>6.0f}ms  {:>6.0f}ms  {:>6.0f}ms  {:>6.0f}ms  {:>8}'.format(
+            label, percentile(latencies, 0.5) * 1000, percentile(latencies, 0.95) * 1000,
+            percentile(latencies, 0.99) * 1000, max(latencies) * 1000, failures))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else REQUESTS)
@@ -0,0 +1,74 @@
+'''times a random pick from searched history (`greb -d`) at several history sizes.
+
+   compares the old `meanings.json` approach, which loads the whole array to
+   pick one entry, against the indexed history store.
+
+   usage: python -m benchmarks.bench_history [size ...]
+'''
+from __future__ import absolute_import, print_function
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from random import SystemRandom
+
+from greb.history import History, SCHEMA
+
+SIZES = (1000, 100000, 1000000)
+REPEAT = 20
+
+
+def make_entries(size):
+    return (('word{}'.format(i), json.dumps([': meaning of word {}'.format(i)]), 0.0) for i in range(size))
+
+
+def build_legacy(path, size):
+    with open(path, 'w') as f:
+        json.dump([{'word': word, 'meaning': json.loads(meaning)} for word, meaning, _ in make_entries(size)], f)
+
+
+def build_store(path, size):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    with connection:
+        connection.executemany('INSERT INTO history (word, meaning, created) VALUES (?, ?, ?)', make_entries(size))
+    connection.close()
+
+
+def legacy_random_entry(path):
+    with open(path, 'r') as f:
+        all_meanings_searched = json.load(f)
+    return all_meanings_searched[SystemRandom().randrange(len(all_meanings_searched))]
+
+
+def best_of(function, repeat=REPEAT):
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def main(sizes):
+    directory = tempfile.mkdtemp()
+    try:
+        print('{:>10}  {:>14}  {:>14}'.format('entries', 'meanings.json', 'history store'))
+        for size in sizes:
+            legacy_path = os.path.join(directory, 'meanings-{}.json'.format(size))
+            store_path = os.path.join(directory, 'history-{}.sqlite3'.format(size))
+            build_legacy(legacy_path, size)
+            build_store(store_path, size)
+            history = History(store_path)
+            legacy = best_of(lambda: legacy_random_entry(legacy_path), repeat=3)
+            store = best_of(history.random_entry)
+            print('{:>10}  {:>12.3f}ms  {:>12.3f}ms'.format(size, legacy * 1000, store * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main([int(each) for each in sys.argv[1:]] or SIZES)
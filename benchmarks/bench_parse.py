@@ -0,0 +1,49 @@
+'''compares the time and memory of a full parse of a dictionary page against the
+   restricted parse used for the sections asked for.
+
+   usage: python -m benchmarks.bench_parse [saved-page.html ...]
+'''
+from __future__ import absolute_import, print_function
+import sys
+import time
+import tracemalloc
+
+from greb import meaning
+
+from .pages import load_pages
+
+CASES = (
+    ('full', None),
+    ('meaning', ['meaning']),
+    ('meaning, sentence', ['meaning', 'sentence']),
+    ('synonym, antonym', ['synonym', 'antonym']),
+    ('all', ['meaning', 'sentence', 'synonym', 'antonym']),
+)
+REPEAT = 5
+
+
+def measure(html, sections):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.time()
+        meaning.parse_page(html, sections)
+        timings.append(time.time() - start)
+    tracemalloc.start()
+    tree = meaning.parse_page(html, sections)  # noqa
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return (min(timings), peak)
+
+
+def main(paths):
+    for name, html in load_pages(paths):
+        print('{} ({} KB)'.format(name, len(html) // 1024))
+        print('{:>20}  {:>10}  {:>10}'.format('sections', 'time', 'peak mem'))
+        for label, sections in CASES:
+            seconds, peak = measure(html, sections)
+            print('{:>20}  {:>8.1f}ms  {:>8.0f}KB'.format(label, seconds * 1000, peak / 1024.0))
+        print('')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+'''compares the bs4 tree builders greb can parse pages with, on synthetic pages and on every
+   page recorded in a `greb.replay.PageStore` directory when `--pages` is given.
+
+   each page is parsed whole and restricted to the sections of a lookup, and the
+   extractors must give the same output with every builder as with html.parser.
+
+   usage: python -m benchmarks.bench_parsers [--pages DIR]
+'''
+from __future__ import absolute_import, print_function
+import argparse
+import sys
+
+from greb import meaning
+
+from .bench_extractors import best_of
+from .pages import load_recorded_pages, synthetic_suggestion_page, synthetic_word_page
+
+REPEAT = 5
+WORD_SECTIONS = ['meaning', 'sentence', 'synonym', 'antonym']
+HOME_SECTIONS = ['trending words', 'word of the day']
+
+
+def installed_parsers():
+    from bs4.builder import builder_registry
+    return [parser for parser in meaning.PARSERS if builder_registry.lookup(parser)]
+
+
+def extract(html, status_code, sections):
+    tree = meaning.parse_response_text(html, status_code, sections)
+    if status_code == 404:
+        return meaning.find_suggestions(tree)
+    return [meaning.EXTRACTORS[section](tree, 'awesome') for section in sections]
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='compares the html parsers greb can use')
+    parser.add_argument('--pages', help='directory of pages recorded by greb.replay.PageStore')
+    args = parser.parse_args(argv)
+
+    pages = [('synthetic', synthetic_word_page(), 200, WORD_SECTIONS),
+             ('suggestions', synthetic_suggestion_page(), 404, None)]
+    if args.pages:
+        pages += [(url, html, status_code, HOME_SECTIONS if url.rstrip('/') == meaning.HOME_PAGE_URL else
+                   WORD_SECTIONS) for url, html, status_code in load_recorded_pages(args.pages)]
+    parsers = installed_parsers()
+    print('{:<48}  {:<12}  {:>10}  {:>10}  {}'.format('page', 'parser', 'full', 'sections', 'output'))
+    try:
+        for name, html, status_code, sections in pages:
+            meaning.set_parser('html.parser')
+            expected = extract(html, status_code, sections)
+            for each in parsers:
+                meaning.set_parser(each)
+                full = best_of(lambda: meaning.parse_page(html), REPEAT)
+                restricted = best_of(lambda: meaning.parse_response_text(html, status_code, sections), REPEAT)
+                same = 'same' if extract(html, status_code, sections) == expected else 'DIFFERENT'
+                print('{:<48}  {:<12}  {:>8.1f}ms  {:>8.1f}ms  {}'.format(
+                    name[-48:], each, full * 1000, restricted * 1000, same))
+    finally:
+        meaning.set_parser(None)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
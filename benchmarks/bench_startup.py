@@ -0,0 +1,68 @@
+'''times the cold start of `greb -d`, which runs at every terminal launch, and
+   fails when it goes over budget.
+
+   each run is a fresh interpreter started with `-X importtime`, against a
+   history store in a temporary home directory. the slowest imports of the
+   last run are listed to show where the time goes.
+
+   usage: python -m benchmarks.bench_startup [budget-ms]
+'''
+from __future__ import absolute_import, print_function
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from greb.history import History
+
+BUDGET_MS = 150
+RUNS = 10
+SCRIPT = 'import sys; sys.argv = ["greb", "-d"]; from greb.meaning import main; main()'
+
+
+def import_times(stderr):
+    '''returns `(cumulative microseconds, module)` for every top-level import'''
+    times = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        if not module.startswith('   '):
+            times.append((int(cumulative), module.strip()))
+    return times
+
+
+def main(budget_ms):
+    home = tempfile.mkdtemp()
+    try:
+        History(os.path.join(home, '.greb', 'history.sqlite3')).record({'word': 'awesome',
+                                                                        'meaning': [': extremely good']})
+        env = dict(os.environ, HOME=home)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        timings = []
+        for _ in range(RUNS):
+            start = time.time()
+            process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', SCRIPT], cwd=root, env=env,
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            _, stderr = process.communicate()
+            timings.append((time.time() - start) * 1000)
+            if process.returncode:
+                print(stderr.decode('utf-8'))
+                return 1
+    finally:
+        shutil.rmtree(home)
+
+    print('slowest imports:')
+    for cumulative, module in sorted(import_times(stderr.decode('utf-8')), reverse=True)[:8]:
+        print('{:>10.1f}ms  {}'.format(cumulative / 1000.0, module))
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print('greb -d: median {:.1f}ms, best {:.1f}ms over {} runs (budget {}ms)'.format(
+        median, timings[0], RUNS, budget_ms))
+    return 0 if median <= budget_ms else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS))
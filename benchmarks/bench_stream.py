@@ -0,0 +1,107 @@
+'''compares fetching a whole word page and then parsing it with the streamed lookup, which
+   scans the page as it arrives and stops downloading once the sections asked for are complete.
+
+   the page is served from a local server that sends it in chunks at a fixed rate, like a
+   slow connection would. for each set of sections it reports the time until the first
+   section could be shown, the time until the lookup was done and the bytes downloaded.
+
+   usage: python -m benchmarks.bench_stream [kilobytes-per-second]
+'''
+from __future__ import absolute_import, print_function
+import sys
+import threading
+import time
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+from greb import fetch
+from greb import meaning
+from greb.stream import PageStream
+
+from .pages import synthetic_word_page
+
+RATE_KB = 500
+CHUNK_SIZE = 8 * 1024
+CASES = (
+    ('meaning', ['meaning']),
+    ('meaning, synonym', ['meaning', 'synonym']),
+    ('all', ['meaning', 'sentence', 'synonym', 'antonym']),
+)
+
+
+class ThrottledServer(ThreadingMixIn, HTTPServer):
+    '''serves one page, `rate` bytes a second'''
+
+    daemon_threads = True
+
+    def __init__(self, page, rate):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), ThrottledHandler)
+        self.page = page
+        self.rate = rate
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        page = self.server.page
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        try:
+            for start in range(0, len(page), CHUNK_SIZE):
+                self.wfile.write(page[start:start + CHUNK_SIZE])
+                self.wfile.flush()
+                time.sleep(CHUNK_SIZE / float(self.server.rate))
+        except (IOError, OSError):
+            pass  # the client stopped reading
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(url, sections, streamed):
+    session = meaning.get_session()
+    downloaded = [0]
+    first = []
+    start = time.time()
+    stream = PageStream(sections, 'awesome', lambda section, value: first or first.append(time.time() - start))
+
+    def on_chunk(response, chunk):
+        downloaded[0] += len(chunk)
+        return stream(response, chunk) if streamed else False
+
+    response, status_code = fetch.fetch(session, url, retries=0, on_chunk=on_chunk)
+    tree = meaning.parse_page(response.text, sections)
+    for section in sections:
+        meaning.EXTRACTORS[section](tree, 'awesome')
+    done = time.time() - start
+    return (first[0] if first else done, done, downloaded[0])
+
+
+def main(rate_kb):
+    page = synthetic_word_page().encode('utf-8')
+    server = ThrottledServer(page, rate_kb * 1024)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    url = 'http://127.0.0.1:{}/dictionary/awesome'.format(server.server_address[1])
+    print('page of {} KB served at {} KB/s'.format(len(page) // 1024, rate_kb))
+    print('{:>20}  {:>8}  {:>12}  {:>8}  {:>10}'.format('sections', 'lookup', 'first output', 'done', 'downloaded'))
+    try:
+        for label, sections in CASES:
+            for streamed in (False, True):
+                first, done, downloaded = measure(url, sections, streamed)
+                print('{:>20}  {:>8}  {:>10.0f}ms  {:>6.0f}ms  {:>8}KB'.format(
+                    label, 'streamed' if streamed else 'whole', first * 1000, done * 1000, downloaded // 1024))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else RATE_KB)
@@ -0,0 +1,56 @@
+'''pages for the parse and extractor benchmarks'''
+from __future__ import absolute_import
+import io
+
+from greb.replay import PageStore
+
+
+def synthetic_word_page(filler=800, senses=5):
+    '''returns a page shaped like a dictionary page: the few containers greb reads,
+       buried in navigation, ads and other markup it does not'''
+    noise = ''.join('<div class="wrapper"><ul class="nav"><li><a href="/browse/{0}">entry {0}</a></li></ul>'
+                    '<p class="blurb">some text about entry {0} that greb does not need</p>'
+                    '<span class="ad">advert {0}</span></div>'.format(i) for i in range(filler))
+    return ('<html><head><title>awesome</title></head><body>' + noise +
+            '<div class="card-primary-content"><ul>' +
+            ''.join('<li><p class="definition-inner-item">: sense {}</p></li>'.format(i) for i in range(senses)) +
+            '</ul></div>'
+            '<div class="card-primary-content def-text"><ul>' +
+            ''.join('<li>an awesome example {}</li>'.format(i) for i in range(senses)) +
+            '</ul></div>'
+            '<div class="card-box small-box related-box end"><div class="definition-block">'
+            'Synonyms ' + ', '.join('great{}'.format(i) for i in range(senses)) +
+            ' Antonyms ' + ', '.join('awful{}'.format(i) for i in range(senses)) +
+            ' Related Words fine</div></div>' + noise +
+            '</body></html>')
+
+
+def synthetic_suggestion_page(filler=800, suggestions=20):
+    '''returns a page shaped like the 404 page listing spelling suggestions'''
+    noise = ''.join('<div class="wrapper"><p class="blurb">filler {}</p></div>'.format(i) for i in range(filler))
+    return ('<html><body>' + noise + '<p>The word you\'ve entered isn\'t in the dictionary. Click on a '
+            'spelling suggestion below or try again using the search bar above.</p>'
+            '<p class="definition-inner-item with-sense">' +
+            ''.join('<a href="/dictionary/s{0}">s{0}</a>'.format(i) for i in range(suggestions)) +
+            '</p>' + noise + '</body></html>')
+
+
+def load_pages(paths):
+    '''returns `(name, html)` for saved pages, or a synthetic page when no paths are given'''
+    if not paths:
+        return [('synthetic', synthetic_word_page())]
+    pages = []
+    for path in paths:
+        with io.open(path, 'r', encoding='utf-8') as f:
+            pages.append((path, f.read()))
+    return pages
+
+
+def load_recorded_pages(directory):
+    '''returns `(url, html, status_code)` for every snapshot in a `greb.replay.PageStore` directory'''
+    store = PageStore(directory, mode='replay')
+    pages = []
+    for entry in sorted(store.index.values(), key=lambda each: each['url']):
+        response = store.load(entry['url'])
+        pages.append((entry['url'], response.text, response.status_code))
+    return pages
@@ -0,0 +1,138 @@
+'''asyncio api for looking up words without blocking the event loop. needs python 3.7+
+
+    >>> results = await lookup_many(['awesome', 'grok'], meaning=True, synonym=True)
+
+a lookup goes through the same providers as `greb.meaning.find_result`, in the
+loop's default executor or the one given, since parsing, the cache and the history
+store are blocking. `lookup_many` runs its lookups in an executor of its own with
+a thread for each job. only its pages are fetched on the event loop, with aiohttp when it is
+installed, and on the worker thread otherwise.
+'''
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+from . import fetch
+from . import meaning
+from . import opts
+
+
+async def _run(executor, function, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(function, *args, **kwargs))
+
+
+class Page(object):
+    '''a page fetched with aiohttp, with the attributes of a response the lookups read'''
+
+    def __init__(self, status_code, headers, encoding):
+        self.status_code = status_code
+        self.headers = headers
+        self.encoding = encoding
+        self.content = b''
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, 'replace')
+
+
+async def _download(response, on_chunk=None):
+    page = Page(response.status, response.headers, response.charset or 'utf-8')
+    chunks = []
+    async for chunk in response.content.iter_chunked(fetch.CHUNK_SIZE):
+        chunks.append(chunk)
+        if on_chunk is not None and on_chunk(page, chunk):
+            break
+    page.content = b''.join(chunks)
+    return page
+
+
+async def fetch_page(url, session=None, timeout=None, headers=None, on_chunk=None):
+    '''returns `(page, status_code)` for url, the page having the `text`, `headers` and `status_code`
+       of a response. status code is False when the page could not be fetched. deadlines and
+       retries follow `greb.fetch`'''
+    if aiohttp is None or session is None:
+        return await _run(None, meaning.read_page, url, timeout=timeout, headers=headers, on_chunk=on_chunk)
+    loop = asyncio.get_running_loop()
+    timeout = opts.FETCH_READ_TIMEOUT if timeout is None else timeout
+    deadline = loop.time() + opts.FETCH_DEADLINE
+    for attempt in range(opts.FETCH_RETRIES + 1):
+        if attempt:
+            pause = fetch.backoff(attempt - 1)
+            if loop.time() + pause >= deadline:
+                break
+            await asyncio.sleep(pause)
+        deadlines = aiohttp.ClientTimeout(total=min(opts.FETCH_CONNECT_TIMEOUT + 2 * timeout, deadline - loop.time()),
+                                          sock_connect=opts.FETCH_CONNECT_TIMEOUT, sock_read=timeout)
+        try:
+            async with session.get(url, timeout=deadlines, headers=headers) as response:
+                if response.status in fetch.RETRY_STATUS_CODES and attempt < opts.FETCH_RETRIES:
+                    continue
+                return (await _download(response, on_chunk), response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            continue
+    return (None, False)
+
+
+def open_session(jobs=None):
+    '''returns an aiohttp session to share across `jobs` concurrent lookups, or None when aiohttp is not installed'''
+    if aiohttp is None:
+        return None
+    return aiohttp.ClientSession(headers={'User-Agent': meaning.USER_AGENT},
+                                 connector=aiohttp.TCPConnector(limit=jobs or opts.LOOKUP_JOBS))
+
+
+def _fetcher(loop, session):
+    '''returns a fetcher for `greb.meaning.set_fetcher` that fetches pages on the event loop, while the
+       lookup that asked waits on its worker thread'''
+    def fetcher(url, timeout=None, headers=None, on_chunk=None):
+        return asyncio.run_coroutine_threadsafe(
+            fetch_page(url, session=session, timeout=timeout, headers=headers, on_chunk=on_chunk), loop).result()
+    return fetcher
+
+
+def _find_result(fetcher, **kwargs):
+    meaning.set_fetcher(fetcher)
+    try:
+        return meaning.find_result(**kwargs)
+    finally:
+        meaning.set_fetcher(None)
+
+
+async def lookup(word=None, session=None, executor=None, **kwargs):
+    '''async counterpart of `greb.meaning.find_result`. takes the same options and returns the same `Result`.
+       the lookup runs in `executor`, or in the loop's default executor when it is None'''
+    fetcher = None
+    if aiohttp is not None and session is not None:
+        fetcher = _fetcher(asyncio.get_running_loop(), session)
+    return await _run(executor, _find_result, fetcher, word=word, **kwargs)
+
+
+async def lookup_many(words, jobs=None, session=None, **kwargs):
+    '''looks up words concurrently, at most `jobs` at a time, and returns their results in order'''
+    jobs = jobs or opts.LOOKUP_JOBS
+    semaphore = asyncio.Semaphore(jobs)
+    own_session = session is None
+    if own_session:
+        session = open_session(jobs)
+    if session is None or aiohttp is None:
+        # pages are fetched through the shared session of the blocking lookups
+        meaning.set_session_jobs(jobs)
+    # the default executor has fewer threads than a large number of jobs
+    executor = ThreadPoolExecutor(max_workers=jobs)
+
+    async def bounded_lookup(word):
+        async with semaphore:
+            return await lookup(word, session=session, executor=executor, **kwargs)
+
+    try:
+        return await asyncio.gather(*(bounded_lookup(word) for word in words))
+    finally:
+        executor.shutdown(wait=False)
+        if own_session and session is not None:
+            await session.close()
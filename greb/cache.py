@@ -0,0 +1,276 @@
+'''on-disk cache for lookup results, so that repeat lookups skip the network and the parse'''
+from __future__ import absolute_import
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from . import opts
+
+# bumped whenever the shape of stored sections changes, so that older entries are dropped
+SCHEMA_VERSION = 3
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS lookups (
+    key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS lookups_accessed ON lookups (accessed);
+'''
+
+
+def cache_key(url):
+    '''normalizes a url so that scheme, case and trailing slash variants share an entry'''
+    key = url.strip().lower()
+    for scheme in ('https://', 'http://'):
+        if key.startswith(scheme):
+            key = key[len(scheme):]
+            break
+    return key.rstrip('/')
+
+
+def pack(sections):
+    '''serializes sections to the compressed payload stored on disk'''
+    return zlib.compress(json.dumps(sections).encode('utf-8'))
+
+
+def unpack(payload):
+    return json.loads(zlib.decompress(bytes(payload)).decode('utf-8'), object_pairs_hook=OrderedDict)
+
+
+class LookupCache(object):
+    '''sqlite backed cache of extracted sections keyed by normalized url.
+
+       entries older than `ttl` seconds are treated as misses, and once the
+       stored payloads grow beyond `max_size` bytes the least recently
+       accessed entries are evicted. payloads are stored compressed, and an
+       entry fetched with http validators outlives its freshness so that it
+       can be revalidated with a conditional request.'''
+
+    def __init__(self, path=None, ttl=None, max_size=None):
+        self.path = path or opts.CACHE_FILE_PATH
+        self.ttl = opts.CACHE_TTL if ttl is None else ttl
+        self.max_size = opts.CACHE_MAX_SIZE if max_size is None else max_size
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        connection = sqlite3.connect(self.path, timeout=10)
+        if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self._reset(connection)
+        return connection
+
+    def _reset(self, connection):
+        '''drops the entries of an older schema. the check and the reset happen under the write lock,
+           so processes and threads opening a new cache together do not drop each other's table'''
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            if connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                connection.execute('DROP TABLE IF EXISTS lookups')
+                for statement in SCHEMA.split(';'):
+                    if statement.strip():
+                        connection.execute(statement)
+                connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+
+    def get(self, url, ttl=None):
+        '''returns `(status_code, sections)` for an entry younger than `ttl`, or the cache's ttl, else None'''
+        if not os.path.isfile(self.path):
+            return None
+        ttl = self.ttl if ttl is None else ttl
+        key = cache_key(url)
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute('SELECT status, payload, created, etag, last_modified FROM lookups '
+                                         'WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                status_code, payload, created, etag, last_modified = row
+                if now - created > ttl:
+                    if etag is None and last_modified is None:
+                        connection.execute('DELETE FROM lookups WHERE key = ?', (key,))
+                    return None
+                connection.execute('UPDATE lookups SET accessed = ? WHERE key = ?', (now, key))
+        finally:
+            connection.close()
+        return (status_code, unpack(payload))
+
+    def get_stale(self, url):
+        '''returns `(status_code, sections, etag, last_modified)` for an entry stored with validators,
+           fresh or not, else None'''
+        if not os.path.isfile(self.path):
+            return None
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT status, payload, etag, last_modified FROM lookups WHERE key = ? '
+                                     'AND (etag IS NOT NULL OR last_modified IS NOT NULL)',
+                                     (cache_key(url),)).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        status_code, payload, etag, last_modified = row
+        return (status_code, unpack(payload), etag, last_modified)
+
+    def get_many(self, urls):
+        '''yields `(status_code, sections)` for each of urls, fresh or not, or None when there is no entry.
+           the entries are read over a single connection and left as they are'''
+        if not os.path.isfile(self.path):
+            for _ in urls:
+                yield None
+            return
+        connection = self._connect()
+        try:
+            for url in urls:
+                row = connection.execute('SELECT status, payload FROM lookups WHERE key = ?',
+                                         (cache_key(url),)).fetchone()
+                yield None if row is None else (row[0], unpack(row[1]))
+        finally:
+            connection.close()
+
+    def touch(self, url):
+        '''makes the entry for url fresh again, once the server confirmed it has not changed'''
+        if not os.path.isfile(self.path):
+            return
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('UPDATE lookups SET created = ?, accessed = ? WHERE key = ?',
+                                   (now, now, cache_key(url)))
+        finally:
+            connection.close()
+
+    def put(self, url, status_code, sections, etag=None, last_modified=None):
+        '''stores the extracted sections for url, with the validators of the page they came from,
+           and evicts old entries beyond the size cap'''
+        payload = pack(sections)
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                   (cache_key(url), status_code, sqlite3.Binary(payload), len(payload), now, now,
+                                    etag, last_modified))
+                self._evict(connection)
+        finally:
+            connection.close()
+
+    def _evict(self, connection):
+        total = connection.execute('SELECT COALESCE(SUM(size), 0) FROM lookups').fetchone()[0]
+        if total <= self.max_size:
+            return
+        stale_keys = []
+        for key, size in connection.execute('SELECT key, size FROM lookups ORDER BY accessed'):
+            if total <= self.max_size:
+                break
+            stale_keys.append((key,))
+            total -= size
+        connection.executemany('DELETE FROM lookups WHERE key = ?', stale_keys)
+
+    def items(self, status_code=200):
+        '''yields `(key, sections)` for every entry with the given status code, fresh or not'''
+        if not os.path.isfile(self.path):
+            return
+        connection = self._connect()
+        try:
+            for key, payload in connection.execute('SELECT key, payload FROM lookups WHERE status = ?',
+                                                   (status_code,)):
+                yield (key, unpack(payload))
+        finally:
+            connection.close()
+
+    def keys(self, status_code=200):
+        '''yields the key of every entry with the given status code, fresh or not'''
+        if not os.path.isfile(self.path):
+            return
+        connection = self._connect()
+        try:
+            for row in connection.execute('SELECT key FROM lookups WHERE status = ?', (status_code,)):
+                yield row[0]
+        finally:
+            connection.close()
+
+    def clear(self):
+        '''removes every entry from the cache'''
+        if os.path.isfile(self.path):
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute('DELETE FROM lookups')
+            finally:
+                connection.close()
+
+
+class MemoryCache(object):
+    '''in-process lru cache with the interface of `LookupCache`, for long running processes.
+       misses fall through to `backend`, typically the on-disk cache, and writes go to both'''
+
+    def __init__(self, backend=None, ttl=None, max_entries=None):
+        self.backend = backend
+        self.ttl = opts.CACHE_TTL if ttl is None else ttl
+        self.max_entries = opts.MEMORY_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and now - entry[0] <= ttl:
+                self._entries[key] = entry
+                status_code, sections = entry[1], entry[2]
+                # callers merge new sections into what they get back, so hand out a copy
+                return (status_code, OrderedDict(sections))
+        cached = self.backend.get(url, ttl=ttl) if self.backend is not None else None
+        if cached is not None:
+            self._remember(key, now, cached[0], cached[1])
+            cached = (cached[0], OrderedDict(cached[1]))
+        return cached
+
+    def get_stale(self, url):
+        return self.backend.get_stale(url) if self.backend is not None else None
+
+    def touch(self, url):
+        key = cache_key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (time.time(),) + entry[1:]
+        if self.backend is not None:
+            self.backend.touch(url)
+
+    def put(self, url, status_code, sections, etag=None, last_modified=None):
+        self._remember(cache_key(url), time.time(), status_code, OrderedDict(sections))
+        if self.backend is not None:
+            self.backend.put(url, status_code, sections, etag=etag, last_modified=last_modified)
+
+    def keys(self, status_code=200):
+        if self.backend is not None:
+            for key in self.backend.keys(status_code):
+                yield key
+
+    def _remember(self, key, created, status_code, sections):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (created, status_code, sections)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.backend is not None:
+            self.backend.clear()
@@ -0,0 +1,183 @@
+'''shell completion of the words greb knows: searched history, the lookup cache and the offline dictionary.
+
+the index is a text file of unique words, one per line in sorted order, which a
+completion binary searches through a memory map, so that it reads only the
+pages it probes. words recorded after the index was built are appended to a
+journal beside it, read in full by every completion and merged into the index
+once it grows past `opts.COMPLETION_JOURNAL_SIZE`.
+
+completion runs on every keypress, so this module imports nothing of greb but
+`opts` until the index has to be built. `greb-complete` prints the words
+starting with a prefix, and the scripts hooking it into bash and zsh:
+
+    $ greb-complete awe
+    awesome
+    awestruck
+    $ greb-complete --script bash >> ~/.bashrc
+'''
+from __future__ import absolute_import
+import io
+import mmap
+import os
+import sys
+
+from . import opts
+
+JOURNAL_SUFFIX = '.new'
+MERGING_SUFFIX = '.merging'
+SCRIPTS = {
+    'bash': 'complete -o default -C greb-complete greb\n',
+    'zsh': ('_greb_complete() {\n'
+            '    compadd -- ${(f)"$(greb-complete -- "$PREFIX")"}\n'
+            '}\n'
+            'compdef _greb_complete greb\n'),
+}
+
+
+def index_path_for(history_path):
+    '''returns the path of the index of the words in the history at history_path, kept beside it'''
+    return os.path.join(os.path.dirname(history_path), os.path.basename(opts.COMPLETION_FILE_PATH))
+
+
+def normalize_word(word):
+    return word.lower().strip()
+
+
+def write_index(words, path=None):
+    '''writes the sorted unique words to the index at path, aside and renamed into place'''
+    path = path or opts.COMPLETION_FILE_PATH
+    keys = sorted(set(normalize_word(word).encode('utf-8') for word in words) - {b''})
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(b''.join(key + b'\n' for key in keys))
+    getattr(os, 'replace', os.rename)(temp_path, path)
+    return len(keys)
+
+
+def read_lines(path):
+    if not os.path.isfile(path):
+        return []
+    with io.open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def add_word(word, path=None):
+    '''records word in the journal of the index at path, merging the journal in once it is large.
+       nothing is recorded before the index is first built, since building reads every source'''
+    path = path or opts.COMPLETION_FILE_PATH
+    word = normalize_word(word)
+    if not word or '\n' in word or not os.path.isfile(path):
+        return
+    journal_path = path + JOURNAL_SUFFIX
+    with io.open(journal_path, 'a', encoding='utf-8') as f:
+        f.write(word + '\n')
+    if os.path.getsize(journal_path) > opts.COMPLETION_JOURNAL_SIZE:
+        merge_journal(path)
+
+
+def merge_journal(path=None):
+    '''merges the journal into the index. the journal is moved aside first, so that words
+       recorded meanwhile go to a new journal instead of being lost'''
+    path = path or opts.COMPLETION_FILE_PATH
+    merging_path = path + MERGING_SUFFIX
+    try:
+        os.rename(path + JOURNAL_SUFFIX, merging_path)
+    except OSError:
+        return  # another process is merging it
+    write_index(read_lines(path) + read_lines(merging_path), path)
+    os.remove(merging_path)
+
+
+def build_index(path=None, history=None, cache=None, dictionary=None):
+    '''builds the index from searched history, the words cached and the offline dictionary'''
+    from .cache import LookupCache
+    from .history import History
+    from .meaning import cached_words
+    from .offline import OfflineDictionary
+    path = path or opts.COMPLETION_FILE_PATH
+    if os.path.isfile(path + JOURNAL_SUFFIX):
+        os.remove(path + JOURNAL_SUFFIX)
+    history = History(legacy_path=opts.LEGACY_HISTORY_FILE_PATH) if history is None else history
+    cache = LookupCache() if cache is None else cache
+    dictionary = OfflineDictionary() if dictionary is None else dictionary
+    words = list(history.words())
+    if os.path.isfile(cache.path):
+        words.extend(cached_words(cache))
+    words.extend(dictionary.words())
+    return write_index(words, path)
+
+
+def find_first(data, key):
+    '''returns the offset of the first line of the sorted lines in data that is not below key'''
+    low, high = 0, len(data)
+    while low < high:
+        start = data.rfind(b'\n', 0, (low + high) // 2) + 1
+        end = data.find(b'\n', start)
+        end = len(data) if end == -1 else end
+        if data[start:end] < key:
+            low = end + 1
+        else:
+            high = start
+    return low
+
+
+def search_index(path, prefix, limit):
+    '''returns up to limit words of the index at path that start with prefix, in sorted order'''
+    if not os.path.getsize(path):
+        return []
+    key = prefix.encode('utf-8')
+    words = []
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            position = find_first(data, key)
+            while position < len(data) and len(words) < limit:
+                end = data.find(b'\n', position)
+                end = len(data) if end == -1 else end
+                line = data[position:end]
+                if not line.startswith(key):
+                    break
+                words.append(line.decode('utf-8'))
+                position = end + 1
+        finally:
+            data.close()
+    return words
+
+
+def complete(prefix, path=None, limit=None):
+    '''returns the known words starting with prefix, in sorted order, building the index on first use'''
+    path = path or opts.COMPLETION_FILE_PATH
+    limit = opts.COMPLETION_LIMIT if limit is None else limit
+    prefix = normalize_word(prefix)
+    if not os.path.isfile(path):
+        build_index(path)
+    words = set(search_index(path, prefix, limit))
+    words.update(word for word in read_lines(path + JOURNAL_SUFFIX) if word.startswith(prefix))
+    return sorted(words)[:limit]
+
+
+def main(argv=None):
+    '''entry point of `greb-complete`. bash runs it with the command, the word being completed
+       and the word before it as arguments, and COMP_LINE set'''
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--script']:
+        sys.stdout.write(SCRIPTS[argv[1] if len(argv) > 1 else 'bash'])
+        return
+    if argv[:1] == ['--rebuild']:
+        print('Indexed {} words at {}'.format(build_index(), opts.COMPLETION_FILE_PATH))
+        return
+    if 'COMP_LINE' in os.environ:
+        prefix = argv[1] if len(argv) > 1 else ''
+    else:
+        prefix = argv[-1] if argv and argv[-1] != '--' else ''
+    if prefix.startswith('-'):
+        return
+    for word in complete(prefix):
+        print(word)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+'''bulk crawl of a word list into a file of json lines, to build the offline dictionary from ahead of time.
+
+words are looked up on a small pool of threads, which bounds the requests in
+flight to Merriam Webster, and a per-host rate limiter spaces them out. each
+word is appended to the output as soon as it is done, in the format
+`greb --build-offline` reads:
+
+    {"word": "grok", "meaning": [": to understand"], "sentence": [...], ...}
+
+so the output is also the checkpoint. a crawl that is interrupted, or whose
+lookups failed, is resumed by running it again: the words already in the
+output are skipped. words that were not found are kept as `{"word": ...}`
+lines so that they are not asked for again.
+'''
+from __future__ import absolute_import
+import io
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+try:
+    from urllib.parse import urlparse
+except ImportError:  # pragma: no cover
+    from urlparse import urlparse
+
+from . import meaning
+from . import opts
+from .prefetch import RateLimiter
+
+SECTIONS = ('meaning', 'sentence', 'synonym', 'antonym')
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return '?'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return '{}h{:02d}m'.format(hours, minutes) if hours else '{}m{:02d}s'.format(minutes, seconds)
+
+
+class Progress(object):
+    '''counts the words crawled, and works out the throughput and the time left'''
+
+    def __init__(self, total, skipped=0):
+        self.total = total
+        self.skipped = skipped
+        self.found = 0
+        self.not_found = 0
+        self.errors = 0
+        self.start = time.time()
+
+    @property
+    def done(self):
+        return self.found + self.not_found + self.errors
+
+    def rate(self):
+        '''returns the words crawled per second in this run'''
+        elapsed = time.time() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self):
+        '''returns the seconds left at the current rate, or None before any word is done'''
+        rate = self.rate()
+        return (self.total - self.skipped - self.done) / rate if rate else None
+
+    def __str__(self):
+        return '{}/{} words  {:.1f} words/s  {} not found  {} errors  eta {}'.format(
+            self.skipped + self.done, self.total, self.rate(), self.not_found, self.errors,
+            format_duration(self.eta()))
+
+
+def read_checkpoint(path):
+    '''returns the words already crawled into the output at path'''
+    crawled = set()
+    if not os.path.isfile(path):
+        return crawled
+    with io.open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                crawled.add(json.loads(line)['word'])
+            except (ValueError, KeyError):
+                pass  # a line cut short when the crawl was stopped
+    return crawled
+
+
+def open_output(path):
+    '''opens the output for appending, ending a line cut short by an interrupted crawl first'''
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    cut_short = False
+    if os.path.isfile(path) and os.path.getsize(path):
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            cut_short = f.read(1) != b'\n'
+    output = io.open(path, 'a', encoding='utf-8')
+    if cut_short:
+        output.write('\n')
+    return output
+
+
+class Crawler(object):
+    '''looks words up with at most `jobs` requests in flight and `rate` requests a second to each host'''
+
+    def __init__(self, jobs=None, rate=None, sections=SECTIONS):
+        self.jobs = opts.CRAWL_JOBS if jobs is None else jobs
+        self.limiter = RateLimiter(opts.CRAWL_RATE if rate is None else rate)
+        self.sections = list(sections)
+
+    def lookup(self, word):
+        '''returns `(word, status_code, found)`, with status code False when the lookup failed'''
+        url = meaning.word_url(word)
+        self.limiter.wait(urlparse(url).netloc)
+        try:
+            status_code, found = meaning.lookup(url, word, self.sections)
+        except Exception:
+            return (word, False, None)
+        return (word, status_code, found)
+
+    def crawl(self, words, path=None, report=None):
+        '''crawls the words not in the output at path yet, appending each one as it is done.
+           `report(progress)` is called after every word. returns the `Progress` of the crawl'''
+        path = path or opts.CRAWL_FILE_PATH
+        words = list(OrderedDict.fromkeys(words))
+        crawled = read_checkpoint(path)
+        pending = [word for word in words if word not in crawled]
+        progress = Progress(len(words), skipped=len(words) - len(pending))
+        meaning.set_session_jobs(self.jobs)
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(self.jobs)
+        output = open_output(path)
+        try:
+            for word, status_code, found in pool.imap_unordered(self.lookup, pending):
+                if status_code == 200:
+                    progress.found += 1
+                    record = OrderedDict([('word', word)])
+                    record.update(found)
+                elif status_code == 404:
+                    progress.not_found += 1
+                    record = OrderedDict([('word', word)])
+                else:
+                    # left out of the output, so that the next run tries it again
+                    progress.errors += 1
+                    record = None
+                if record is not None:
+                    output.write(json.dumps(record) + '\n')
+                    output.flush()
+                if report is not None:
+                    report(progress)
+        finally:
+            pool.terminate()
+            output.close()
+        return progress
+
+
+class ProgressReport(object):
+    '''prints the progress of a crawl to stderr at most every `interval` seconds'''
+
+    def __init__(self, interval=None, stream=None):
+        self.interval = opts.CRAWL_REPORT_INTERVAL if interval is None else interval
+        self.stream = sys.stderr if stream is None else stream
+        self._last = 0
+
+    def __call__(self, progress, force=False):
+        now = time.time()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.stream.write(str(progress) + '\n')
+            self.stream.flush()
+
+
+def crawl(word_list, path=None, jobs=None, rate=None):
+    '''crawls the words in the file word_list into the output at path, reporting progress to stderr.
+       returns the `Progress` of the crawl'''
+    report = ProgressReport()
+    progress = Crawler(jobs=jobs, rate=rate).crawl(meaning.read_words(word_list), path=path, report=report)
+    report(progress, force=True)
+    return progress
@@ -0,0 +1,130 @@
+'''resident greb daemon listening on a unix domain socket, and the thin client the cli uses to reach it.
+
+the daemon keeps a warm http session, an in-memory cache of looked up pages in
+front of the on-disk one, and the history store open, so a lookup forwarded to
+it skips interpreter startup, the heavy imports and a new tcp/tls handshake.
+
+requests and replies are single lines of json:
+
+    -> {"options": {"word": "awesome", "meaning": true}}
+    <- {"result": {"word": "awesome", "status_code": 200, "meaning": [...]}}
+'''
+from __future__ import absolute_import
+import json
+import os
+import signal
+import socket
+from collections import OrderedDict
+try:
+    import socketserver
+except ImportError:  # pragma: no cover
+    import SocketServer as socketserver
+
+from . import meaning
+from . import opts
+from .cache import LookupCache, MemoryCache
+from .daily import Refresher
+from .prefetch import Prefetcher, related_words
+
+# options a client may forward; anything else, like file paths, stays under the daemon's control
+FORWARDED_OPTIONS = ('word', 'display_terminal', 'no_cache', 'refresh', 'offline', 'prefetch', 'providers',
+                     'fan_out') + tuple(
+    flag for flag, _ in meaning.SECTION_FLAGS)
+
+
+def is_supported():
+    return hasattr(socket, 'AF_UNIX')
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            options = json.loads(line.decode('utf-8')).get('options', {})
+            reply = self.server.answer(options)
+        except Exception as e:
+            reply = {'error': str(e)}
+        self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    '''answers lookups forwarded by `request`, sharing one cache and history across all of them'''
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=None, cache=None, history=None):
+        self.socket_path = socket_path or opts.DAEMON_SOCKET_PATH
+        directory = os.path.dirname(self.socket_path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        socketserver.UnixStreamServer.__init__(self, self.socket_path, DaemonHandler)
+        os.chmod(self.socket_path, 0o600)
+        self.cache = MemoryCache(backend=LookupCache()) if cache is None else cache
+        self.history = meaning.open_history() if history is None else history
+        self.spelling = meaning.open_spelling_index(self.cache, self.history)
+        self.prefetcher = Prefetcher(self.cache)
+        meaning.get_session()
+
+    def answer(self, options):
+        options = dict((key, value) for key, value in options.items() if key in FORWARDED_OPTIONS)
+        if options.get('display_terminal'):
+            return {'history': (self.history.exists() and self.history.random_entry()) or {}}
+        result = meaning.find_result(cache=self.cache, history=self.history, spelling=self.spelling, **options)
+        if options.get('prefetch') and not options.get('no_cache'):
+            self.prefetcher.prefetch(related_words(result), meaning.requested_sections(options))
+        return {'result': result.to_dict()}
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        self.prefetcher.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path=None):
+    '''runs the daemon until interrupted or terminated, keeping the daily file of trending words fresh'''
+    daemon = Daemon(socket_path)
+    refresher = Refresher(daemon.cache)
+    signal.signal(signal.SIGTERM, _interrupt)
+    print('greb daemon listening on {}'.format(daemon.socket_path))
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        refresher.close()
+        daemon.server_close()
+
+
+def request(options, socket_path=None):
+    '''forwards options to a running daemon and returns its reply, or None when no daemon answers'''
+    socket_path = socket_path or opts.DAEMON_SOCKET_PATH
+    if not is_supported() or not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(opts.DAEMON_CONNECT_TIMEOUT)
+        client.connect(socket_path)
+        client.settimeout(opts.DAEMON_REPLY_TIMEOUT)
+        client.sendall(json.dumps({'options': options}).encode('utf-8') + b'\n')
+        reply = b''
+        while not reply.endswith(b'\n'):
+            chunk = client.recv(65536)
+            if not chunk:
+                return None
+            reply += chunk
+    except (socket.error, socket.timeout):
+        return None
+    finally:
+        client.close()
+    reply = json.loads(reply.decode('utf-8'), object_pairs_hook=OrderedDict)
+    return None if 'error' in reply else reply
@@ -0,0 +1,87 @@
+'''trending words and word of the day, fetched once a day into a small file so that `-t` and `-w` read it.
+
+`greb --refresh-daily` fetches the home page once, extracts both sections in a
+single parse and writes them to `opts.DAILY_FILE_PATH`. run it from cron, or
+leave it to a running `greb --daemon`, which refreshes the file every
+`opts.DAILY_REFRESH_INTERVAL` seconds:
+
+    0 6 * * *  greb --refresh-daily
+
+a file older than `opts.DAILY_MAX_AGE` is ignored, and lookups go online again.
+'''
+from __future__ import absolute_import
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from . import opts
+
+SECTIONS = ('trending words', 'word of the day')
+
+
+def read(sections=SECTIONS, path=None, max_age=None):
+    '''returns the requested sections from a fresh daily file, or None'''
+    path = path or opts.DAILY_FILE_PATH
+    max_age = opts.DAILY_MAX_AGE if max_age is None else max_age
+    try:
+        with io.open(path, 'r', encoding='utf-8') as f:
+            daily = json.load(f, object_pairs_hook=OrderedDict)
+    except (IOError, OSError, ValueError):
+        return None
+    if time.time() - daily.get('fetched', 0) > max_age or not all(section in daily for section in sections):
+        return None
+    return OrderedDict((section, daily[section]) for section in sections)
+
+
+def write(found, path=None):
+    '''writes the sections to the daily file, aside and renamed into place'''
+    path = path or opts.DAILY_FILE_PATH
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    daily = OrderedDict([('fetched', time.time())])
+    daily.update((section, [list(each) for each in found[section]]) for section in SECTIONS)
+    temp_path = path + '.tmp'
+    with io.open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(daily, indent=2))
+    getattr(os, 'replace', os.rename)(temp_path, path)
+
+
+def refresh(path=None, cache=None):
+    '''fetches the home page and saves its trending words and word of the day.
+       returns them, or None when the page could not be fetched, leaving the last file in place'''
+    from .meaning import HOME_PAGE_URL, lookup
+    status_code, found = lookup(HOME_PAGE_URL, sections=SECTIONS, cache=cache)
+    if status_code != 200 or not all(found.get(section) for section in SECTIONS):
+        return None
+    write(found, path)
+    return found
+
+
+class Refresher(object):
+    '''keeps the daily file at most `interval` seconds old from a background thread, until closed'''
+
+    def __init__(self, cache=None, interval=None, path=None):
+        self.cache = cache
+        self.interval = opts.DAILY_REFRESH_INTERVAL if interval is None else interval
+        self.path = path
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            if read(path=self.path, max_age=self.interval) is None:
+                try:
+                    refresh(self.path, cache=self.cache)
+                except Exception:
+                    pass  # tried again at the next interval
+            if self._closed.wait(self.interval):
+                return
+
+    def close(self):
+        self._closed.set()
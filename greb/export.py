@@ -0,0 +1,166 @@
+'''export of searched history to other tools: json lines, csv, sqlite and anki.
+
+records stream from the history store through a pipeline of generators to
+the output, so memory stays the same whatever the size of the history:
+
+    history.records  ->  with_cached_sections  ->  filters  ->  writer
+
+history keeps the meaning of each word; the sentences, synonyms and antonyms
+looked up for it are added from the lookup cache when it still holds them.
+'''
+from __future__ import absolute_import
+import csv
+import io
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+try:
+    from html import escape
+except ImportError:  # pragma: no cover
+    from cgi import escape
+
+from . import opts
+from .cache import LookupCache
+from .history import History
+from .meaning import word_url
+
+RELATED_SECTIONS = ('sentence', 'synonym', 'antonym')
+COLUMNS = ('word', 'created', 'meaning') + RELATED_SECTIONS
+DATE_FORMAT = '%Y-%m-%d'
+SQLITE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS words (
+    word TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    meaning TEXT,
+    sentence TEXT,
+    synonym TEXT,
+    antonym TEXT
+);
+'''
+
+
+def parse_date(text):
+    '''returns the unix time of the start of a local `YYYY-MM-DD` date'''
+    try:
+        return time.mktime(time.strptime(text, DATE_FORMAT))
+    except ValueError:
+        raise ValueError('dates must be given as YYYY-MM-DD, not {}'.format(text))
+
+
+def format_time(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(seconds))
+
+
+def with_cached_sections(records, cache=None):
+    '''adds the sentences, synonyms and antonyms the lookup cache holds for each record, however old'''
+    records, words = itertools.tee(records)
+    entries = cache.get_many(word_url(record['word']) for record in words) if cache is not None else None
+    try:
+        for record in records:
+            cached = next(entries) if entries is not None else None
+            found = cached[1] if cached and cached[0] == 200 else {}
+            for section in RELATED_SECTIONS:
+                record[section] = [each for each in found.get(section) or [] if each.strip()]
+            yield record
+    finally:
+        if entries is not None:
+            entries.close()
+
+
+def has_synonyms(record):
+    return bool(record.get('synonym'))
+
+
+def read_records(history, cache=None, since=None, until=None, has_synonyms_only=False):
+    '''yields the records of history searched between the unix times since and until,
+       only those with synonyms when `has_synonyms_only` is set'''
+    records = with_cached_sections(history.records(since=since, until=until), cache=cache)
+    if has_synonyms_only:
+        records = (record for record in records if has_synonyms(record))
+    for record in records:
+        record['created'] = format_time(record['created'])
+        yield record
+
+
+def joined(value):
+    return '; '.join(value) if isinstance(value, list) else value
+
+
+def write_jsonl(records, out):
+    count = 0
+    for count, record in enumerate(records, 1):
+        out.write(json.dumps(OrderedDict((column, record[column]) for column in COLUMNS)) + '\n')
+    return count
+
+
+def write_csv(records, out):
+    writer = csv.writer(out)
+    writer.writerow(COLUMNS)
+    count = 0
+    for count, record in enumerate(records, 1):
+        row = [joined(record[column]) for column in COLUMNS]
+        if sys.version_info[0] == 2:  # pragma: no cover
+            row = [each.encode('utf-8') for each in row]
+        writer.writerow(row)
+    return count
+
+
+def write_anki(records, out):
+    '''writes the tab separated notes anki imports, the word on the front and its meanings on the back'''
+    out.write('#separator:tab\n#html:true\n#columns:Front\tBack\n')
+    count = 0
+    for count, record in enumerate(records, 1):
+        back = '<br>'.join(escape(each) for each in record['meaning'])
+        if record['synonym']:
+            back += '<br><br><i>Synonyms</i> ' + escape(joined(record['synonym']))
+        out.write(escape(record['word']) + '\t' + back.replace('\t', ' ').replace('\n', ' ') + '\n')
+    return count
+
+
+def write_sqlite(records, path):
+    '''adds the records to a `words` table in the sqlite database at path, in one transaction'''
+    connection = sqlite3.connect(path)
+    try:
+        connection.executescript(SQLITE_SCHEMA)
+        with connection:
+            before = connection.total_changes
+            connection.executemany('INSERT OR REPLACE INTO words VALUES (?, ?, ?, ?, ?, ?)', (
+                [record['word'], record['created']] + [json.dumps(record[column]) for column in COLUMNS[2:]]
+                for record in records))
+            return connection.total_changes - before
+    finally:
+        connection.close()
+
+
+FORMATS = OrderedDict([
+    ('jsonl', write_jsonl),
+    ('csv', write_csv),
+    ('sqlite', write_sqlite),
+    ('anki', write_anki),
+])
+
+
+def export(file_format, output=None, history=None, cache=None, since=None, until=None, has_synonyms_only=False):
+    '''writes the records of history in file_format to the file at output, or stdout when there is none,
+       and returns how many were written. since and until are `YYYY-MM-DD` dates, until included'''
+    if file_format not in FORMATS:
+        raise ValueError('format must be one of {}'.format(', '.join(FORMATS)))
+    if file_format == 'sqlite' and output in (None, '-'):
+        raise ValueError('the sqlite format needs an output file')
+    since = parse_date(since) if since else None
+    until = parse_date(until) + 24 * 60 * 60 if until else None
+    if history is None:
+        history = History(legacy_path=opts.LEGACY_HISTORY_FILE_PATH)
+    if cache is None and os.path.isfile(opts.CACHE_FILE_PATH):
+        cache = LookupCache()
+    records = read_records(history, cache=cache, since=since, until=until, has_synonyms_only=has_synonyms_only)
+    if file_format == 'sqlite':
+        return write_sqlite(records, output)
+    if output in (None, '-'):
+        return FORMATS[file_format](records, sys.stdout)
+    with io.open(output, 'w', encoding='utf-8', newline='' if file_format == 'csv' else None) as out:
+        return FORMATS[file_format](records, out)
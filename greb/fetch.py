@@ -0,0 +1,133 @@
+'''the network side of a lookup: deadlines, retries and hedged requests around the pooled session.
+
+    connect deadline   how long to wait for the tcp and tls connection
+    read deadline      how long to wait for the response headers, and then how long
+                       the whole body may take to arrive, so a stalled download
+                       cannot hang the command
+    retries            a connection error, a timeout or a 429/5xx answer is retried
+                       after a backoff with full jitter
+    total deadline     how long a fetch may take, retries included. each attempt is
+                       given what is left of it, and none is made once it has passed
+    hedging            when `hedge_after` seconds pass without an answer, typically
+                       the p95 of upstream latency, a duplicate request is sent and
+                       whichever answers first wins
+'''
+from __future__ import absolute_import
+import random
+import threading
+import time
+try:
+    from queue import Queue, Empty
+except ImportError:  # pragma: no cover
+    from Queue import Queue, Empty
+
+from . import opts
+from . import timings
+
+# answers worth another try, since they are about the server's state rather than the page
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 16 * 1024
+
+
+def backoff(attempt, base=None):
+    '''returns the seconds to wait before retry number `attempt`, drawn with full jitter'''
+    base = opts.FETCH_RETRY_BACKOFF if base is None else base
+    return random.uniform(0, base * 2 ** attempt)
+
+
+def get(session, url, connect_timeout, read_timeout, headers=None, on_chunk=None, deadline=None):
+    '''makes a single request and downloads the body within `read_timeout` seconds, and before the
+       unix time `deadline` when given. `on_chunk(response, chunk)` sees the body as it arrives,
+       and stops the download by returning True'''
+    import requests
+    if deadline is not None:
+        left = max(deadline - time.time(), 0.001)
+        connect_timeout, read_timeout = min(connect_timeout, left), min(read_timeout, left)
+    with timings.span('connect'):
+        response = session.get(url, timeout=(connect_timeout, read_timeout), stream=True, headers=headers)
+    with timings.span('download'):
+        deadline = min(time.time() + read_timeout, deadline or float('inf'))
+        chunks = []
+        try:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                chunks.append(chunk)
+                if time.time() > deadline:
+                    raise requests.exceptions.ReadTimeout('{} took longer than {}s to download'.format(
+                        url, read_timeout))
+                if on_chunk is not None and on_chunk(response, chunk):
+                    break
+        finally:
+            response.close()
+        response._content = b''.join(chunks)
+    return response
+
+
+def hedged_get(session, url, connect_timeout, read_timeout, headers=None, hedge_after=None, deadline=None):
+    '''makes a request, and a duplicate of it when the first has not answered after `hedge_after` seconds.
+       returns the first response to arrive, or raises the error of the last one to fail'''
+    if not hedge_after:
+        return get(session, url, connect_timeout, read_timeout, headers, deadline=deadline)
+    answers = Queue()
+
+    def attempt():
+        try:
+            answers.put((get(session, url, connect_timeout, read_timeout, headers, deadline=deadline), None))
+        except Exception as e:
+            answers.put((None, e))
+
+    def start():
+        thread = threading.Thread(target=attempt)
+        thread.daemon = True
+        thread.start()
+
+    start()
+    try:
+        return _answer(answers.get(timeout=hedge_after))
+    except Empty:
+        start()
+    response, error = answers.get()
+    if error is None:
+        return response
+    # the first to answer failed, so the other one still has a chance
+    return _answer(answers.get())
+
+
+def _answer(answer):
+    response, error = answer
+    if error is not None:
+        raise error
+    return response
+
+
+def fetch(session, url, headers=None, connect_timeout=None, read_timeout=None, retries=None, hedge_after=None,
+          on_chunk=None, total_timeout=None):
+    '''fetches url through session. returns `(response, status_code)`, with status code False
+       when the page could not be fetched after all the retries, or within `total_timeout` seconds.
+       a download followed by `on_chunk` is never hedged, since a duplicate would feed it a second
+       copy of the page'''
+    import requests
+    connect_timeout = opts.FETCH_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+    read_timeout = opts.FETCH_READ_TIMEOUT if read_timeout is None else read_timeout
+    retries = opts.FETCH_RETRIES if retries is None else retries
+    hedge_after = opts.FETCH_HEDGE_AFTER if hedge_after is None else hedge_after
+    total_timeout = opts.FETCH_DEADLINE if total_timeout is None else total_timeout
+    if on_chunk is not None:
+        hedge_after = None
+    deadline = time.time() + total_timeout
+    for attempt in range(retries + 1):
+        if attempt:
+            pause = backoff(attempt - 1)
+            if time.time() + pause >= deadline:
+                break
+            time.sleep(pause)
+        try:
+            if hedge_after:
+                response = hedged_get(session, url, connect_timeout, read_timeout, headers, hedge_after, deadline)
+            else:
+                response = get(session, url, connect_timeout, read_timeout, headers, on_chunk, deadline)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            continue
+        if response.status_code in RETRY_STATUS_CODES and attempt < retries:
+            continue
+        return (response, response.status_code)
+    return (None, False)
@@ -0,0 +1,229 @@
+'''searched history, kept in an append-only sqlite store indexed by word'''
+from __future__ import absolute_import
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from random import SystemRandom
+
+from . import opts
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    word TEXT NOT NULL UNIQUE,
+    meaning TEXT NOT NULL,
+    created REAL NOT NULL
+);
+'''
+INSERT = 'INSERT OR IGNORE INTO history (word, meaning, created) VALUES (?, ?, ?)'
+# user_version of a store that has taken in the entries of the legacy `meanings.json`
+MIGRATED = 1
+
+_random = SystemRandom()
+
+
+def _entry(word, meaning):
+    # word comes before meaning, as it did in the old `meanings.json`
+    return OrderedDict([('word', word), ('meaning', json.loads(meaning))])
+
+
+def _use_wal(connection):
+    # switching a new store to wal needs an exclusive lock that sqlite does not wait for like other locks
+    deadline = time.time() + opts.HISTORY_BUSY_TIMEOUT
+    while True:
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            return
+        except sqlite3.OperationalError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+class History(object):
+    '''searched words with their meanings.
+
+       new words are appended as rows, and the unique index on `word` turns the
+       duplicate check into an index probe instead of a scan over every entry.
+       when `legacy_path` points to an old `meanings.json` array, its entries
+       are migrated in on first use.
+
+       many greb processes can write to the store at once: it is kept in wal
+       mode so readers never block the writer, writers wait their turn for up
+       to `HISTORY_BUSY_TIMEOUT` seconds, and every write is one transaction,
+       so an entry is either stored whole or not at all. inside `batch` the
+       entries recorded are coalesced into a single transaction.'''
+
+    def __init__(self, path=None, legacy_path=None):
+        self.path = path or opts.HISTORY_FILE_PATH
+        self.legacy_path = legacy_path
+        # words this instance has already seen recorded, so a long running process skips the store for them
+        self._recorded = set()
+        # entries waiting for the end of a batch, or None outside of one
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        connection = sqlite3.connect(self.path, timeout=opts.HISTORY_BUSY_TIMEOUT)
+        _use_wal(connection)
+        connection.executescript(SCHEMA)
+        if self.legacy_path and os.path.isfile(self.legacy_path):
+            self._migrate(connection, self.legacy_path)
+        return connection
+
+    def _migrate(self, connection, legacy_path):
+        '''takes in the entries of the legacy file once. the check and the copy happen under the
+           write lock of the store, so processes starting together migrate it exactly once'''
+        if connection.execute('PRAGMA user_version').fetchone()[0] >= MIGRATED:
+            return
+        with open(legacy_path, 'r') as f:
+            legacy_entries = json.load(f)
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            if connection.execute('PRAGMA user_version').fetchone()[0] < MIGRATED:
+                connection.executemany(INSERT, ((each['word'], json.dumps(each['meaning']), time.time())
+                                                for each in legacy_entries))
+                connection.execute('PRAGMA user_version = {}'.format(MIGRATED))
+
+    def exists(self):
+        return os.path.isfile(self.path) or bool(self.legacy_path and os.path.isfile(self.legacy_path))
+
+    def record(self, entry):
+        '''appends `entry` unless its word is already there. returns whether it was added,
+           or inside a batch whether it was queued'''
+        if entry['word'] in self._recorded:
+            return False
+        with self._lock:
+            if self._pending is not None:
+                queued = entry['word'] not in self._pending
+                self._pending[entry['word']] = entry
+                full = len(self._pending) >= opts.HISTORY_BATCH_SIZE
+            else:
+                queued = None
+        if queued is not None:
+            if full:
+                self.flush()
+            return queued
+        return self.record_many([entry]) == 1
+
+    def record_many(self, entries):
+        '''appends the entries whose words are not there yet, in a single transaction.
+           returns how many were added'''
+        entries = [each for each in entries if each['word'] not in self._recorded]
+        if not entries:
+            return 0
+        connection = self._connect()
+        try:
+            with connection:
+                # takes the write lock up front, so a busy store is waited for rather than failing midway
+                connection.execute('BEGIN IMMEDIATE')
+                before = connection.total_changes
+                connection.executemany(INSERT, ((each['word'], json.dumps(each['meaning']), time.time())
+                                                for each in entries))
+                added = connection.total_changes - before
+        finally:
+            connection.close()
+        self._recorded.update(each['word'] for each in entries)
+        return added
+
+    @contextmanager
+    def batch(self):
+        '''coalesces the entries recorded inside the block, from any thread, into one transaction
+           committed when it exits, or every `HISTORY_BATCH_SIZE` entries in a long batch'''
+        with self._lock:
+            outermost = self._pending is None
+            if outermost:
+                self._pending = OrderedDict()
+        try:
+            yield self
+        finally:
+            if outermost:
+                self.flush()
+                with self._lock:
+                    self._pending = None
+
+    def flush(self):
+        '''commits the entries queued in the current batch'''
+        with self._lock:
+            if not self._pending:
+                return
+            entries = list(self._pending.values())
+            self._pending.clear()
+        self.record_many(entries)
+
+    def random_entry(self):
+        '''returns a random entry, or None when the history is empty.
+
+           ids are handed out contiguously since rows are never deleted, so a
+           random id is picked from the range and looked up through the primary
+           key. the cost does not depend on how many entries there are.'''
+        connection = self._connect()
+        try:
+            last_id = connection.execute('SELECT MAX(id) FROM history').fetchone()[0]
+            if last_id is None:
+                return None
+            row = connection.execute('SELECT word, meaning FROM history WHERE id >= ? ORDER BY id LIMIT 1',
+                                     (_random.randint(1, last_id),)).fetchone()
+        finally:
+            connection.close()
+        return _entry(*row) if row else None
+
+    def entries(self):
+        '''yields every entry in the order they were searched, without loading them all at once'''
+        if not self.exists():
+            return
+        connection = self._connect()
+        try:
+            for word, meaning in connection.execute('SELECT word, meaning FROM history ORDER BY id'):
+                yield _entry(word, meaning)
+        finally:
+            connection.close()
+
+    def records(self, since=None, until=None):
+        '''yields the entries searched from `since` up to `until`, both unix times and either open,
+           with the time each was searched as `created`'''
+        if not self.exists():
+            return
+        connection = self._connect()
+        try:
+            rows = connection.execute('SELECT word, meaning, created FROM history WHERE created >= ? AND created < ? '
+                                      'ORDER BY id', (since or 0, float('inf') if until is None else until))
+            for word, meaning, created in rows:
+                entry = _entry(word, meaning)
+                entry['created'] = created
+                yield entry
+        finally:
+            connection.close()
+
+    def words(self):
+        '''yields every word in the order they were searched'''
+        if not self.exists():
+            return
+        connection = self._connect()
+        try:
+            for row in connection.execute('SELECT word FROM history ORDER BY id'):
+                yield row[0]
+        finally:
+            connection.close()
+
+    def __contains__(self, word):
+        connection = self._connect()
+        try:
+            row = connection.execute('SELECT 1 FROM history WHERE word = ?', (word,)).fetchone()
+        finally:
+            connection.close()
+        return row is not None
+
+    def __len__(self):
+        connection = self._connect()
+        try:
+            return connection.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+        finally:
+            connection.close()
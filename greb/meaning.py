@@ -2,7 +2,14 @@ r"""
 
 Greb is a command line tool to find meaning of words.
 
-Usage: greb (<WORD> [-leyn] [-h | --help] | -d | -t | -w)
+Usage:
+    greb (<WORD>... [-leyn] [-h | --help] | -f <FILE> [-leyn] | -d | -t | -w) [options]
+    greb --build-offline [<LIST>...]
+    greb --export=<FORMAT> [--output=<FILE>] [--since=<DATE>] [--until=<DATE>] [--has-synonyms]
+    greb --refresh-daily
+    greb --crawl=<WORDLIST> [--output=<FILE>]
+    greb --daemon
+    greb --serve [--host=<HOST>] [--port=<PORT>]
 
 Options:
     -l --all        Lists everything
@@ -12,32 +19,67 @@ Options:
     -d --rdm        Displays a random from searched history
     -t --trn        Displays trending words from Merriam Webster
     -w --wrd        Displays the word of the day from Merriam Webster
+    -f --file=<FILE>  Looks up every word in FILE, one per line (- for stdin)
+    -j --jobs=<N>   Number of words looked up concurrently [default: 8]
+    --timings       Prints how long each phase of the lookup took
+    --no-cache      Skips the local lookup cache
+    --refresh       Fetches afresh and updates the local lookup cache
+    --offline       Answers from the offline dictionary, going online only for unknown words
+    --build-offline  Builds the offline dictionary from history, the lookup cache and
+                    word lists of json lines such as {"word": "grok", "meaning": [...]}
+    --export=<FORMAT>  Writes searched history as jsonl, csv, sqlite or anki notes
+    --output=<FILE>  File to export or crawl to. Exports go to stdout when left out
+    --crawl=<WORDLIST>  Fetches every word in WORDLIST, one per line, and builds the offline
+                    dictionary from them. An interrupted crawl carries on where it stopped
+    --since=<DATE>  Exports words searched on or after DATE, as YYYY-MM-DD
+    --until=<DATE>  Exports words searched on or before DATE, as YYYY-MM-DD
+    --has-synonyms  Exports only words whose synonyms are in the lookup cache
+    --refresh-daily  Saves the trending words and word of the day for -t and -w to read
+    --daemon        Runs a resident daemon that other greb commands forward lookups to
+    --no-daemon     Looks up in this process even when a daemon is running
+    --prefetch      Fetches the top synonyms and antonyms into the cache in the background
+    --providers=<NAMES>  Dictionaries to ask, in order and comma separated:
+                    merriam-webster, free-dictionary
+    --fan-out       Asks all the dictionaries at once and takes the first complete answer
+    --serve         Serves lookups as json over http for other tools to share
+    --host=<HOST>   Address to serve on [default: 127.0.0.1]
+    --port=<PORT>   Port to serve on [default: 8000]
     --version       Lists version
     -h --help       Lists help
 """
 from __future__ import absolute_import
-import json
-import os
-import requests
-from bs4 import BeautifulSoup
+import re
+import sys
+import threading
+import time
 from collections import OrderedDict
-from colorama import Fore
+from colorama.ansi import Fore  # skips the windows console setup greb never uses
 from docopt import docopt
-from os.path import expanduser
-from random import SystemRandom
 
+from . import completion
 from . import opts
+from . import timings
+from .cache import LookupCache, cache_key
+from .history import History
+from .result import Result, TrendingWord, WordOfTheDay
+
+# requests, bs4 and multiprocessing are imported where they are used, so that
+# `greb -d` at every terminal launch does not pay for loading the network stack
 
 __version__ = '0.0.8'
 
-HOME_PAGE_URL = 'http://www.merriam-webster.com'
-BASE_URL = 'http://www.merriam-webster.com/dictionary/{word}'
-HOME = expanduser('~')
-MEANINGS_FILE_NAME = 'meanings.json'
-FILE_PATH = os.path.join(HOME, MEANINGS_FILE_NAME)
+HOME_PAGE_URL = 'https://www.merriam-webster.com'
+BASE_URL = 'https://www.merriam-webster.com/dictionary/{word}'
+HOME = opts.HOME
+FILE_PATH = opts.HISTORY_FILE_PATH
+LEGACY_FILE_PATH = opts.LEGACY_HISTORY_FILE_PATH
 SUGGESTION_CHECK_STRING = 'spelling suggestion below'
-
-requests.packages.urllib3.disable_warnings()
+SUGGESTION_INFO_MSG = ('It seems that you have not entered a valid word. I know To err is human. '
+                       'Hence the suggestions.')
+NOT_FOUND_INFO_MSG = ("The word you've entered was not found. However I tried finding suggestions "
+                      "thinking that you may have misspelled the word. But I failed miserably :(")
+NO_CONNECTION_INFO_MSG = 'Can you please check whether your Net Connection is working properly'
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.7; rv:11.0) Gecko/20100101 Firefox/11.0'
 
 
 def print_word(word):
@@ -49,7 +91,7 @@ def print_word(word):
 def print_heading(heading, color=None):
     '''prints the heading for a section of output'''
     heading = heading.upper()
-    color = color or eval(opts.COLOR.get(heading, 'Fore.WHITE'))
+    color = color or getattr(Fore, opts.COLOR.get(heading, 'WHITE'))
     print('')
     print(color + heading + Fore.RESET)
     print('')
@@ -77,53 +119,85 @@ def print_result(result):
             print_error_messages('Ohh! There is no value for {}.'.format(key))
 
 
-def write_meaning_to_file(meaning_as_json, file_path=None):
-    '''saves the meaning json to the file `meanings.json` under home directory'''
-
-    meanings_file_path = FILE_PATH
-
+def render_result(result):
+    '''turns a `Result` into the colored text `print_result` shows on a terminal'''
+    rendered = OrderedDict()
+    if result.info:
+        if result.suggestion:
+            rendered['info_msg'] = '\n' + Fore.BLUE + result.info + Fore.RESET
+        else:
+            rendered['info_msg'] = result.info
+    if result.meaning is not None and result.word:
+        rendered['word'] = result.word
+    for section, value in result.sections().items():
+        if section == 'sentence' and result.word:
+            value = [Fore.CYAN + str(i) + '. ' + Fore.RESET +
+                     each.replace(result.word, Fore.CYAN + result.word + Fore.RESET)
+                     for i, each in enumerate(value, 1)]
+        elif section == 'trending words':
+            value = [Fore.RED + str(i) + ' ' + each.word + Fore.RESET + ' --> ' +
+                     Fore.YELLOW + each.description + Fore.RESET for i, each in enumerate(value, 1)]
+        elif section == 'word of the day':
+            value = [Fore.GREEN + each.word.upper() + Fore.RESET + ' : ' + Fore.YELLOW + each.meaning + Fore.RESET
+                     for each in value]
+        rendered[section] = value
+    return rendered
+
+
+class SectionPrinter(object):
+    '''prints the sections of a word as a lookup finds them, keeping the order they are shown in.
+       pass it as `on_section` to a lookup, then to `finish` the result to print what is left'''
+
+    def __init__(self, word, sections):
+        self.word = word
+        self.sections = list(sections)
+        self.found = {}
+        self.printed = 0
+
+    def __call__(self, section, value):
+        self.found[section] = value
+        while self.printed < len(self.sections) and self.sections[self.printed] in self.found:
+            section = self.sections[self.printed]
+            rendered = render_result(Result(self.word, 200, sections={section: self.found[section]}))
+            if self.printed:
+                rendered.pop('word', None)
+            print_result(rendered)
+            sys.stdout.flush()
+            self.printed += 1
+
+    def finish(self, result):
+        rendered = render_result(result)
+        if self.printed and result.status_code == 200:
+            for key in ['word'] + self.sections[:self.printed]:
+                rendered.pop(key, None)
+        print_result(rendered)
+
+
+def open_history(file_path=None):
+    '''returns the history store at `file_path`, defaulting to the one under home directory.
+       the default store picks up the entries of an old `meanings.json` on first use'''
     if file_path:
-        meanings_file_path = file_path
+        return History(file_path)
+    return History(FILE_PATH, legacy_path=LEGACY_FILE_PATH)
 
-    if not os.path.isfile(meanings_file_path):
-        with open(meanings_file_path, 'w') as f:
-            json.dump([], f)
-    # first read the contents of file
-    with open(meanings_file_path, 'r') as f:
-        existing_meanings = json.load(f)
 
-    # before appending check if the word exists or not
-    existing_words = [each['word'] for each in existing_meanings]
-
-    # append the current meaning only if it is not already there
-    if meaning_as_json['word'] not in existing_words:
-        existing_meanings.append(meaning_as_json)
-
-        # write this to the same file
-        with open(meanings_file_path, 'w') as f:
-            json.dump(existing_meanings, f, indent=2)
+def write_meaning_to_file(meaning_as_json, file_path=None, history=None):
+    '''saves the meaning json to the history store under home directory, or to `history` when given'''
+    if history is None:
+        history = open_history(file_path)
+    with timings.span('history write'):
+        if history.record(meaning_as_json):
+            completion.add_word(meaning_as_json['word'], completion.index_path_for(history.path))
 
 
 def find_meaning_from_history(file_path=None):
     '''displays a random meaning from searched history.
-       searched history is saved in a file `meanings.json` under home directory'''
+       searched history is saved in a store under home directory'''
 
     searched_meaning = OrderedDict()
-    random_instance = SystemRandom()
-
-    meanings_file_path = FILE_PATH
-
-    if file_path:
-        meanings_file_path = file_path
-    if os.path.isfile(meanings_file_path):
-        with open(meanings_file_path, 'r') as f:
-            all_meanings_searched = json.load(f)
-
-        r_int = random_instance.randrange(len(all_meanings_searched))
-        # to not break the existing meanings file, need to create a OrderedDict here
-        # so that word comes before meaning key
-        searched_meaning['word'] = all_meanings_searched[r_int]['word']
-        searched_meaning['meaning'] = all_meanings_searched[r_int]['meaning']
+    history = open_history(file_path)
+    if history.exists():
+        searched_meaning = history.random_entry() or searched_meaning
     return searched_meaning
 
 
@@ -133,11 +207,8 @@ def find_sentences(tree, word):
         sentence_html = tree.find('div', {'class': 'card-primary-content def-text'}).find_all('li')
     except (AttributeError, Exception) as e:  # noqa
         sentence_html = []
-    if sentence_html:
-        for i, each in enumerate(sentence_html, 1):
-            each = (Fore.CYAN + str(i) + '. ' + Fore.RESET +
-                    each.get_text().replace(word, Fore.CYAN + word + Fore.RESET))
-            sentences.append(each)
+    for each in sentence_html:
+        sentences.append(each.get_text())
     return sentences
 
 
@@ -174,13 +245,10 @@ def find_trending_words(tree):
     except (AttributeError, Exception) as e:  # noqa
         trending_words_html = []
 
-    if trending_words_html:
-        for i, each in enumerate(trending_words_html, 1):
-            word = each.find('p', {'class': 'title'}).get_text().strip()
-            desc = each.find('p', {'class': 'blurb'}).get_text().strip()
-            each = (Fore.RED + str(i) + ' ' + word + Fore.RESET +
-                    ' --> ' + Fore.YELLOW + desc + Fore.RESET)
-            trending_words.append(each)
+    for each in trending_words_html:
+        word = each.find('p', {'class': 'title'}).get_text().strip()
+        desc = each.find('p', {'class': 'blurb'}).get_text().strip()
+        trending_words.append(TrendingWord(word, desc))
     return trending_words
 
 
@@ -191,8 +259,7 @@ def find_word_of_the_day(tree):
     if word_of_day_html:
         word = word_of_day_html.find('h4', {'class': 'wh-word'}).get_text().strip()
         meaning = word_of_day_html.find('p', {'class': 'wh-def-text'}).get_text().strip()
-        word_of_day_str = (Fore.GREEN + word.upper() + Fore.RESET + ' : ' + Fore.YELLOW + meaning + Fore.RESET)
-        word_of_day.append(word_of_day_str)
+        word_of_day.append(WordOfTheDay(word, meaning))
     return word_of_day
 
 
@@ -203,32 +270,176 @@ def find_suggestions(tree):
     if SUGGESTION_CHECK_STRING in tree.get_text():
         suggestion_html = tree.find_all('p', {'class': 'definition-inner-item with-sense'})
         if suggestion_html:
-            info_msg = ('\n' + Fore.BLUE + 'It seems that you have not entered a valid word. '
-                        'I know' + Fore.RESET + Fore.GREEN + ' To err is human.' +
-                        Fore.RESET + Fore.BLUE + ' Hence the suggestions.' + Fore.RESET)
-            result['info_msg'] = info_msg
+            result['info_msg'] = SUGGESTION_INFO_MSG
             suggestion_str = ', '.join([each.get_text() for each in suggestion_html[0].find_all('a')])
             result['suggestion'] = [suggestion_str]
     else:
-        result['info_msg'] = ("The word you've entered was not found. However I tried finding suggestions "
-                              "thinking that you may have misspelled the word. But I failed miserably :(")
+        result['info_msg'] = NOT_FOUND_INFO_MSG
     return result
 
 
-def read_page(url, timeout=5):
-    try:
-        response = requests.get(url, timeout=timeout, headers={'User-Agent':
-                                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.7; rv:11.0) Gecko/20100101 Firefox/11.0'})
-    except requests.exceptions.ConnectionError as e:  # noqa
-        return(None, False)
+_session = None
+# the concurrent lookups the pool of the session has room for
+_session_jobs = None
+_session_lock = threading.Lock()
+
+
+def _mount_adapter(session, jobs):
+    import requests
+    # room for a hedged duplicate of every concurrent lookup
+    adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=2 * jobs)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def set_session_jobs(jobs):
+    '''sizes the pool of the shared session for `jobs` concurrent lookups, `opts.LOOKUP_JOBS` by default.
+       a session already made is only ever grown'''
+    global _session_jobs
+    with _session_lock:
+        if _session is None:
+            _session_jobs = jobs
+        elif jobs > _session_jobs:
+            _mount_adapter(_session, jobs)
+            _session_jobs = jobs
+
+
+def get_session():
+    '''returns the http session shared by all lookups, so that they reuse pooled keep-alive connections'''
+    global _session, _session_jobs
+    with _session_lock:
+        if _session is None:
+            import requests
+            requests.packages.urllib3.disable_warnings()
+            session = requests.Session()
+            _session_jobs = _session_jobs or opts.LOOKUP_JOBS
+            _mount_adapter(session, _session_jobs)
+            session.headers['User-Agent'] = USER_AGENT
+            _session = session
+    return _session
+
+
+_fetchers = threading.local()
+
 
-    return(response, response.status_code)
+def set_fetcher(fetcher):
+    '''makes the lookups of this thread fetch pages with `fetcher`, which takes the arguments of
+       `fetch_page`, or with the shared session again when fetcher is None'''
+    _fetchers.fetch_page = fetcher
 
 
-def make_parse_tree(url):
-    response, status_code = read_page(url)
-    if status_code in [200, 404]:
-        response = BeautifulSoup(response.text, 'html.parser')
+def get_fetcher():
+    return getattr(_fetchers, 'fetch_page', None)
+
+
+def fetch_page(url, timeout=None, headers=None, on_chunk=None):
+    '''fetches url over the network, sending any extra request headers. `timeout` is the deadline
+       for downloading the page; `greb.fetch` has the retries and hedging around the request'''
+    fetcher = get_fetcher()
+    if fetcher is not None:
+        return fetcher(url, timeout=timeout, headers=headers, on_chunk=on_chunk)
+    from .fetch import fetch
+    return fetch(get_session(), url, headers=headers, read_timeout=timeout, on_chunk=on_chunk)
+
+
+_page_store = None
+_page_store_loaded = False
+
+
+def set_page_store(store):
+    '''puts a `greb.replay.PageStore` under `read_page`, or takes it away when store is None'''
+    global _page_store, _page_store_loaded
+    _page_store = store
+    _page_store_loaded = True
+
+
+def get_page_store():
+    if not _page_store_loaded:
+        from .replay import store_from_environment
+        set_page_store(store_from_environment())
+    return _page_store
+
+
+def read_page(url, timeout=None, headers=None, on_chunk=None):
+    store = get_page_store()
+    if store is None:
+        return fetch_page(url, timeout=timeout, headers=headers, on_chunk=on_chunk)
+    return store.read_page(url, fetch_page, timeout=timeout, headers=headers, on_chunk=on_chunk)
+
+
+def make_strainer(sections):
+    '''returns a strainer that keeps only the containers the extractors for sections look into,
+       or None when some section needs the whole page'''
+    classes = set()
+    for section in sections:
+        if section not in SECTION_CONTAINERS:
+            return None
+        classes.update(SECTION_CONTAINERS[section])
+    if not classes:
+        return None
+    from bs4 import SoupStrainer
+    pattern = r'(^|\s)({})(\s|$)'.format('|'.join(sorted(re.escape(each) for each in classes)))
+    return SoupStrainer(['div', 'p'], attrs={'class': re.compile(pattern)})
+
+
+# tree builders in order of preference, fastest first. the first one installed parses pages
+PARSERS = ('lxml', 'html.parser')
+_parser = None
+
+
+def set_parser(parser):
+    '''makes the bs4 tree builder named parser build every parse tree, or goes back to the default when None'''
+    global _parser
+    _parser = parser
+
+
+def get_parser():
+    '''returns the tree builder pages are parsed with: `opts.HTML_PARSER` when set, else the first of
+       `PARSERS` installed. lxml builds the same trees as html.parser for the containers the
+       extractors read, in a fraction of the time'''
+    global _parser
+    if _parser is None:
+        from bs4.builder import builder_registry
+        _parser = opts.HTML_PARSER or next(parser for parser in PARSERS if builder_registry.lookup(parser))
+    return _parser
+
+
+def parse_page(text, sections=None):
+    '''builds the parse tree for the html of a page. when sections are given,
+       only the parts of the page their extractors need are parsed'''
+    from bs4 import BeautifulSoup
+    strainer = make_strainer(sections) if sections else None
+    parser = get_parser()
+    with timings.span('parse'):
+        return BeautifulSoup(text, parser, parse_only=strainer)
+
+
+def parse_response_text(text, status_code, sections=None):
+    '''parses a fetched page for the requested sections'''
+    if status_code == 404:
+        # suggestions are looked for in the text of the whole page
+        return parse_page(text)
+    return parse_page(text, sections)
+
+
+def make_parse_tree(url, sections=None, parse_not_found=True, stream=None):
+    '''fetches and parses url. the page is scanned as it downloads, by `stream` when given, so that
+       the download stops once the containers of all the sections asked for are complete.
+       with `opts.FETCH_HEDGE_AFTER` set the page is downloaded whole instead, so that a slow request
+       can be hedged. `parse_not_found` may be a callable, asked after a 404 whether to parse the page'''
+    if opts.FETCH_HEDGE_AFTER:
+        # a duplicate request would feed the stream a second copy of the page
+        stream = None
+    elif stream is None and sections:
+        from .stream import PageStream
+        stream = PageStream(sections)
+    response, status_code = read_page(url, on_chunk=stream)
+    if status_code == 404 and callable(parse_not_found):
+        parse_not_found = parse_not_found()
+    if status_code == 200 or (status_code == 404 and parse_not_found):
+        response = parse_response_text(response.text, status_code, sections)
+    elif status_code == 404:
+        response = None
     return (response, status_code)
 
 
@@ -248,57 +459,421 @@ def find_meaning(tree):
     return meanings
 
 
+EXTRACTORS = OrderedDict([
+    ('meaning', lambda tree, word: find_meaning(tree)),
+    ('sentence', find_sentences),
+    ('synonym', lambda tree, word: find_synonyms(tree)),
+    ('antonym', lambda tree, word: find_antonyms(tree)),
+    ('trending words', lambda tree, word: find_trending_words(tree)),
+    ('word of the day', lambda tree, word: find_word_of_the_day(tree)),
+])
+
+# classes of the containers each extractor looks into, so that a lookup can skip parsing the rest
+SECTION_CONTAINERS = {
+    'meaning': ('card-primary-content', 'definition-inner-item'),
+    'sentence': ('card-primary-content',),
+    'synonym': ('related-box',),
+    'antonym': ('related-box',),
+    'trending words': ('wgt-wap-home-trending-items',),
+    'word of the day': ('wgt-wod-home',),
+}
+
+# maps the options accepted by `greb` to the section of the result they ask for
+SECTION_FLAGS = (
+    ('meaning', 'meaning'),
+    ('sentence', 'sentence'),
+    ('synonym', 'synonym'),
+    ('antonym', 'antonym'),
+    ('trending_words', 'trending words'),
+    ('word_of_day', 'word of the day'),
+)
+
+
+def page_ttl(url):
+    '''returns how long the sections of url stay fresh in the cache, or None for the cache's own ttl'''
+    return opts.HOME_PAGE_TTL if url == HOME_PAGE_URL else None
+
+
+def find_cached_sections(url, sections=(), cache=None, refresh=False):
+    '''returns `(hit, cached)`. `hit` is the status code and requested sections when a fresh cache
+       entry holds all of them, `cached` is whatever entry was found so that new sections can be merged in'''
+    cached = None
+    if cache is not None:
+        with timings.span('cache read'):
+            cached = cache.get(url, ttl=page_ttl(url))
+        if cached and not refresh:
+            status_code, found = cached
+            if status_code == 404:
+                return ((status_code, found), cached)
+            if all(section in found for section in sections):
+                return ((status_code, OrderedDict((section, found[section]) for section in sections)), cached)
+    return (None, cached)
+
+
+def extract_sections(tree, status_code, url, word=None, sections=(), cache=None, cached=None, validators=None,
+                     suggestions=None):
+    '''runs the extractors for the requested sections on a parse tree and stores them in the cache,
+       along with the `(etag, last_modified)` validators of the page when given. for a word that
+       was not found, local `suggestions` are used instead of the ones on the page when given'''
+    if status_code == 200:
+        found = OrderedDict()
+        for section in sections:
+            with timings.span('extract ' + section):
+                found[section] = EXTRACTORS[section](tree, word)
+        if cache is not None:
+            stored = cached[1] if cached and cached[0] == 200 else OrderedDict()
+            stored.update(found)
+            etag, last_modified = validators or (None, None)
+            with timings.span('cache write'):
+                cache.put(url, status_code, stored, etag=etag, last_modified=last_modified)
+    elif status_code == 404:
+        found = suggestions
+        if found is None:
+            with timings.span('extract suggestion'):
+                found = find_suggestions(tree)
+        if cache is not None:
+            with timings.span('cache write'):
+                cache.put(url, status_code, found)
+    else:
+        found = OrderedDict()
+    return (status_code, found)
+
+
+def find_offline_sections(word, sections=(), dictionary=None):
+    '''returns `(hit, known)`. `hit` is the status code and requested sections when the offline
+       dictionary knows all of them, `known` is whatever it holds for word'''
+    known = None
+    if dictionary is not None and word:
+        known = dictionary.get(word)
+        if known is not None and all(section in known for section in sections):
+            return ((200, OrderedDict((section, known[section]) for section in sections)), known)
+    return (None, known)
+
+
+def find_stale_sections(url, sections=(), cache=None, refresh=False):
+    '''returns the cache entry of a revalidated page when it holds all the requested sections, else None'''
+    if cache is None or refresh or page_ttl(url) is None:
+        return None
+    stale = cache.get_stale(url)
+    if stale is None or stale[0] != 200 or not all(section in stale[1] for section in sections):
+        return None
+    return stale
+
+
+def response_validators(response):
+    '''returns the `(etag, last_modified)` validators a response came with'''
+    headers = getattr(response, 'headers', None) or {}
+    return (headers.get('ETag'), headers.get('Last-Modified'))
+
+
+def revalidate_page(url, sections=(), cache=None, stale=None):
+    '''fetches a page whose sections are cached with validators. returns `(hit, tree, status_code, validators)`
+       where `hit` is the stale sections when the server answers that the page has not changed'''
+    headers = {}
+    if stale is not None:
+        status_code, found, etag, last_modified = stale
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+    response, status_code = read_page(url, headers=headers or None)
+    if stale is not None and (status_code == 304 or not status_code):
+        if status_code == 304:
+            cache.touch(url)
+        # no connection, so sections that may be out of date beat nothing
+        return ((200, OrderedDict((section, stale[1][section]) for section in sections)), None, status_code, None)
+    tree = None
+    if status_code in (200, 404):
+        tree = parse_response_text(response.text, status_code, sections)
+    return (None, tree, status_code, response_validators(response))
+
+
+def find_local_suggestions(word, spelling=None):
+    '''returns suggestions for word from the words greb already knows, in the shape `find_suggestions`
+       returns them, or None when word is known or nothing close to it is'''
+    if spelling is None or not word:
+        return None
+    with timings.span('spelling'):
+        if word in spelling:
+            return None
+        suggestions = spelling.suggest(word)
+    if not suggestions:
+        return None
+    return OrderedDict([('info_msg', SUGGESTION_INFO_MSG), ('suggestion', [', '.join(suggestions)])])
+
+
+def lookup(url, word=None, sections=(), cache=None, refresh=False, spelling=None, on_section=None):
+    '''returns the status code and the requested sections for url.
+       sections are served from cache when all of them are present in a fresh entry, and fetched otherwise.
+       pages that change often, like the home page, are fetched with a conditional request
+       so that a page that has not changed is neither downloaded nor parsed again.
+       suggestions for a word that was not found are looked for in `spelling`, and its page is
+       only parsed for suggestions when there are none. the words of `spelling` are only read then.
+       `on_section(section, value)` hears of each section of a fetched page as soon as it is found,
+       unless fetches are hedged'''
+    hit, cached = find_cached_sections(url, sections, cache=cache, refresh=refresh)
+    if hit:
+        return hit
+    if cache is not None and page_ttl(url) is not None:
+        hit, tree, status_code, validators = revalidate_page(
+            url, sections, cache, find_stale_sections(url, sections, cache=cache, refresh=refresh))
+        if hit:
+            return hit
+        return extract_sections(tree, status_code, url, word, sections, cache=cache, cached=cached,
+                                validators=validators)
+    suggestions = []
+
+    def parse_not_found():
+        suggestions.append(find_local_suggestions(word, spelling))
+        return suggestions[0] is None
+
+    from .stream import PageStream
+    tree, status_code = make_parse_tree(url, sections, parse_not_found=parse_not_found,
+                                        stream=PageStream(sections, word, on_section))
+    if status_code == 200 and word and spelling is not None:
+        spelling.add(word)
+    return extract_sections(tree, status_code, url, word, sections, cache=cache, cached=cached,
+                            suggestions=suggestions[0] if suggestions else None)
+
+
+def word_url(word=None):
+    '''returns the dictionary url for word, or the home page when there is no word'''
+    if word:
+        return BASE_URL.format(word=word)
+    return HOME_PAGE_URL
+
+
+def open_cache(no_cache=False, cache_path=None, cache=None):
+    '''returns the lookup cache to use, or None when caching is turned off.
+       a long running process passes its own `cache` to share it across lookups'''
+    if no_cache:
+        return None
+    return LookupCache(path=cache_path) if cache is None else cache
+
+
+def open_dictionary(offline=False, offline_path=None):
+    '''returns the offline dictionary to answer from, or None when not in offline mode'''
+    if not offline:
+        return None
+    from .offline import OfflineDictionary
+    return OfflineDictionary(path=offline_path)
+
+
+def cached_words(cache):
+    '''yields the words whose pages are held in the lookup cache'''
+    prefix = cache_key(BASE_URL.format(word='')) + '/'
+    for key in cache.keys():
+        if key.startswith(prefix):
+            yield key[len(prefix):]
+
+
+def open_spelling_index(cache=None, history=None, dictionary=None, spelling=None):
+    '''returns the index of known words to suggest spellings from. its words are read from
+       history, the lookup cache and the offline dictionary the first time it is asked.
+       a long running process passes its own `spelling` to keep it warm across lookups'''
+    if spelling is not None:
+        return spelling
+    from .spelling import SpellingIndex
+    sources = []
+    if history is not None:
+        sources.append(history.words)
+    if cache is not None:
+        sources.append(lambda: cached_words(cache))
+    return SpellingIndex(sources, lexicons=[dictionary] if dictionary is not None else [])
+
+
+def requested_sections(kwargs):
+    '''returns the result sections asked for by the options in kwargs'''
+    return [section for flag, section in SECTION_FLAGS if kwargs.get(flag, False)]
+
+
+def make_result(word, status_code, found, file_path=None, history=None, save_history=True):
+    '''turns the sections found for word into a `Result`, and saves meanings to history'''
+    if status_code == 200:
+        result = Result(word, status_code, sections=found)
+        if result.meaning and save_history:
+            write_meaning_to_file(OrderedDict([('word', word), ('meaning', result.meaning)]),
+                                  file_path=file_path, history=history)
+    elif status_code == 404:
+        sections = {'suggestion': found['suggestion']} if 'suggestion' in found else None
+        result = Result(word, status_code, info=found.get('info_msg'), sections=sections)
+    else:
+        result = Result(word, status_code, info=NO_CONNECTION_INFO_MSG)
+    return result
+
+
+def find_result(**kwargs):
+    '''looks up the sections asked for in kwargs and returns them as a `Result`.
+       the meaning found is saved to history unless `save_history` is False'''
+    word = kwargs.get('word', None)
+    cache = open_cache(kwargs.get('no_cache', False), kwargs.get('cache_path', None), kwargs.get('cache', None))
+    dictionary = open_dictionary(kwargs.get('offline', False), kwargs.get('offline_path', None))
+    history = kwargs.get('history', None)
+    if history is None:
+        history = open_history(kwargs.get('file_path', None))
+    spelling = open_spelling_index(cache, history, dictionary, spelling=kwargs.get('spelling', None))
+    from . import providers
+    names = kwargs.get('providers', None) or opts.PROVIDERS
+    parallel = (kwargs.get('fan_out', False) or opts.PROVIDERS_IN_PARALLEL) and len(names) > 1
+    # sections printed as they stream in could come from a provider that loses the race
+    on_section = None if parallel else kwargs.get('on_section', None)
+    status_code, found = providers.lookup(word, requested_sections(kwargs), providers.open_providers(
+        names, cache=cache, refresh=kwargs.get('refresh', False), dictionary=dictionary, spelling=spelling,
+        on_section=on_section), parallel=parallel, cache=cache)
+    return make_result(word, status_code, found, history=history, save_history=kwargs.get('save_history', True))
+
+
+def define(word, sentence=False, synonym=False, antonym=False, **kwargs):
+    '''looks up word and returns a `Result` holding plain text, without printing anything'''
+    return find_result(word=word, meaning=True, sentence=sentence, synonym=synonym, antonym=antonym, **kwargs)
+
+
 def greb(**kwargs):
     terminal_display = kwargs.get('display_terminal', False)
     if terminal_display:
         result = find_meaning_from_history()
-        print_result(result)
+        with timings.span('render'):
+            print_result(result)
     else:
-        word = kwargs.get('word', None)
-        if word:
-            url = BASE_URL.format(word=word)
-        else:
-            url = HOME_PAGE_URL
-        tree, status_code = make_parse_tree(url)
-        result = OrderedDict()
-        if status_code == requests.codes.ok:
-            if kwargs.get('meaning', False):
-                meanings = find_meaning(tree)
-                result['word'] = word
-                result['meaning'] = meanings
-                file_path = kwargs.get('file_path', None)
-                if meanings:
-                    write_meaning_to_file(result, file_path=file_path)
-            if kwargs.get('sentence', False):
-                sentences = find_sentences(tree, word)
-                result['sentence'] = sentences
-            if kwargs.get('synonym', False):
-                synonyms = find_synonyms(tree)
-                result['synonym'] = synonyms
-            if kwargs.get('antonym', False):
-                antonyms = find_antonyms(tree)
-                result['antonym'] = antonyms
-            if kwargs.get('trending_words', False):
-                trending_words = find_trending_words(tree)
-                result['trending words'] = trending_words
-            if kwargs.get('word_of_day', False):
-                word_of_day = find_word_of_the_day(tree)
-                result['word of the day'] = word_of_day
-        elif status_code == 404:
-            result = find_suggestions(tree)
-        else:
-            result['info_msg'] = 'Can you please check whether your Net Connection is working properly'
-        print_result(result)
+        printer = SectionPrinter(kwargs.get('word', None), requested_sections(kwargs))
+        result = find_result(on_section=printer if kwargs.get('word', None) else None, **kwargs)
+        with timings.span('render'):
+            printer.finish(result)
+        if kwargs.get('prefetch', False):
+            from .prefetch import prefetch_in_background, related_words
+            prefetch_in_background(related_words(result), requested_sections(kwargs),
+                                   open_cache(kwargs.get('no_cache', False), kwargs.get('cache_path', None),
+                                              kwargs.get('cache', None)))
+
+
+def print_timings(collected, elapsed):
+    '''prints the time spent in each phase collected by a `greb.timings.Timings`,
+       and the time that went elsewhere out of `elapsed` seconds'''
+    totals = collected.totals()
+    print_heading('timings')
+    for name, seconds in totals.items():
+        print('{:<24}{:>10.1f}ms'.format(name, seconds * 1000))
+    print('{:<24}{:>10.1f}ms'.format('other', max(elapsed - sum(totals.values()), 0) * 1000))
+    print('{:<24}{:>10.1f}ms'.format('total', elapsed * 1000))
+    print('')
+
+
+def greb_with_daemon(options):
+    '''forwards a lookup to a running daemon and prints its reply. returns False when no daemon answered'''
+    from .daemon import request
+    reply = request(options)
+    if reply is None:
+        return False
+    if 'history' in reply:
+        print_result(OrderedDict(reply['history']))
+    else:
+        print_result(render_result(Result.from_dict(reply['result'])))
+    return True
+
+
+def greb_many(words, jobs=None, **kwargs):
+    '''looks up many words concurrently and prints their results in the order of `words`.
+       the meanings found are saved to history in batches rather than one write per word'''
+    def find_word_result(word):
+        return find_result(word=word, **kwargs)
+
+    if kwargs.get('history', None) is None:
+        kwargs['history'] = open_history(kwargs.get('file_path', None))
+    history = kwargs['history']
+    if kwargs.get('spelling', None) is None:
+        # one index for the whole batch, read at the first misspelling
+        kwargs['spelling'] = open_spelling_index(
+            open_cache(kwargs.get('no_cache', False), kwargs.get('cache_path', None), kwargs.get('cache', None)),
+            history, open_dictionary(kwargs.get('offline', False), kwargs.get('offline_path', None)))
+
+    jobs = jobs or opts.LOOKUP_JOBS
+    set_session_jobs(jobs)
+    from multiprocessing.pool import ThreadPool
+    pool = ThreadPool(jobs)
+    try:
+        with history.batch():
+            for result in pool.imap(find_word_result, words):
+                print_result(render_result(result))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def read_words(file_path):
+    '''yields the words listed in a file, one per line. `-` reads them from stdin'''
+    f = sys.stdin if file_path == '-' else open(file_path, 'r')
+    try:
+        for line in f:
+            word = line.lower().strip()
+            if word:
+                yield word
+    finally:
+        if f is not sys.stdin:
+            f.close()
 
 
 def main():
     '''greb is a command line tool to find meanings'''
 
     arguments = docopt(__doc__, version=__version__)
-    options = {}
+    options = {
+        'no_cache': arguments.get('--no-cache', False),
+        'refresh': arguments.get('--refresh', False),
+        'offline': arguments.get('--offline', False),
+        'prefetch': arguments.get('--prefetch', False),
+        'fan_out': arguments.get('--fan-out', False),
+        }
+    if arguments.get('--providers'):
+        from .providers import check_names
+        options['providers'] = [name.strip() for name in arguments['--providers'].split(',') if name.strip()]
+        try:
+            check_names(options['providers'])
+        except ValueError as e:
+            print_error_messages(str(e))
+            sys.exit(2)
+    jobs = arguments.get('--jobs') or str(opts.LOOKUP_JOBS)
+    if not jobs.isdigit() or int(jobs) < 1:
+        print_error_messages('--jobs takes a number of words from 1 up, not {}'.format(jobs))
+        sys.exit(2)
+    arguments['--jobs'] = int(jobs)
     if not arguments:
         print(__doc__)
+    elif arguments.get('--serve'):
+        from .server import serve
+        serve(arguments['--host'], int(arguments['--port']))
+    elif arguments.get('--daemon'):
+        from .daemon import serve
+        serve()
+    elif arguments.get('--refresh-daily'):
+        from .daily import refresh
+        if refresh(cache=open_cache(options['no_cache'])) is None:
+            print_error_messages(NO_CONNECTION_INFO_MSG)
+            sys.exit(1)
+        print('Saved the trending words and word of the day to {}'.format(opts.DAILY_FILE_PATH))
+    elif arguments.get('--export'):
+        from .export import export
+        try:
+            count = export(arguments['--export'], arguments['--output'], since=arguments['--since'],
+                           until=arguments['--until'], has_synonyms_only=arguments['--has-synonyms'])
+        except ValueError as e:
+            print_error_messages(str(e))
+            sys.exit(2)
+        sys.stderr.write('Exported {} words\n'.format(count))
+    elif arguments.get('--crawl'):
+        from .crawl import crawl
+        path = arguments['--output'] or opts.CRAWL_FILE_PATH
+        try:
+            progress = crawl(arguments['--crawl'], path=path)
+        except KeyboardInterrupt:
+            print('Stopped. Run the same command again to carry on where the crawl stopped.')
+            return
+        if progress.errors:
+            print('{} words could not be fetched. Run the same command again to retry them.'.format(progress.errors))
+        build_offline_dictionary([path])
+    elif arguments.get('--build-offline'):
+        build_offline_dictionary(arguments['<LIST>'])
     else:
+        words = None
         if arguments.get('-d') or arguments.get('--rdm'):
             options.update({
                 'display_terminal': True
@@ -311,9 +886,8 @@ def main():
             options.update({
                 'word_of_day': True
                 })
-        elif arguments['<WORD>']:
+        elif arguments['<WORD>'] or arguments.get('--file'):
             options.update({
-                'word': arguments['<WORD>'].lower().strip(),
                 'meaning': True
                 })
             if (arguments.get('-l') or arguments.get('--all')):
@@ -327,6 +901,35 @@ def main():
                 'synonym': flag_synonym,
                 'antonym': flag_antonym,
                 })
+            if arguments.get('--file'):
+                words = read_words(arguments['--file'])
+            elif len(arguments['<WORD>']) > 1:
+                words = [each.lower().strip() for each in arguments['<WORD>']]
+            else:
+                words = None
+                options['word'] = arguments['<WORD>'][0].lower().strip()
+        if not arguments.get('--timings'):
+            return run(arguments, options, words)
+        with timings.Timings() as collected:
+            start = time.time()
+            run(arguments, options, words)
+        print_timings(collected, time.time() - start)
+
+
+def build_offline_dictionary(word_lists=()):
+    '''builds the offline dictionary and the completion index from every word greb knows'''
+    from .offline import build_dictionary
+    count = build_dictionary(word_lists=word_lists)
+    print('Built the offline dictionary with {} words at {}'.format(count, opts.OFFLINE_FILE_PATH))
+    completion.build_index()
+
+
+def run(arguments, options, words=None):
+    '''runs the lookups asked for on the command line'''
+    if words is not None:
+        return greb_many(words, jobs=arguments['--jobs'], **options)
+    # timings are collected in this process, so they skip the daemon
+    if arguments.get('--no-daemon') or arguments.get('--timings') or not greb_with_daemon(options):
         greb(**options)
 
 
@@ -0,0 +1,179 @@
+'''offline dictionary: a single file of word records behind a sorted, memory-mapped index.
+
+layout of the file, all integers little endian:
+
+    header   magic (8 bytes) | number of words (uint32) | offset of the index (uint64)
+    records  key length (uint16) | key | payload length (uint32) | json payload, for every word
+    index    offset of each record (uint64), sorted by key
+
+a lookup binary searches the index through the memory map, so it only reads
+the few pages holding the probed offsets and records.
+'''
+from __future__ import absolute_import
+import io
+import json
+import mmap
+import os
+import struct
+from collections import OrderedDict
+
+from . import opts
+from .cache import LookupCache
+from .history import History
+
+MAGIC = b'GREBDIC1'
+HEADER = struct.Struct('<8sIQ')
+KEY_LENGTH = struct.Struct('<H')
+PAYLOAD_LENGTH = struct.Struct('<I')
+OFFSET = struct.Struct('<Q')
+DICTIONARY_PATH = '/dictionary/'
+
+
+def normalize_word(word):
+    return word.lower().strip()
+
+
+def write_dictionary(entries, path):
+    '''writes `{word: sections}` entries to an offline dictionary file at path.
+       the file is written aside and renamed into place, so readers never see it half written'''
+    keys = sorted((normalize_word(word).encode('utf-8'), sections)
+                  for word, sections in entries.items() if sections)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+        offsets = []
+        for key, sections in keys:
+            payload = json.dumps(sections).encode('utf-8')
+            offsets.append(f.tell())
+            f.write(KEY_LENGTH.pack(len(key)) + key + PAYLOAD_LENGTH.pack(len(payload)) + payload)
+        index_offset = f.tell()
+        for offset in offsets:
+            f.write(OFFSET.pack(offset))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(offsets), index_offset))
+    getattr(os, 'replace', os.rename)(temp_path, path)
+    return len(offsets)
+
+
+class OfflineDictionary(object):
+    '''read side of an offline dictionary file'''
+
+    def __init__(self, path=None):
+        self.path = path or opts.OFFLINE_FILE_PATH
+        self._file = None
+        self._map = None
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def _open(self):
+        if self._map is None:
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count, self.index_offset = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                self.close()
+                raise ValueError('{} is not an offline dictionary'.format(self.path))
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    def _record(self, i):
+        data = self._map
+        offset = OFFSET.unpack_from(data, self.index_offset + i * OFFSET.size)[0]
+        key_length = KEY_LENGTH.unpack_from(data, offset)[0]
+        key_start = offset + KEY_LENGTH.size
+        return (data[key_start:key_start + key_length], key_start + key_length)
+
+    def _find(self, word):
+        '''returns the offset of the payload stored for word, or None when it is not in the dictionary'''
+        if not self.exists():
+            return None
+        self._open()
+        key = normalize_word(word).encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count:
+            return None
+        found_key, payload_offset = self._record(low)
+        return payload_offset if found_key == key else None
+
+    def get(self, word):
+        '''returns the sections stored for word, or None when it is not in the dictionary'''
+        payload_offset = self._find(word)
+        if payload_offset is None:
+            return None
+        data = self._map
+        payload_length = PAYLOAD_LENGTH.unpack_from(data, payload_offset)[0]
+        payload_start = payload_offset + PAYLOAD_LENGTH.size
+        return json.loads(data[payload_start:payload_start + payload_length].decode('utf-8'),
+                          object_pairs_hook=OrderedDict)
+
+    def __contains__(self, word):
+        return self._find(word) is not None
+
+    def __len__(self):
+        if not self.exists():
+            return 0
+        self._open()
+        return self.count
+
+    def words(self):
+        '''yields every word in the dictionary, in sorted order'''
+        if self.exists():
+            self._open()
+            for i in range(self.count):
+                yield self._record(i)[0].decode('utf-8')
+
+
+def read_word_list(file_path):
+    '''yields `(word, sections)` from a file of json lines, each an object with a `word` key
+       and the sections known for it, e.g. `{"word": "grok", "meaning": [": to understand"]}`'''
+    with io.open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line, object_pairs_hook=OrderedDict)
+                word = record.pop('word')
+                yield (word, record)
+
+
+def read_cache(cache):
+    '''yields `(word, sections)` for every word page held in the lookup cache'''
+    for key, sections in cache.items():
+        if DICTIONARY_PATH in key:
+            yield (key.split(DICTIONARY_PATH, 1)[1], sections)
+
+
+def read_history(history):
+    '''yields `(word, sections)` for every word in searched history'''
+    for entry in history.entries():
+        yield (entry['word'], OrderedDict([('meaning', entry['meaning'])]))
+
+
+def build_dictionary(path=None, word_lists=(), cache=None, history=None):
+    '''builds the offline dictionary from word lists, searched history and the lookup cache.
+       when a word comes from several sources their sections are merged, later sources winning'''
+    entries = {}
+    sources = [read_word_list(each) for each in word_lists]
+    if history is None:
+        history = History(legacy_path=opts.LEGACY_HISTORY_FILE_PATH)
+    sources.append(read_history(history))
+    sources.append(read_cache(LookupCache() if cache is None else cache))
+    for source in sources:
+        for word, sections in source:
+            entries.setdefault(normalize_word(word), OrderedDict()).update(
+                (section, value) for section, value in sections.items() if value)
+    path = path or opts.OFFLINE_FILE_PATH
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    return write_dictionary(entries, path)
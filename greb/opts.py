@@ -1,9 +1,83 @@
+import os
+
 COLOR = {
-    'ANTONYM': 'Fore.RED',
-    'MEANING': 'Fore.YELLOW',
-    'SENTENCE': 'Fore.GREEN',
-    'SUGGESTION': 'Fore.YELLOW',
-    'SYNONYM': 'Fore.BLUE',
-    'TRENDING WORDS': 'Fore.BLUE',
-    'WORD OF THE DAY': 'Fore.BLUE',
+    'ANTONYM': 'RED',
+    'MEANING': 'YELLOW',
+    'SENTENCE': 'GREEN',
+    'SUGGESTION': 'YELLOW',
+    'SYNONYM': 'BLUE',
+    'TIMINGS': 'MAGENTA',
+    'TRENDING WORDS': 'BLUE',
+    'WORD OF THE DAY': 'BLUE',
 }
+
+HOME = os.path.expanduser('~')
+GREB_DIR = os.path.join(HOME, '.greb')
+
+# lookup cache
+CACHE_FILE_PATH = os.path.join(GREB_DIR, 'cache.sqlite3')
+CACHE_TTL = 7 * 24 * 60 * 60  # seconds
+CACHE_MAX_SIZE = 32 * 1024 * 1024  # bytes
+MEMORY_CACHE_MAX_ENTRIES = 1000
+# trending words and word of the day change a few times a day at most
+HOME_PAGE_TTL = 60 * 60  # seconds
+
+# searched history
+HISTORY_FILE_PATH = os.path.join(GREB_DIR, 'history.sqlite3')
+LEGACY_HISTORY_FILE_PATH = os.path.join(HOME, 'meanings.json')
+HISTORY_BUSY_TIMEOUT = 30  # seconds a write waits for other processes writing to the store
+HISTORY_BATCH_SIZE = 500  # entries a batch run commits at once
+
+# spelling suggestions: known words are indexed with up to this many letters deleted,
+# which finds every word a single typo away
+SPELLING_MAX_DELETES = 1
+SPELLING_SUGGESTIONS = 5
+
+# prefetch of the synonyms and antonyms of a lookup
+PREFETCH_WORDS = 3
+PREFETCH_JOBS = 2
+PREFETCH_RATE = 2  # requests per second to each host
+
+# fetching pages
+FETCH_CONNECT_TIMEOUT = 3.05  # seconds for the tcp and tls connection
+FETCH_READ_TIMEOUT = 5  # seconds for the response headers, and again for the whole body
+FETCH_RETRIES = 2
+FETCH_DEADLINE = 10  # seconds for a fetch, retries and backoff included
+FETCH_RETRY_BACKOFF = 0.25  # seconds, doubled on every retry and jittered
+FETCH_HEDGE_AFTER = None  # seconds without an answer before a duplicate request is sent, off when None
+
+# dictionaries asked for a word, in priority order, after the cache and the offline dictionary.
+# in parallel they are all asked at once and the first complete answer wins
+PROVIDERS = ('merriam-webster',)
+PROVIDERS_IN_PARALLEL = False
+
+# trending words and word of the day, refreshed once a day
+DAILY_FILE_PATH = os.path.join(GREB_DIR, 'daily.json')
+DAILY_MAX_AGE = 24 * 60 * 60  # seconds after which the file is ignored
+DAILY_REFRESH_INTERVAL = 6 * 60 * 60  # seconds between refreshes in the daemon
+
+# bs4 tree builder pages are parsed with, such as 'lxml' or 'html.parser'. None picks the fastest installed
+HTML_PARSER = None
+
+# batch lookups
+LOOKUP_JOBS = 8
+
+# shell completion: a sorted index of known words, and a journal of the words recorded since,
+# merged into the index once it grows past this many bytes
+COMPLETION_FILE_PATH = os.path.join(GREB_DIR, 'words.txt')
+COMPLETION_JOURNAL_SIZE = 64 * 1024
+COMPLETION_LIMIT = 100
+
+# bulk crawl of a word list, appended to a file of json lines that is also its checkpoint
+CRAWL_FILE_PATH = os.path.join(GREB_DIR, 'crawl.jsonl')
+CRAWL_JOBS = 4  # requests in flight to the host at once
+CRAWL_RATE = 4  # requests per second to the host
+CRAWL_REPORT_INTERVAL = 5  # seconds between progress lines
+
+# offline dictionary
+OFFLINE_FILE_PATH = os.path.join(GREB_DIR, 'dictionary.bin')
+
+# resident daemon
+DAEMON_SOCKET_PATH = os.path.join(GREB_DIR, 'greb.sock')
+DAEMON_CONNECT_TIMEOUT = 0.05  # seconds
+DAEMON_REPLY_TIMEOUT = 30  # seconds
@@ -0,0 +1,115 @@
+'''background prefetch of the synonyms and antonyms of a lookup, so that the likely next lookup is a cache hit.
+
+words are looked up into the cache on a small pool of threads, and requests
+to each host are spaced out so that prefetching never hammers Merriam Webster.
+'''
+from __future__ import absolute_import
+import os
+import sys
+import threading
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:  # pragma: no cover
+    from urlparse import urlparse
+
+from . import meaning
+from . import opts
+
+
+def related_words(result, limit=None):
+    '''returns up to `limit` distinct synonyms and antonyms of a result, synonyms first'''
+    limit = opts.PREFETCH_WORDS if limit is None else limit
+    words = []
+    for listed in (result.synonym or []) + (result.antonym or []):
+        for word in listed.split(','):
+            word = word.strip().lower()
+            if word and word != result.word and '/' not in word and word not in words:
+                words.append(word)
+    return words[:limit]
+
+
+class RateLimiter(object):
+    '''spaces out requests to each host so that at most `rate` of them start every second'''
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        '''blocks until a request to host may start'''
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next.get(host, 0))
+            self._next[host] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class Prefetcher(object):
+    '''looks words up into `cache` on a bounded pool of background threads'''
+
+    def __init__(self, cache, jobs=None, rate=None):
+        from multiprocessing.pool import ThreadPool
+        self.cache = cache
+        self.limiter = RateLimiter(opts.PREFETCH_RATE if rate is None else rate)
+        self._pool = ThreadPool(opts.PREFETCH_JOBS if jobs is None else jobs)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def prefetch(self, words, sections=('meaning',)):
+        '''queues a lookup of each word whose sections are not fresh in the cache already'''
+        sections = tuple(sections)
+        for word in words:
+            url = meaning.word_url(word)
+            with self._lock:
+                if word in self._pending:
+                    continue
+            if meaning.find_cached_sections(url, sections, cache=self.cache)[0]:
+                continue
+            with self._lock:
+                self._pending.add(word)
+            self._pool.apply_async(self._fetch, (word, url, sections))
+
+    def _fetch(self, word, url, sections):
+        try:
+            self.limiter.wait(urlparse(url).netloc)
+            meaning.lookup(url, word, sections, cache=self.cache)
+        finally:
+            with self._lock:
+                self._pending.discard(word)
+
+    def close(self):
+        '''waits for the queued lookups to finish'''
+        self._pool.close()
+        self._pool.join()
+
+
+def prefetch_in_background(words, sections, cache):
+    '''prefetches words once a command has printed its answer. where processes can fork,
+       a detached child does the work so that the shell prompt comes back at once'''
+    if not words or cache is None:
+        return
+    if hasattr(os, 'fork'):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        if os.fork() != 0:
+            return
+        try:
+            os.setsid()
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+            _prefetch(words, sections, cache)
+        finally:
+            os._exit(0)
+    _prefetch(words, sections, cache)
+
+
+def _prefetch(words, sections, cache):
+    prefetcher = Prefetcher(cache)
+    try:
+        prefetcher.prefetch(words, sections)
+    finally:
+        prefetcher.close()
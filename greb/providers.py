@@ -0,0 +1,277 @@
+'''dictionary backends, each answering lookups from one source, and the engine that asks them.
+
+a provider finds the sections of a word in its source. the local ones, the
+lookup cache and the offline dictionary, are asked first and in order. the
+remote ones are then asked in priority order, or all at once with `parallel`,
+in which case the first complete answer wins and a slow or unreachable source
+no longer sets the latency of a lookup:
+
+    >>> providers = open_providers(['merriam-webster', 'free-dictionary'], cache=cache)
+    >>> lookup('awesome', ['meaning', 'synonym'], providers, parallel=True)
+    (200, OrderedDict([('meaning', [...]), ('synonym', [...])]))
+
+the remote providers greb asks by default are named in `opts.PROVIDERS`.
+'''
+from __future__ import absolute_import
+import copy
+import json
+import threading
+from collections import OrderedDict
+try:
+    from queue import Queue
+except ImportError:  # pragma: no cover
+    from Queue import Queue
+
+from . import daily
+from . import meaning
+from . import opts
+from . import timings
+
+WORD_SECTIONS = ('meaning', 'sentence', 'synonym', 'antonym')
+
+
+class Provider(object):
+    '''a source of the sections of words. subclasses name the sections they can answer and implement `lookup`'''
+
+    name = None
+    sections = tuple(meaning.EXTRACTORS)
+    remote = True
+
+    def supports(self, sections):
+        return all(section in self.sections for section in sections)
+
+    def lookup(self, word, sections):
+        '''returns `(status_code, found)` for the sections of word, with status code False when the
+           source could not be reached. a local provider returns None when it has no answer'''
+        raise NotImplementedError
+
+    def fallback(self, word, sections):
+        '''returns a partial answer to use when no provider has a complete one, or None'''
+        return None
+
+    def without_cache(self):
+        '''returns a copy of the provider that leaves the cache alone'''
+        provider = copy.copy(self)
+        provider.cache = None
+        return provider
+
+    def __repr__(self):
+        return '{}()'.format(type(self).__name__)
+
+
+class CacheProvider(Provider):
+    '''answers from a fresh lookup cache entry holding every section asked for'''
+
+    name = 'cache'
+    remote = False
+
+    def __init__(self, cache, refresh=False):
+        self.cache = cache
+        self.refresh = refresh
+
+    def lookup(self, word, sections):
+        hit, cached = meaning.find_cached_sections(meaning.word_url(word), sections, cache=self.cache,
+                                                   refresh=self.refresh)
+        return hit
+
+
+class OfflineProvider(Provider):
+    '''answers from the offline dictionary when it knows every section asked for'''
+
+    name = 'offline'
+    remote = False
+
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+
+    def lookup(self, word, sections):
+        hit, known = meaning.find_offline_sections(word, sections, dictionary=self.dictionary)
+        return hit
+
+    def fallback(self, word, sections):
+        hit, known = meaning.find_offline_sections(word, sections, dictionary=self.dictionary)
+        if known is None:
+            return None
+        # no connection, so the part of the sections the offline dictionary knows beats nothing
+        return (200, OrderedDict((section, known.get(section)) for section in sections))
+
+
+class DailyProvider(Provider):
+    '''answers trending words and the word of the day from the file `greb --refresh-daily` keeps'''
+
+    name = 'daily'
+    sections = daily.SECTIONS
+    remote = False
+
+    def __init__(self, path=None):
+        self.path = path
+
+    def lookup(self, word, sections):
+        found = daily.read(sections, path=self.path)
+        return None if found is None else (200, found)
+
+
+class MerriamWebster(Provider):
+    '''scrapes merriam-webster.com, the only source of trending words and the word of the day.
+       it keeps what it finds in the cache itself, revalidates the home page and answers
+       misspellings from the `spelling` index'''
+
+    name = 'merriam-webster'
+
+    def __init__(self, cache=None, refresh=False, spelling=None, on_section=None, **options):
+        self.cache = cache
+        self.refresh = refresh
+        self.spelling = spelling
+        self.on_section = on_section
+
+    def lookup(self, word, sections):
+        return meaning.lookup(meaning.word_url(word), word, sections, cache=self.cache, refresh=self.refresh,
+                              spelling=self.spelling, on_section=self.on_section)
+
+
+class FreeDictionary(Provider):
+    '''reads the json api of dictionaryapi.dev, which has words but no trending words or word of the day'''
+
+    name = 'free-dictionary'
+    sections = WORD_SECTIONS
+    url = 'https://api.dictionaryapi.dev/api/v2/entries/en/{word}'
+
+    def __init__(self, cache=None, **options):
+        self.cache = cache
+
+    def lookup(self, word, sections):
+        response, status_code = meaning.read_page(self.url.format(word=word))
+        if status_code not in (200, 404):
+            return (False, OrderedDict())
+        found = OrderedDict()
+        if status_code == 200:
+            with timings.span('parse'):
+                try:
+                    found = find_sections(json.loads(response.text), sections)
+                except (ValueError, TypeError, AttributeError):
+                    # not the json of the api, like the page of a captive portal
+                    return (False, OrderedDict())
+        if status_code == 404 or not found.get('meaning', True):
+            return (404, OrderedDict([('info_msg', meaning.NOT_FOUND_INFO_MSG)]))
+        if self.cache is not None:
+            store(self.cache, word, found)
+        return (status_code, found)
+
+
+def store(cache, word, found):
+    '''keeps the sections found for word under its own entry, along with the ones cached already,
+       so that the cache provider answers them next time'''
+    url = meaning.word_url(word)
+    cached = cache.get(url)
+    stored = cached[1] if cached and cached[0] == 200 else OrderedDict()
+    stored.update(found)
+    with timings.span('cache write'):
+        cache.put(url, 200, stored)
+
+
+def find_sections(entries, sections):
+    '''returns the sections of the entries of a word in the json of dictionaryapi.dev,
+       in the shape the merriam webster extractors give them'''
+    senses = [each for entry in entries for each in entry.get('meanings', [])]
+    definitions = [each for sense in senses for each in sense.get('definitions', [])]
+    found = OrderedDict()
+    for section in sections:
+        if section == 'meaning':
+            found[section] = [': ' + each['definition'] for each in definitions if each.get('definition')]
+        elif section == 'sentence':
+            found[section] = [each['example'] for each in definitions if each.get('example')]
+        else:
+            key = section + 's'
+            words = list(OrderedDict.fromkeys(word for each in senses + definitions for word in each.get(key, [])))
+            found[section] = [', '.join(words)] if words else []
+    return found
+
+
+REMOTE_PROVIDERS = OrderedDict((provider.name, provider) for provider in (MerriamWebster, FreeDictionary))
+
+
+def check_names(names):
+    '''raises ValueError for the first of names that is not a remote provider'''
+    for name in names:
+        if name not in REMOTE_PROVIDERS:
+            raise ValueError('unknown provider {}, expected one of {}'.format(name, ', '.join(REMOTE_PROVIDERS)))
+
+
+def open_providers(names=None, cache=None, refresh=False, dictionary=None, spelling=None, on_section=None):
+    '''returns the cache and offline providers, when there is a cache or dictionary, and the daily file
+       unless refreshing, followed by the remote providers named in `names`. remote providers pick
+       what they need of the other arguments'''
+    names = opts.PROVIDERS if names is None else names
+    providers = []
+    if cache is not None:
+        providers.append(CacheProvider(cache, refresh=refresh))
+    if dictionary is not None:
+        providers.append(OfflineProvider(dictionary))
+    if not refresh:
+        providers.append(DailyProvider())
+    check_names(names)
+    for name in names:
+        providers.append(REMOTE_PROVIDERS[name](cache=cache, refresh=refresh, spelling=spelling,
+                                                on_section=on_section))
+    return providers
+
+
+def ask_in_order(providers, word, sections):
+    for provider in providers:
+        yield provider.lookup(word, sections)
+
+
+def ask_in_parallel(providers, word, sections):
+    '''yields the answers of the providers as they come in. the ones still running when the
+       caller stops listening carry on in the background, and their answers are dropped.
+       the providers fetch pages the way the calling thread does'''
+    answers = Queue()
+    fetcher = meaning.get_fetcher()
+
+    def ask(provider):
+        meaning.set_fetcher(fetcher)
+        try:
+            answers.put(provider.lookup(word, sections))
+        except Exception:
+            answers.put((False, OrderedDict()))
+
+    for provider in providers:
+        thread = threading.Thread(target=ask, args=(provider,))
+        thread.daemon = True
+        thread.start()
+    for _ in providers:
+        yield answers.get()
+
+
+def lookup(word, sections, providers, parallel=False, cache=None):
+    '''returns `(status_code, found)` for the sections of word from the first provider with a complete
+       answer. when there is none, a word the remote providers did not find beats what the local ones
+       partly know, which beats no answer at all. the remote providers asked in parallel leave the
+       cache alone, and the answer that wins is kept in `cache` when given'''
+    local = [provider for provider in providers if not provider.remote and provider.supports(sections)]
+    remote = [provider for provider in providers if provider.remote and provider.supports(sections)]
+    for provider in local:
+        answer = provider.lookup(word, sections)
+        if answer is not None:
+            return answer
+    parallel = parallel and len(remote) > 1
+    ask = ask_in_order
+    if parallel:
+        # a provider losing the race must not overwrite the answer that won it in the cache
+        remote = [provider.without_cache() for provider in remote]
+        ask = ask_in_parallel
+    not_found = None
+    for status_code, found in ask(remote, word, sections):
+        if status_code == 200:
+            if parallel and cache is not None and word:
+                store(cache, word, found)
+            return (status_code, found)
+        if status_code == 404 and not_found is None:
+            not_found = (status_code, found)
+    if not_found is not None:
+        return not_found
+    for provider in local:
+        answer = provider.fallback(word, sections)
+        if answer is not None:
+            return answer
+    return (False, OrderedDict())
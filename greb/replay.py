@@ -0,0 +1,108 @@
+'''record and replay of fetched pages, so that tests and benchmarks can run without the network.
+
+a `PageStore` sits under `greb.meaning.read_page`. each page is kept as an html
+snapshot in a directory, with its url and status code in `index.json`:
+
+    replay   serves snapshots only; pages without one are treated as unreachable
+    record   fetches every page live and saves a snapshot of it
+    auto     serves a snapshot when there is one and fetches live otherwise
+
+the store can be installed with `greb.meaning.set_page_store`, or through the
+`GREB_REPLAY_DIR` and `GREB_REPLAY_MODE` environment variables.
+'''
+from __future__ import absolute_import
+import io
+import json
+import os
+import re
+import threading
+
+from .cache import cache_key
+
+MODES = ('replay', 'record', 'auto')
+INDEX_FILE_NAME = 'index.json'
+
+
+class ReplayResponse(object):
+    '''the parts of a `requests` response that greb reads'''
+
+    __slots__ = ('url', 'text', 'status_code')
+
+    def __init__(self, url, text, status_code):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+
+
+def snapshot_name(url):
+    return re.sub(r'[^a-z0-9]+', '_', cache_key(url)).strip('_') + '.html'
+
+
+class PageStore(object):
+    '''directory of html snapshots keyed by normalized url'''
+
+    def __init__(self, directory, mode='auto'):
+        if mode not in MODES:
+            raise ValueError('mode must be one of {}'.format(', '.join(MODES)))
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            path = os.path.join(self.directory, INDEX_FILE_NAME)
+            self._index = {}
+            if os.path.isfile(path):
+                with io.open(path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+        return self._index
+
+    def load(self, url):
+        '''returns the snapshot of url as a response, or None when there is none'''
+        entry = self.index.get(cache_key(url))
+        if entry is None:
+            return None
+        with io.open(os.path.join(self.directory, entry['file']), 'r', encoding='utf-8') as f:
+            return ReplayResponse(entry['url'], f.read(), entry['status_code'])
+
+    def save(self, url, text, status_code):
+        '''saves a snapshot of a fetched page and adds it to the index'''
+        name = snapshot_name(url)
+        with self._lock:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            with io.open(os.path.join(self.directory, name), 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.index[cache_key(url)] = {'url': url, 'file': name, 'status_code': status_code}
+            with io.open(os.path.join(self.directory, INDEX_FILE_NAME), 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.index, indent=2, sort_keys=True))
+
+    def read_page(self, url, fetch, timeout=None, headers=None, on_chunk=None):
+        '''returns `(response, status_code)` like `read_page`, going to `fetch` as the mode allows'''
+        if self.mode != 'record':
+            response = self.load(url)
+            if response is not None:
+                if on_chunk is not None:
+                    on_chunk(response, response.text.encode('utf-8'))
+                return (response, response.status_code)
+            if self.mode == 'replay':
+                return (None, False)
+        options = {'headers': headers} if headers else {}
+        if on_chunk is not None and self.mode != 'record':
+            # a recorded snapshot has to hold the whole page
+            options['on_chunk'] = on_chunk
+        response, status_code = fetch(url, timeout=timeout, **options)
+        if self.mode == 'record' and status_code and status_code != 304:
+            self.save(url, response.text, status_code)
+        return (response, status_code)
+
+
+def store_from_environment(environ=None):
+    '''returns the page store configured through environment variables, or None'''
+    environ = os.environ if environ is None else environ
+    directory = environ.get('GREB_REPLAY_DIR')
+    if not directory:
+        return None
+    return PageStore(directory, mode=environ.get('GREB_REPLAY_MODE', 'auto'))
@@ -0,0 +1,92 @@
+'''plain text results of a lookup, kept apart from how they are shown on a terminal'''
+from __future__ import absolute_import
+from collections import namedtuple, OrderedDict
+
+TrendingWord = namedtuple('TrendingWord', 'word description')
+WordOfTheDay = namedtuple('WordOfTheDay', 'word meaning')
+
+# result sections in the order they are shown, with the attribute holding each
+SECTION_ATTRIBUTES = OrderedDict([
+    ('meaning', 'meaning'),
+    ('sentence', 'sentence'),
+    ('synonym', 'synonym'),
+    ('antonym', 'antonym'),
+    ('suggestion', 'suggestion'),
+    ('trending words', 'trending_words'),
+    ('word of the day', 'word_of_day'),
+])
+
+# sections whose items are records, so they can be rebuilt from json
+SECTION_TYPES = {
+    'trending words': TrendingWord,
+    'word of the day': WordOfTheDay,
+}
+
+
+def make_section(section, value):
+    '''returns the items of a section as a list, rebuilding records that went through json'''
+    item_type = SECTION_TYPES.get(section)
+    if item_type is None:
+        return list(value or [])
+    return [_make_record(item_type, each) for each in value or []]
+
+
+def _make_record(item_type, each):
+    if isinstance(each, item_type):
+        return each
+    if isinstance(each, dict):
+        return item_type(**each)
+    return item_type(*each)
+
+
+class Result(object):
+    '''the outcome of looking up a word or the home page.
+
+       each section holds a list of plain text items, or records for trending
+       words and word of the day. sections that were not asked for are None, and
+       an empty list means a section was asked for but nothing was found.'''
+
+    __slots__ = ('word', 'status_code', 'info') + tuple(SECTION_ATTRIBUTES.values())
+
+    def __init__(self, word=None, status_code=None, info=None, sections=None):
+        self.word = word
+        self.status_code = status_code
+        self.info = info
+        for attribute in SECTION_ATTRIBUTES.values():
+            setattr(self, attribute, None)
+        for section, value in (sections or {}).items():
+            setattr(self, SECTION_ATTRIBUTES[section], make_section(section, value))
+
+    @property
+    def found(self):
+        return self.status_code == 200
+
+    def sections(self):
+        '''returns the sections that were asked for, in the order they are shown'''
+        return OrderedDict((section, getattr(self, attribute)) for section, attribute in SECTION_ATTRIBUTES.items()
+                           if getattr(self, attribute) is not None)
+
+    def to_dict(self):
+        '''returns the result as a dict of plain values, ready to be serialized'''
+        data = OrderedDict([('word', self.word), ('status_code', self.status_code), ('info', self.info)])
+        for section, value in self.sections().items():
+            if section in SECTION_TYPES:
+                value = [each._asdict() for each in value]
+            data[section] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        '''rebuilds a result from the output of `to_dict`'''
+        sections = OrderedDict((section, value) for section, value in data.items() if section in SECTION_ATTRIBUTES)
+        return cls(data.get('word'), data.get('status_code'), info=data.get('info'), sections=sections)
+
+    def __eq__(self, other):
+        return isinstance(other, Result) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Result(word={!r}, status_code={!r}, sections={!r})'.format(
+            self.word, self.status_code, list(self.sections()))
@@ -0,0 +1,185 @@
+'''wsgi service answering lookups as json, so that a team's tooling can share one warm instance.
+
+    GET /define/<word>       meaning of word; add ?sentence=1&synonym=1&antonym=1 or ?all=1 for more
+    GET /trending            trending words on Merriam Webster
+    GET /word-of-the-day     word of the day on Merriam Webster
+    GET /stats               cache hit rate and upstream latency
+
+every request shares one in-memory cache in front of the on-disk lookup cache
+and one pooled http session. run it with `greb --serve` or under any wsgi server
+through `greb.server.application`.
+'''
+from __future__ import absolute_import
+import json
+import re
+import threading
+import time
+from collections import deque, OrderedDict
+try:
+    from urllib.parse import parse_qs, unquote
+except ImportError:  # pragma: no cover
+    from urlparse import parse_qs
+    from urllib import unquote
+
+from . import meaning
+from .cache import LookupCache, MemoryCache
+from .fetch import fetch
+
+LATENCY_SAMPLES = 1000
+HTTP_STATUS = {
+    200: '200 OK',
+    400: '400 Bad Request',
+    404: '404 Not Found',
+    405: '405 Method Not Allowed',
+    502: '502 Bad Gateway',
+}
+WORD_SECTIONS = ('sentence', 'synonym', 'antonym')
+# characters that would change the dictionary url a word is put into, and the dot segments
+# that would climb out of it to the home page
+NOT_IN_WORDS = re.compile(r'[/?#\s]|^\.+$')
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LookupStats(object):
+    '''counts cache hits and keeps the latest upstream fetch latencies'''
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.upstream_errors = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self, fetches):
+        '''counts a lookup that went upstream, with the `(seconds, ok)` of each page it fetched'''
+        with self._lock:
+            self.misses += 1
+            for seconds, ok in fetches:
+                self.latencies.append(seconds)
+                if not ok:
+                    self.upstream_errors += 1
+
+    def to_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            latencies = list(self.latencies)
+            data = OrderedDict([
+                ('lookups', lookups),
+                ('cache_hits', self.hits),
+                ('cache_misses', self.misses),
+                ('hit_rate', float(self.hits) / lookups if lookups else None),
+                ('upstream_errors', self.upstream_errors),
+            ])
+        milliseconds = [each * 1000 for each in latencies]
+        data['upstream_latency_ms'] = OrderedDict([
+            ('samples', len(milliseconds)),
+            ('mean', sum(milliseconds) / len(milliseconds) if milliseconds else None),
+            ('p50', percentile(milliseconds, 0.5)),
+            ('p95', percentile(milliseconds, 0.95)),
+            ('max', max(milliseconds) if milliseconds else None),
+        ])
+        return data
+
+
+class LookupService(object):
+    '''the wsgi application. one instance holds the shared cache and stats'''
+
+    def __init__(self, cache=None):
+        self.cache = MemoryCache(backend=LookupCache()) if cache is None else cache
+        self.spelling = meaning.open_spelling_index(self.cache, meaning.open_history())
+        self.stats = LookupStats()
+
+    def lookup(self, word, sections):
+        fetches = []
+        previous = meaning.get_fetcher()
+
+        def fetch_page(url, timeout=None, headers=None, on_chunk=None):
+            start = time.time()
+            response, status_code = fetch(meaning.get_session(), url, headers=headers, read_timeout=timeout,
+                                          on_chunk=on_chunk)
+            fetches.append((time.time() - start, status_code in (200, 304, 404)))
+            return (response, status_code)
+
+        flags = dict((flag, True) for flag, section in meaning.SECTION_FLAGS if section in sections)
+        meaning.set_fetcher(fetch_page)
+        try:
+            result = meaning.find_result(word=word, cache=self.cache, spelling=self.spelling, save_history=False,
+                                         **flags)
+        finally:
+            meaning.set_fetcher(previous)
+        if fetches:
+            self.stats.record_miss(fetches)
+        else:
+            self.stats.record_hit()
+        return result
+
+    def define(self, word, query):
+        if query.get('all', ['0'])[0] not in ('', '0'):
+            extra = list(WORD_SECTIONS)
+        else:
+            extra = [section for section in WORD_SECTIONS if query.get(section, ['0'])[0] not in ('', '0')]
+        return self.lookup(word, ['meaning'] + extra)
+
+    def route(self, path, query):
+        if path.startswith('/define/'):
+            word = unquote(path[len('/define/'):]).lower().strip()
+            if word and NOT_IN_WORDS.search(word):
+                return (400, {'error': 'not a word'})
+            if word:
+                return self.respond_with_result(self.define(word, query))
+        elif path == '/trending':
+            return self.respond_with_result(self.lookup(None, ['trending words']))
+        elif path == '/word-of-the-day':
+            return self.respond_with_result(self.lookup(None, ['word of the day']))
+        elif path == '/stats':
+            return (200, self.stats.to_dict())
+        return (404, {'error': 'no such endpoint'})
+
+    def respond_with_result(self, result):
+        if result.status_code in (200, 404):
+            return (result.status_code, result.to_dict())
+        return (502, result.to_dict())
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD', 'GET') not in ('GET', 'HEAD'):
+            status_code, body = (405, {'error': 'only GET is supported'})
+        else:
+            status_code, body = self.route(environ.get('PATH_INFO', '/'), parse_qs(environ.get('QUERY_STRING', '')))
+        payload = json.dumps(body).encode('utf-8')
+        start_response(HTTP_STATUS[status_code], [('Content-Type', 'application/json'),
+                                                  ('Content-Length', str(len(payload)))])
+        return [payload]
+
+
+application = LookupService()
+
+
+def serve(host='127.0.0.1', port=8000):
+    '''serves `application` with a threaded wsgiref server until interrupted'''
+    from wsgiref.simple_server import make_server, WSGIServer
+    try:
+        from socketserver import ThreadingMixIn
+    except ImportError:  # pragma: no cover
+        from SocketServer import ThreadingMixIn
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    server = make_server(host, port, application, server_class=ThreadingWSGIServer)
+    print('greb serving on http://{}:{}'.format(host, port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,110 @@
+'''local spelling suggestions over the words greb already knows, so that a misspelling
+is answered without scraping the suggestions off a not found page.
+
+the index is a symmetric delete one: every known word is stored under each
+variant of it with up to `max_deletes` letters deleted. the same variants of a
+misspelling are looked up, which finds every known word within that many
+edits in a handful of dict lookups, however many words there are. candidates
+are then ranked by their edit distance.
+
+large word lists that are already searchable, like the offline dictionary,
+are not copied into the index. every word a single edit away from the
+misspelling is probed in them instead.
+'''
+from __future__ import absolute_import
+import string
+import threading
+
+from . import opts
+
+
+def deletes(word, max_deletes=1):
+    '''returns every variant of word with up to `max_deletes` letters deleted, word included'''
+    variants = set([word])
+    edge = [word]
+    for _ in range(max_deletes):
+        edge = [each[:i] + each[i + 1:] for each in edge if len(each) > 1 for i in range(len(each))]
+        variants.update(edge)
+    return variants
+
+
+def edits(word, alphabet=string.ascii_lowercase + '-'):
+    '''returns every word a single insertion, deletion, substitution or swap away from word'''
+    splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+    variants = set(left + right[1:] for left, right in splits if right)
+    variants.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+    variants.update(left + letter + right[1:] for left, right in splits if right for letter in alphabet)
+    variants.update(left + letter + right for left, right in splits for letter in alphabet)
+    variants.discard(word)
+    return variants
+
+
+def edit_distance(a, b):
+    '''number of insertions, deletions, substitutions and swaps of adjacent letters turning a into b'''
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[len(b)]
+
+
+class SpellingIndex(object):
+    '''known words indexed for spelling suggestions.
+
+       `sources` are callables returning iterables of words. they are read the
+       first time the index is used, so an index that is never asked costs nothing.
+       `lexicons` are containers of words too large to copy, probed with `in`.'''
+
+    def __init__(self, sources=(), lexicons=(), max_deletes=None):
+        self.max_deletes = opts.SPELLING_MAX_DELETES if max_deletes is None else max_deletes
+        self.lexicons = list(lexicons)
+        self._sources = list(sources)
+        self._words = set()
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            sources, self._sources = self._sources, []
+            for source in sources:
+                for word in source():
+                    self._add(word)
+
+    def _add(self, word):
+        word = word.lower().strip()
+        if not word or word in self._words:
+            return
+        self._words.add(word)
+        for variant in deletes(word, self.max_deletes):
+            self._variants.setdefault(variant, []).append(word)
+
+    def add(self, word):
+        '''adds a word found since the index was created'''
+        with self._lock:
+            self._add(word)
+
+    def __contains__(self, word):
+        self._load()
+        word = word.lower().strip()
+        return word in self._words or any(word in lexicon for lexicon in self.lexicons)
+
+    def __len__(self):
+        self._load()
+        return len(self._words)
+
+    def suggest(self, word, limit=None):
+        '''returns up to `limit` known words close to word, closest first'''
+        self._load()
+        word = word.lower().strip()
+        candidates = set()
+        for variant in deletes(word, self.max_deletes):
+            candidates.update(self._variants.get(variant, ()))
+        if self.lexicons:
+            candidates.update(each for each in edits(word) if any(each in lexicon for lexicon in self.lexicons))
+        candidates.discard(word)
+        ranked = sorted((edit_distance(word, each), abs(len(each) - len(word)), each) for each in candidates)
+        return [each for _, _, each in ranked[:opts.SPELLING_SUGGESTIONS if limit is None else limit]]
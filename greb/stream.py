@@ -0,0 +1,99 @@
+'''scanning a page while it downloads, so that a lookup can show each section as soon as it is
+complete and stop the download once every section it asked for is.
+
+the scanner follows the markup with the incremental parser of the standard
+library and notes the containers that have closed. a section is complete once
+the container that ends it on the page has closed.
+'''
+from __future__ import absolute_import
+import codecs
+try:
+    from html.parser import HTMLParser
+except ImportError:  # pragma: no cover
+    from HTMLParser import HTMLParser
+
+# classes of the containers whose closing means an extractor has all it reads. the examples and
+# related words are read from their first container only, but a page of several entries has
+# definitions after the first examples, so these are over once the related words that follow
+# the last entry are
+SECTION_ENDS = {
+    'meaning': ('related-box',),
+    'sentence': ('def-text',),
+    'synonym': ('related-box',),
+    'antonym': ('related-box',),
+    'trending words': ('wgt-wap-home-trending-items',),
+    'word of the day': ('wgt-wod-home',),
+}
+VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param',
+                           'source', 'track', 'wbr'])
+
+
+class SectionScanner(HTMLParser):
+    '''follows the markup of a page as it is fed, and tells which sections are complete'''
+
+    def __init__(self, sections):
+        HTMLParser.__init__(self)
+        self.ends = dict((section, frozenset(SECTION_ENDS[section])) for section in sections
+                         if section in SECTION_ENDS)
+        self.open = []
+        self.closed = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.open.append((tag, (dict(attrs).get('class') or '').split()))
+
+    def handle_endtag(self, tag):
+        # elements left open inside, like a `p` without its end tag, close along with it
+        for i in range(len(self.open) - 1, -1, -1):
+            if self.open[i][0] == tag:
+                for _, classes in self.open[i:]:
+                    self.closed.update(classes)
+                del self.open[i:]
+                return
+
+    def complete(self):
+        '''returns the sections whose ending container has closed'''
+        return set(section for section, ends in self.ends.items() if not ends.isdisjoint(self.closed))
+
+
+class PageStream(object):
+    '''follows the download of a word page for the requested sections. called with every chunk
+       of the body, it hands each section to `on_section(section, value)` as soon as it is complete,
+       and returns True to stop the download once all of them are'''
+
+    def __init__(self, sections, word=None, on_section=None):
+        self.sections = list(sections)
+        self.word = word
+        self.on_section = on_section
+        self.reported = set()
+        self._response = None
+
+    def _start(self, response):
+        self._response = response
+        self._decoder = codecs.getincrementaldecoder(getattr(response, 'encoding', None) or 'utf-8')('replace')
+        self._scanner = SectionScanner(self.sections)
+        self._parts = []
+
+    def __call__(self, response, chunk):
+        if response.status_code != 200:
+            return False
+        if response is not self._response:
+            # a retry starts the page over
+            self._start(response)
+        text = self._decoder.decode(chunk)
+        self._parts.append(text)
+        self._scanner.feed(text)
+        complete = self._scanner.complete()
+        done = len(complete) == len(self.sections)
+        # once every section is complete the lookup finishes at once, so reporting them early gains nothing
+        if self.on_section is not None and not done and complete - self.reported:
+            self._report(complete - self.reported)
+        self.reported.update(complete)
+        return done
+
+    def _report(self, sections):
+        from . import meaning
+        tree = meaning.parse_page(''.join(self._parts), sections)
+        for section in self.sections:
+            if section in sections:
+                self.on_section(section, meaning.EXTRACTORS[section](tree, self.word))
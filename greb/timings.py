@@ -0,0 +1,79 @@
+'''timing of the phases of a lookup: connect, download, parse, each extractor, history write and render.
+
+phases are reported as spans to every registered listener, a callable taking
+the phase name and its duration in seconds. a host application can register
+its own listener to feed its metrics, or collect spans for a block of code:
+
+    >>> with Timings() as timings:
+    ...     define('awesome')
+    >>> timings.totals()
+    OrderedDict([('connect', 0.12), ('download', 0.05), ('parse', 0.11), ...])
+
+listeners see spans from every thread. when none is registered a span costs
+next to nothing.
+'''
+from __future__ import absolute_import
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener):
+    '''registers `listener(name, seconds)` to be called for every span'''
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    with _listeners_lock:
+        _listeners.remove(listener)
+
+
+def record(name, seconds):
+    '''reports a span that was timed by the caller'''
+    for listener in list(_listeners):
+        listener(name, seconds)
+
+
+@contextmanager
+def span(name):
+    '''times the enclosed block as the phase `name`'''
+    if not _listeners:
+        yield
+        return
+    start = time.time()
+    try:
+        yield
+    finally:
+        record(name, time.time() - start)
+
+
+class Timings(object):
+    '''collects the spans reported while it is active'''
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def __call__(self, name, seconds):
+        with self._lock:
+            self.spans.append((name, seconds))
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        remove_listener(self)
+
+    def totals(self):
+        '''returns the total time spent in each phase, in the order phases were first seen'''
+        totals = OrderedDict()
+        with self._lock:
+            for name, seconds in self.spans:
+                totals[name] = totals.get(name, 0) + seconds
+        return totals
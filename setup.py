@@ -27,6 +27,7 @@ setup(
         'Programming Language :: Python :: 3.2',
         'Programming Language :: Python :: 3.3',
         'Programming Language :: Python :: 3.4',
+        'Programming Language :: Python :: 3.7',
     ],
     keywords="dictionary cli, word meaning, meaning-cli",
     author_email='reachtotj@gmail.com',
@@ -38,9 +39,14 @@ setup(
         'colorama>=0.3.3',
         'beautifulsoup4>=4.4.1'
     ],
+    extras_require={
+        'async': ['aiohttp>=3.0'],
+        'fast': ['lxml'],
+    },
     entry_points={
         'console_scripts': [
-            'greb = greb.meaning:main'
+            'greb = greb.meaning:main',
+            'greb-complete = greb.completion:main',
             ],
     }
 )
@@ -0,0 +1,11 @@
+import os
+
+from greb import meaning
+from greb.replay import PageStore
+
+# pages are served from recorded snapshots only, so that the suite never goes to the network and a
+# page without a snapshot fails as unreachable. run it with GREB_REPLAY_MODE=record to refresh them
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'pages')
+
+meaning.set_page_store(PageStore(os.environ.get('GREB_REPLAY_DIR', FIXTURES_DIR),
+                                 mode=os.environ.get('GREB_REPLAY_MODE', 'replay')))
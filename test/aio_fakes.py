@@ -0,0 +1,40 @@
+'''fakes of the aiohttp objects `greb.aio` reads, apart from test_aio since python 2 cannot parse them'''
+import threading
+
+from . import data
+
+
+class FakeContent(object):
+
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class FakeAiohttpResponse(object):
+
+    def __init__(self, text, status=200):
+        self.status = status
+        self.headers = {}
+        self.charset = 'utf-8'
+        self.content = FakeContent(text.encode('utf-8'))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeAiohttpSession(object):
+    '''answers every url with the word page, noting the threads it was asked on'''
+
+    def __init__(self):
+        self.threads = []
+
+    def get(self, url, **kwargs):
+        self.threads.append(threading.current_thread())
+        return FakeAiohttpResponse(data.WORD_PAGE_HTML)
@@ -32,7 +32,7 @@ INPUT_WORDS = {
                  u': to do darning'],
     },
     'SENTENCE': {
-        'multitasking': [u'\x1b[36m1. \x1b[39mThe job requires someone who is good at \x1b[36mmultitasking\x1b[39m.'],
+        'multitasking': [u'The job requires someone who is good at multitasking.'],
         'dimed': [],
     },
     'ANTONYM': {
@@ -100,3 +100,40 @@ PRINT_FUNCTION = {
     },
 
 }
+
+
+# a trimmed down dictionary page, enough for the extractors to work offline
+WORD_PAGE_HTML = '''
+<html><body>
+<div class="card-primary-content">
+  <ul><li><p class="definition-inner-item">: extremely good</p></li></ul>
+</div>
+<div class="card-primary-content def-text"><ul><li>an awesome sight</li></ul></div>
+<div class="card-box small-box related-box end">
+  <div class="definition-block">Synonyms great, grand Antonyms awful Related Words fine</div>
+</div>
+</body></html>
+'''
+
+# a trimmed down home page with one trending word and the word of the day
+HOME_PAGE_HTML = '''
+<html><body>
+<div class="wgt-wap-home-trending-items">
+  <ul><li><p class="title">grok</p><p class="blurb">lookups spiked</p></li></ul>
+</div>
+<div class="wgt-wod-home"><h4 class="wh-word">ebullient</h4><p class="wh-def-text">: lively</p></div>
+</body></html>
+'''
+
+CACHE = {
+    'url': 'http://www.merriam-webster.com/dictionary/awesome',
+    'sections': {
+        'meaning': [': extremely good'],
+        'synonym': ['great, grand '],
+    },
+}
+
+HISTORY = [
+    {'word': 'awesome', 'meaning': [': extremely good']},
+    {'word': 'grok', 'meaning': [': to understand profoundly and intuitively']},
+]
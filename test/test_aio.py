@@ -0,0 +1,109 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import OrderedDict
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import daily
+from greb import meaning as greb
+
+from . import data
+
+if sys.version_info >= (3, 7):
+    import asyncio
+    from greb import aio
+
+    from .aio_fakes import FakeAiohttpSession
+
+
+class FakeResponse(object):
+
+    def __init__(self, text):
+        self.text = text
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'asyncio api needs python 3.7+')
+class TestAio(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.options = {'meaning': True, 'synonym': True,
+                        'cache_path': os.path.join(self.directory, 'cache.sqlite3'),
+                        'file_path': os.path.join(self.directory, 'history.sqlite3')}
+        self.running = 0
+        self.most_running = 0
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_page(self, url, timeout=5, **kwargs):
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        word = url.rsplit('/', 1)[-1]
+        return (FakeResponse(data.WORD_PAGE_HTML.replace('extremely good', 'meaning of ' + word)), 200)
+
+    def test_lookup_many_keeps_order_and_limit(self):
+        words = ['word{}'.format(i) for i in range(6)]
+        with mock.patch.object(aio, 'aiohttp', None), \
+                mock.patch.object(greb, 'read_page', side_effect=self.read_page):
+            results = asyncio.run(aio.lookup_many(words, jobs=2, **self.options))
+        self.assertEqual([result.word for result in results], words)
+        self.assertEqual(results[3].meaning, [': meaning of word3'])
+        self.assertLessEqual(self.most_running, 2)
+
+    def test_lookup_many_runs_a_thread_for_each_job(self):
+        words = ['word{}'.format(i) for i in range(4)]
+        with mock.patch.object(aio, 'aiohttp', None), \
+                mock.patch.object(aio, 'ThreadPoolExecutor', wraps=aio.ThreadPoolExecutor) as executor, \
+                mock.patch.object(greb, 'read_page', side_effect=self.read_page):
+            asyncio.run(aio.lookup_many(words, jobs=48, **self.options))
+        self.assertEqual(executor.call_args, mock.call(max_workers=48))
+
+    def test_pages_are_fetched_on_the_event_loop(self):
+        session = FakeAiohttpSession()
+        fake_aiohttp = mock.Mock(ClientError=OSError)
+        with mock.patch.object(aio, 'aiohttp', fake_aiohttp), \
+                mock.patch.object(greb, 'get_page_store', return_value=None), \
+                mock.patch.object(greb, 'get_session') as get_session:
+            result = asyncio.run(aio.lookup('awesome', session=session, **self.options))
+        self.assertFalse(get_session.called)
+        self.assertEqual(result.meaning, [': extremely good'])
+        self.assertEqual(session.threads, [threading.main_thread()])
+
+    def test_lookup_goes_through_the_providers(self):
+        daily_path = os.path.join(self.directory, 'daily.json')
+        daily.write(OrderedDict([('trending words', [['grok', 'lookups spiked']]),
+                                 ('word of the day', [['ebullient', ': lively']])]), daily_path)
+        with mock.patch.object(aio, 'aiohttp', None), \
+                mock.patch.object(greb.opts, 'DAILY_FILE_PATH', daily_path), \
+                mock.patch.object(greb, 'read_page', side_effect=self.read_page) as read_page:
+            result = asyncio.run(aio.lookup(trending_words=True, cache_path=self.options['cache_path'],
+                                            file_path=self.options['file_path']))
+        self.assertFalse(read_page.called)
+        self.assertEqual([tuple(each) for each in result.trending_words], [('grok', 'lookups spiked')])
+
+    def test_lookup_is_served_from_cache(self):
+        with mock.patch.object(aio, 'aiohttp', None), \
+                mock.patch.object(greb, 'read_page', side_effect=self.read_page) as read_page:
+            first = asyncio.run(aio.lookup('awesome', **self.options))
+            second = asyncio.run(aio.lookup('awesome', **self.options))
+        self.assertEqual(read_page.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first, greb.find_result(word='awesome', **self.options))
+
+
+if __name__ == '__main__':
+    unittest.main()
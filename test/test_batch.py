@@ -0,0 +1,96 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from bs4 import BeautifulSoup
+
+from greb import meaning as greb
+
+from . import data
+
+
+def slow_parse_tree(url, sections=None, **kwargs):
+    # the first words take longest, so they finish last
+    word = url.rsplit('/', 1)[-1]
+    time.sleep(0.05 * (3 - int(word[-1])))
+    html = data.WORD_PAGE_HTML.replace('extremely good', 'meaning of ' + word)
+    return (BeautifulSoup(html, 'html.parser'), 200)
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_greb_many_prints_in_input_order(self):
+        words = ['word0', 'word1', 'word2']
+        captured_output = StringIO()
+        sys.stdout = captured_output
+        with mock.patch.object(greb, 'make_parse_tree', side_effect=slow_parse_tree):
+            greb.greb_many(words, jobs=3, meaning=True, no_cache=True,
+                           file_path=os.path.join(self.directory, 'history.sqlite3'))
+        sys.stdout = sys.__stdout__
+        output = captured_output.getvalue()
+        positions = [output.index('meaning of ' + word) for word in words]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_read_words(self):
+        file_path = os.path.join(self.directory, 'words.txt')
+        with open(file_path, 'w') as f:
+            f.write('Awesome\n\n  grok \n')
+        self.assertEqual(list(greb.read_words(file_path)), ['awesome', 'grok'])
+
+    def test_read_page_reuses_session(self):
+        session = mock.Mock()
+        session.get.return_value.status_code = 200
+        session.get.return_value.iter_content.return_value = [b'<html></html>']
+        with mock.patch.object(greb, 'get_page_store', return_value=None), \
+                mock.patch.object(greb, 'get_session', return_value=session):
+            greb.read_page(data.CACHE['url'])
+            greb.read_page(data.CACHE['url'])
+        self.assertEqual(session.get.call_count, 2)
+        self.assertIs(greb.get_session(), greb.get_session())
+
+    def test_session_pool_fits_the_jobs(self):
+        with mock.patch.object(greb, '_session', None), mock.patch.object(greb, '_session_jobs', None):
+            greb.set_session_jobs(20)
+            self.assertEqual(greb.get_session().get_adapter('https://')._pool_maxsize, 40)
+            greb.set_session_jobs(4)
+            self.assertEqual(greb.get_session().get_adapter('https://')._pool_maxsize, 40)
+            greb.set_session_jobs(30)
+            self.assertEqual(greb.get_session().get_adapter('https://')._pool_maxsize, 60)
+            with mock.patch.object(greb, 'make_parse_tree', side_effect=slow_parse_tree), \
+                    mock.patch.object(greb, 'set_session_jobs') as set_session_jobs, \
+                    mock.patch.object(greb, 'print_result'):
+                greb.greb_many(['word0'], jobs=50, meaning=True, no_cache=True,
+                               file_path=os.path.join(self.directory, 'history.sqlite3'))
+        set_session_jobs.assert_called_with(50)
+
+    def test_bad_jobs_are_a_usage_error(self):
+        for jobs in ('abc', '0', '-2'):
+            with mock.patch('sys.argv', ['greb', '--jobs=' + jobs, 'awesome', 'grok']), \
+                    mock.patch.object(greb, 'print_error_messages') as printed, \
+                    mock.patch.object(greb, 'greb_many') as greb_many:
+                with self.assertRaises(SystemExit) as exit:
+                    greb.main()
+            self.assertEqual(exit.exception.code, 2)
+            self.assertEqual(printed.call_count, 1)
+            self.assertFalse(greb_many.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from collections import OrderedDict
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from bs4 import BeautifulSoup
+
+from greb import meaning as greb
+from greb.cache import LookupCache, cache_key
+from greb.result import Result, TrendingWord, WordOfTheDay
+
+from . import data
+
+
+class TestLookupCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.directory, 'cache.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_cache_key(self):
+        self.assertEqual(cache_key('HTTP://www.Merriam-Webster.com/dictionary/Awesome/'),
+                         cache_key('https://www.merriam-webster.com/dictionary/awesome'))
+
+    def test_put_and_get(self):
+        cache = LookupCache(path=self.cache_path)
+        self.assertIsNone(cache.get(data.CACHE['url']))
+        cache.put(data.CACHE['url'], 200, data.CACHE['sections'])
+        status_code, sections = cache.get(data.CACHE['url'])
+        self.assertEqual(status_code, 200)
+        self.assertEqual(sections, data.CACHE['sections'])
+
+    def test_expired_entry_is_a_miss(self):
+        cache = LookupCache(path=self.cache_path, ttl=60)
+        cache.put(data.CACHE['url'], 200, data.CACHE['sections'])
+        with mock.patch('greb.cache.time.time', return_value=time.time() + 120):
+            self.assertIsNone(cache.get(data.CACHE['url']))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        # each payload compresses to 27 bytes, so two entries fit and a third does not
+        cache = LookupCache(path=self.cache_path, max_size=60)
+        sections = {'meaning': ['x' * 30]}
+        cache.put('one', 200, sections)
+        cache.put('two', 200, sections)
+        cache.get('one')
+        cache.put('three', 200, sections)
+        self.assertIsNone(cache.get('two'))
+        self.assertIsNotNone(cache.get('one'))
+        self.assertIsNotNone(cache.get('three'))
+
+    def test_greb_serves_repeat_lookup_from_cache(self):
+        tree = BeautifulSoup(data.WORD_PAGE_HTML, 'html.parser')
+        options = {'word': 'awesome', 'meaning': True, 'synonym': True, 'cache_path': self.cache_path,
+                   'file_path': os.path.join(self.directory, 'meanings.json')}
+        outputs = []
+        with mock.patch.object(greb, 'make_parse_tree', return_value=(tree, 200)) as make_parse_tree:
+            for _ in range(2):
+                captured_output = StringIO()
+                sys.stdout = captured_output
+                greb.greb(**options)
+                sys.stdout = sys.__stdout__
+                outputs.append(captured_output.getvalue())
+        self.assertEqual(make_parse_tree.call_count, 1)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn(': extremely good', outputs[1])
+
+    def test_lookup_refresh_skips_cached_entry(self):
+        cache = LookupCache(path=self.cache_path)
+        cache.put(data.CACHE['url'], 200, data.CACHE['sections'])
+        tree = BeautifulSoup(data.WORD_PAGE_HTML, 'html.parser')
+        with mock.patch.object(greb, 'make_parse_tree', return_value=(tree, 200)) as make_parse_tree:
+            status_code, found = greb.lookup(data.CACHE['url'], 'awesome', ['meaning'], cache=cache)
+            self.assertEqual(make_parse_tree.call_count, 0)
+            greb.lookup(data.CACHE['url'], 'awesome', ['meaning'], cache=cache, refresh=True)
+            self.assertEqual(make_parse_tree.call_count, 1)
+        self.assertEqual(found, OrderedDict([('meaning', data.CACHE['sections']['meaning'])]))
+
+
+class TestHomePageRevalidation(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = LookupCache(path=os.path.join(self.directory, 'cache.sqlite3'))
+        self.sections = ['trending words', 'word of the day']
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_page(self, status_code):
+        response = mock.Mock(text=data.HOME_PAGE_HTML if status_code == 200 else '', status_code=status_code,
+                             headers={'ETag': '"home-1"', 'Last-Modified': 'Sat, 17 Oct 2026 06:00:00 GMT'})
+        return mock.patch.object(greb, 'read_page', return_value=(response, status_code))
+
+    def test_fresh_entry_is_served_without_a_request(self):
+        with self.read_page(200) as read_page:
+            first = greb.lookup(greb.HOME_PAGE_URL, sections=self.sections, cache=self.cache)
+            second = greb.lookup(greb.HOME_PAGE_URL, sections=self.sections, cache=self.cache)
+        self.assertEqual(read_page.call_count, 1)
+        self.assertEqual(Result(sections=first[1]), Result(sections=second[1]))
+        self.assertEqual(Result(sections=second[1]).trending_words, [TrendingWord('grok', 'lookups spiked')])
+
+    def test_stale_entry_is_revalidated(self):
+        with self.read_page(200):
+            fetched = greb.lookup(greb.HOME_PAGE_URL, sections=self.sections, cache=self.cache)
+        later = time.time() + greb.opts.HOME_PAGE_TTL + 60
+        with mock.patch('greb.cache.time.time', return_value=later), self.read_page(304) as read_page:
+            revalidated = greb.lookup(greb.HOME_PAGE_URL, sections=self.sections, cache=self.cache)
+            self.assertIsNotNone(self.cache.get(greb.HOME_PAGE_URL, ttl=greb.opts.HOME_PAGE_TTL))
+        self.assertEqual(read_page.call_args[1]['headers'], {'If-None-Match': '"home-1"',
+                                                             'If-Modified-Since': 'Sat, 17 Oct 2026 06:00:00 GMT'})
+        self.assertEqual(revalidated[0], 200)
+        self.assertEqual(Result(sections=revalidated[1]), Result(sections=fetched[1]))
+
+    def test_stale_entry_is_served_without_a_connection(self):
+        with self.read_page(200):
+            greb.lookup(greb.HOME_PAGE_URL, sections=self.sections, cache=self.cache)
+        later = time.time() + greb.opts.HOME_PAGE_TTL + 60
+        with mock.patch('greb.cache.time.time', return_value=later), \
+                mock.patch.object(greb, 'read_page', return_value=(None, False)):
+            status_code, found = greb.lookup(greb.HOME_PAGE_URL, sections=['word of the day'], cache=self.cache)
+        self.assertEqual(Result(sections=found).word_of_day, [WordOfTheDay('ebullient', ': lively')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import completion
+from greb import meaning as greb
+from greb.cache import LookupCache
+from greb.history import History
+from greb.offline import OfflineDictionary, write_dictionary
+
+COMPLETION_SCRIPT = '''
+import sys
+from greb import completion
+print(completion.complete('aw', path=sys.argv[1]))
+print(sorted(name for name in ('requests', 'bs4', 'docopt', 'sqlite3', 'greb.meaning') if name in sys.modules))
+'''
+
+
+class TestCompletion(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'words.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_complete_prefix(self):
+        completion.write_index(['awesome', 'Awful', 'await', 'grok', 'a', 'awesome'], self.path)
+        self.assertEqual(completion.complete('aw', path=self.path), ['await', 'awesome', 'awful'])
+        self.assertEqual(completion.complete('awe', path=self.path), ['awesome'])
+        self.assertEqual(completion.complete('a', path=self.path, limit=2), ['a', 'await'])
+        self.assertEqual(completion.complete('zz', path=self.path), [])
+        self.assertEqual(completion.complete('', path=self.path), ['a', 'await', 'awesome', 'awful', 'grok'])
+
+    def test_find_first_on_every_boundary(self):
+        words = ['b', 'bb', 'd', 'dd', 'f']
+        data = b''.join(word.encode('utf-8') + b'\n' for word in words)
+        for key, expected in (('a', 'b'), ('b', 'b'), ('ba', 'bb'), ('c', 'd'), ('de', 'f'), ('f', 'f')):
+            position = completion.find_first(data, key.encode('utf-8'))
+            self.assertEqual(data[position:data.find(b'\n', position)].decode('utf-8'), expected)
+        self.assertEqual(completion.find_first(data, b'g'), len(data))
+
+    def test_words_recorded_are_completed_and_merged(self):
+        completion.write_index(['awesome'], self.path)
+        completion.add_word('Awkward', self.path)
+        self.assertTrue(os.path.isfile(self.path + completion.JOURNAL_SUFFIX))
+        self.assertEqual(completion.complete('aw', path=self.path), ['awesome', 'awkward'])
+        with mock.patch('greb.opts.COMPLETION_JOURNAL_SIZE', 0):
+            completion.add_word('awry', self.path)
+        self.assertFalse(os.path.isfile(self.path + completion.JOURNAL_SUFFIX))
+        self.assertEqual(completion.read_lines(self.path), ['awesome', 'awkward', 'awry'])
+
+    def test_history_writes_update_the_index(self):
+        history = History(os.path.join(self.directory, 'history.sqlite3'))
+        completion.write_index([], self.path)
+        greb.write_meaning_to_file({'word': 'awesome', 'meaning': [': extremely good']}, history=history)
+        self.assertEqual(completion.complete('aw', path=self.path), ['awesome'])
+        with mock.patch.object(completion, 'add_word') as add_word:
+            greb.write_meaning_to_file({'word': 'awesome', 'meaning': [': extremely good']},
+                                       history=History(history.path))
+        self.assertFalse(add_word.called)
+
+    def test_build_index(self):
+        history = History(os.path.join(self.directory, 'history.sqlite3'))
+        history.record({'word': 'awesome', 'meaning': [': extremely good']})
+        cache = LookupCache(path=os.path.join(self.directory, 'cache.sqlite3'))
+        cache.put(greb.word_url('awful'), 200, {'meaning': [': very bad']})
+        write_dictionary({'awry': {'meaning': [': askew']}}, os.path.join(self.directory, 'dictionary.bin'))
+        dictionary = OfflineDictionary(os.path.join(self.directory, 'dictionary.bin'))
+        self.assertEqual(completion.build_index(self.path, history=history, cache=cache, dictionary=dictionary), 3)
+        self.assertEqual(completion.complete('aw', path=self.path), ['awesome', 'awful', 'awry'])
+
+    def test_completion_skips_heavy_imports(self):
+        completion.write_index(['awesome'], self.path)
+        output = subprocess.check_output([sys.executable, '-c', COMPLETION_SCRIPT, self.path],
+                                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        lines = output.decode('utf-8').strip().splitlines()
+        self.assertIn('awesome', lines[0])
+        self.assertEqual(lines[-1], '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
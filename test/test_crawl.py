@@ -0,0 +1,90 @@
+from __future__ import unicode_literals, absolute_import
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from bs4 import BeautifulSoup
+
+from greb import crawl
+from greb import meaning as greb
+from greb.offline import read_word_list
+
+from . import data
+
+NOT_FOUND_PAGE_HTML = '<html><body><p>The word you have entered is not in the dictionary.</p></body></html>'
+
+
+def fake_parse_tree(url, sections=None, **kwargs):
+    word = url.rsplit('/', 1)[1]
+    if word.startswith('missing'):
+        return (BeautifulSoup(NOT_FOUND_PAGE_HTML, 'html.parser'), 404)
+    if word.startswith('broken'):
+        return (None, False)
+    return (BeautifulSoup(data.WORD_PAGE_HTML, 'html.parser'), 200)
+
+
+class TestCrawl(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'crawl.jsonl')
+        self.crawler = crawl.Crawler(jobs=4, rate=1000)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def crawl(self, words):
+        with mock.patch.object(greb, 'make_parse_tree', side_effect=fake_parse_tree) as make_parse_tree:
+            progress = self.crawler.crawl(words, path=self.path)
+        return (progress, sorted(call[0][0].rsplit('/', 1)[1] for call in make_parse_tree.call_args_list))
+
+    def test_crawl_writes_words_the_offline_dictionary_reads(self):
+        progress, fetched = self.crawl(['awesome', 'grand', 'missing', 'broken', 'awesome'])
+        self.assertEqual((progress.total, progress.found, progress.not_found, progress.errors), (4, 2, 1, 1))
+        self.assertEqual(fetched, ['awesome', 'broken', 'grand', 'missing'])
+        words = dict(read_word_list(self.path))
+        self.assertEqual(sorted(words), ['awesome', 'grand', 'missing'])
+        self.assertEqual(words['awesome']['meaning'], [': extremely good'])
+        self.assertEqual(words['missing'], {})
+
+    def test_crawl_resumes_where_it_stopped(self):
+        self.crawl(['awesome', 'broken'])
+        with io.open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"word": "gra')  # cut short by an interrupted crawl
+        progress, fetched = self.crawl(['awesome', 'broken', 'grand'])
+        self.assertEqual(fetched, ['broken', 'grand'])
+        self.assertEqual(progress.skipped, 1)
+        self.assertEqual(sorted(crawl.read_checkpoint(self.path)), ['awesome', 'grand'])
+
+    def test_rate_limit(self):
+        self.crawler = crawl.Crawler(jobs=4, rate=20)
+        start = time.time()
+        self.crawl(['a', 'b', 'c', 'd', 'e'])
+        self.assertGreaterEqual(time.time() - start, 0.19)
+
+    def test_progress(self):
+        progress = crawl.Progress(100, skipped=40)
+        progress.start -= 10
+        progress.found, progress.errors = 18, 2
+        self.assertAlmostEqual(progress.rate(), 2.0, places=1)
+        self.assertAlmostEqual(progress.eta(), 20, delta=1)
+        stream = StringIO()
+        report = crawl.ProgressReport(interval=60, stream=stream)
+        report(progress)
+        report(progress)
+        self.assertEqual(stream.getvalue().count('\n'), 1)
+        self.assertIn('60/100 words  2.0 words/s  0 not found  2 errors  eta 0m', stream.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
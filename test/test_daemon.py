@@ -0,0 +1,75 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from bs4 import BeautifulSoup
+
+from greb import daemon
+from greb import meaning as greb
+from greb.cache import LookupCache, MemoryCache
+from greb.history import History
+
+from . import data
+
+
+@unittest.skipUnless(daemon.is_supported(), 'unix domain sockets are not available')
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.directory, 'greb.sock')
+        self.history = History(os.path.join(self.directory, 'history.sqlite3'))
+        self.cache = MemoryCache(backend=LookupCache(os.path.join(self.directory, 'cache.sqlite3')))
+        self.daemon = daemon.Daemon(self.socket_path, cache=self.cache, history=self.history)
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.daemon.shutdown()
+        self.daemon.server_close()
+        self.thread.join()
+        shutil.rmtree(self.directory)
+
+    def test_lookup_through_daemon(self):
+        tree = BeautifulSoup(data.WORD_PAGE_HTML, 'html.parser')
+        options = {'word': 'awesome', 'meaning': True, 'synonym': True, 'file_path': '/elsewhere'}
+        with mock.patch.object(greb, 'make_parse_tree', return_value=(tree, 200)) as make_parse_tree:
+            first = daemon.request(options, socket_path=self.socket_path)
+            second = daemon.request(options, socket_path=self.socket_path)
+        self.assertEqual(make_parse_tree.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first['result']['meaning'], [': extremely good'])
+        self.assertIn('awesome', self.history)
+
+    def test_random_history_through_daemon(self):
+        self.history.record(data.HISTORY[0])
+        reply = daemon.request({'display_terminal': True}, socket_path=self.socket_path)
+        self.assertEqual(list(reply['history'].items()), list(data.HISTORY[0].items()))
+
+    def test_greb_with_daemon_prints_reply(self):
+        self.history.record(data.HISTORY[1])
+        captured_output = StringIO()
+        sys.stdout = captured_output
+        with mock.patch.object(daemon.opts, 'DAEMON_SOCKET_PATH', self.socket_path):
+            answered = greb.greb_with_daemon({'display_terminal': True})
+        sys.stdout = sys.__stdout__
+        self.assertTrue(answered)
+        self.assertIn('GROK', captured_output.getvalue())
+
+    def test_request_without_daemon(self):
+        self.assertIsNone(daemon.request({'word': 'awesome'}, socket_path=os.path.join(self.directory, 'none')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import daily
+from greb import meaning as greb
+from greb.result import TrendingWord, WordOfTheDay
+
+from . import data
+
+
+class TestDaily(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'daily.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read_page(self, status_code=200):
+        response = mock.Mock(text=data.HOME_PAGE_HTML if status_code == 200 else '', status_code=status_code,
+                             headers={})
+        return mock.patch.object(greb, 'read_page', return_value=(response, status_code))
+
+    def test_refresh_writes_both_sections_from_one_fetch(self):
+        with self.read_page() as read_page:
+            found = daily.refresh(self.path)
+        self.assertEqual(read_page.call_count, 1)
+        self.assertEqual(found['trending words'], [TrendingWord('grok', 'lookups spiked')])
+        self.assertEqual(daily.read(path=self.path)['word of the day'], [['ebullient', ': lively']])
+
+    def test_failed_refresh_keeps_the_last_file(self):
+        with self.read_page():
+            daily.refresh(self.path)
+        with mock.patch.object(greb, 'read_page', return_value=(None, False)):
+            self.assertIsNone(daily.refresh(self.path))
+        self.assertIsNotNone(daily.read(path=self.path))
+
+    def test_old_file_is_ignored(self):
+        with self.read_page():
+            daily.refresh(self.path)
+        self.assertIsNotNone(daily.read(['word of the day'], path=self.path))
+        with mock.patch('greb.daily.time.time', return_value=time.time() + greb.opts.DAILY_MAX_AGE + 60):
+            self.assertIsNone(daily.read(path=self.path))
+        self.assertIsNone(daily.read(path=os.path.join(self.directory, 'missing.json')))
+
+    def test_word_of_the_day_is_read_from_the_file(self):
+        with self.read_page():
+            daily.refresh(self.path)
+        with mock.patch('greb.opts.DAILY_FILE_PATH', self.path), \
+                mock.patch.object(greb, 'read_page', return_value=(None, False)) as read_page:
+            result = greb.find_result(word_of_day=True, no_cache=True,
+                                      file_path=os.path.join(self.directory, 'history.sqlite3'))
+        self.assertFalse(read_page.called)
+        self.assertEqual(result.word_of_day, [WordOfTheDay('ebullient', ': lively')])
+
+    def test_refresher_skips_a_fresh_file(self):
+        refreshed = threading.Event()
+        with self.read_page():
+            daily.refresh(self.path)
+        with mock.patch.object(daily, 'refresh', side_effect=lambda *args, **kwargs: refreshed.set()):
+            refresher = daily.Refresher(interval=60, path=self.path)
+            refresher.close()
+            self.assertFalse(refreshed.wait(0.1))
+            refresher = daily.Refresher(interval=60, path=os.path.join(self.directory, 'missing.json'))
+            refresher.close()
+            self.assertTrue(refreshed.wait(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+from __future__ import unicode_literals, absolute_import
+import csv
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import export
+from greb import meaning as greb
+from greb.cache import LookupCache
+from greb.history import History
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history = History(os.path.join(self.directory, 'history.sqlite3'))
+        self.cache = LookupCache(path=os.path.join(self.directory, 'cache.sqlite3'))
+        with mock.patch('greb.history.time.time', return_value=export.parse_date('2024-01-10') + 60):
+            self.history.record({'word': 'awesome', 'meaning': [': extremely good']})
+        with mock.patch('greb.history.time.time', return_value=export.parse_date('2024-02-10') + 60):
+            self.history.record({'word': 'grok', 'meaning': [': to understand']})
+        self.cache.put(greb.word_url('awesome'), 200, {'meaning': [': extremely good'], 'synonym': ['great, grand']})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export(self, file_format, **kwargs):
+        output = os.path.join(self.directory, 'export.' + file_format)
+        count = export.export(file_format, output, history=self.history, cache=self.cache, **kwargs)
+        return (count, output)
+
+    def test_jsonl(self):
+        count, output = self.export('jsonl')
+        with io.open(output, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(count, 2)
+        self.assertEqual([record['word'] for record in records], ['awesome', 'grok'])
+        self.assertEqual(records[0]['synonym'], ['great, grand'])
+        self.assertEqual(records[1]['synonym'], [])
+        self.assertTrue(records[0]['created'].startswith('2024-01-'))
+
+    def test_filters(self):
+        self.assertEqual(self.export('jsonl', since='2024-02-01')[0], 1)
+        self.assertEqual(self.export('jsonl', until='2024-01-10')[0], 1)
+        self.assertEqual(self.export('jsonl', until='2024-01-09')[0], 0)
+        count, output = self.export('jsonl', has_synonyms_only=True)
+        self.assertEqual(count, 1)
+
+    def test_csv(self):
+        count, output = self.export('csv')
+        with io.open(output, encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(export.COLUMNS))
+        self.assertEqual(rows[1][0], 'awesome')
+        self.assertEqual(rows[1][2], ': extremely good')
+
+    def test_sqlite(self):
+        count, output = self.export('sqlite')
+        connection = sqlite3.connect(output)
+        rows = connection.execute('SELECT word, meaning FROM words ORDER BY word').fetchall()
+        connection.close()
+        self.assertEqual(count, 2)
+        self.assertEqual(rows[1], ('grok', json.dumps([': to understand'])))
+        self.assertRaises(ValueError, export.export, 'sqlite', None, history=self.history)
+
+    def test_anki(self):
+        self.history.record({'word': 'lt', 'meaning': [': the <abbr> of "less than" & more']})
+        count, output = self.export('anki')
+        with io.open(output, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], '#separator:tab')
+        self.assertEqual(lines[3], 'awesome\t: extremely good<br><br><i>Synonyms</i> great, grand')
+        self.assertEqual(lines[5].split('\t')[1].replace('&quot;', '"'),
+                         ': the &lt;abbr&gt; of "less than" &amp; more')
+
+    def test_cached_sections_are_read_however_old(self):
+        with mock.patch('greb.cache.time.time', return_value=0):
+            self.cache.put(greb.word_url('grok'), 200, {'synonym': ['understand']})
+        count, output = self.export('jsonl')
+        with io.open(output, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[1]['synonym'], ['understand'])
+        self.assertEqual(list(self.cache.get_many([greb.word_url('grok'), greb.word_url('nope')])),
+                         [(200, {'synonym': ['understand']}), None])
+
+    def test_date_range_is_pushed_to_the_store(self):
+        with mock.patch.object(self.history, 'records', return_value=iter([])) as records:
+            self.assertEqual(self.export('jsonl', since='2024-01-01')[0], 0)
+        self.assertEqual(records.call_args[1]['since'], export.parse_date('2024-01-01'))
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, export.export, 'xml', history=self.history)
+
+    def test_usage_errors_are_printed(self):
+        for argv in (['greb', '--export=xml'], ['greb', '--export=jsonl', '--since=last week']):
+            with mock.patch('sys.argv', argv), mock.patch.object(greb, 'print_error_messages') as printed:
+                with self.assertRaises(SystemExit) as exit:
+                    greb.main()
+            self.assertEqual(exit.exception.code, 2)
+            self.assertEqual(printed.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
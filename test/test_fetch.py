@@ -0,0 +1,103 @@
+from __future__ import unicode_literals, absolute_import
+import threading
+import time
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+import requests
+
+from greb import fetch
+
+
+def make_response(status_code=200, chunks=(b'<html></html>',)):
+    response = mock.Mock(status_code=status_code)
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+class TestFetch(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(fetch.time, 'sleep')
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connection_error_is_retried(self):
+        session = mock.Mock()
+        answer = make_response()
+        session.get.side_effect = [requests.exceptions.ConnectionError(), answer]
+        response, status_code = fetch.fetch(session, 'https://example.com', retries=2)
+        self.assertEqual(status_code, 200)
+        self.assertIs(response, answer)
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(self.sleep.call_count, 1)
+
+    def test_server_error_is_retried(self):
+        session = mock.Mock()
+        session.get.side_effect = [make_response(503), make_response(200)]
+        self.assertEqual(fetch.fetch(session, 'https://example.com', retries=2)[1], 200)
+
+    def test_gives_up_after_retries(self):
+        session = mock.Mock()
+        session.get.side_effect = requests.exceptions.ConnectTimeout()
+        self.assertEqual(fetch.fetch(session, 'https://example.com', retries=2), (None, False))
+        self.assertEqual(session.get.call_count, 3)
+
+    def test_retries_stop_at_the_total_deadline(self):
+        clock = [1000.0]
+
+        def get(url, **kwargs):
+            clock[0] += 4
+            raise requests.exceptions.ReadTimeout()
+
+        session = mock.Mock()
+        session.get.side_effect = get
+        with mock.patch.object(fetch.time, 'time', side_effect=lambda: clock[0]):
+            self.assertEqual(fetch.fetch(session, 'https://example.com', retries=5, total_timeout=10), (None, False))
+        self.assertEqual(session.get.call_count, 3)
+        self.assertLessEqual(max(session.get.call_args[1]['timeout']), 2)
+
+    def test_separate_connect_and_read_deadlines(self):
+        session = mock.Mock()
+        session.get.return_value = make_response()
+        fetch.fetch(session, 'https://example.com', connect_timeout=1, read_timeout=4)
+        self.assertEqual(session.get.call_args[1]['timeout'], (1, 4))
+
+    def test_stalled_download_hits_the_read_deadline(self):
+        clock = [1000.0]
+
+        def trickle():
+            yield b'<html>'
+            clock[0] += 10
+            yield b'</html>'
+
+        session = mock.Mock()
+        session.get.return_value = make_response(chunks=trickle())
+        with mock.patch.object(fetch.time, 'time', side_effect=lambda: clock[0]):
+            answer = fetch.fetch(session, 'https://example.com', read_timeout=5, retries=0)
+        self.assertEqual(answer, (None, False))
+
+    def test_hedged_request_answers_first(self):
+        stalled = threading.Event()
+        answers = [make_response(), make_response()]
+
+        def get(url, **kwargs):
+            response = answers.pop()
+            if answers:
+                stalled.wait(5)
+            return response
+
+        session = mock.Mock()
+        session.get.side_effect = get
+        start = time.time()
+        response, status_code = fetch.fetch(session, 'https://example.com', hedge_after=0.05)
+        stalled.set()
+        self.assertEqual(status_code, 200)
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(session.get.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import unicode_literals, absolute_import
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb.history import History
+
+from . import data
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.directory, 'history.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_record_skips_existing_words(self):
+        history = History(self.history_path)
+        self.assertTrue(history.record(data.HISTORY[0]))
+        self.assertFalse(history.record(data.HISTORY[0]))
+        self.assertTrue(history.record(data.HISTORY[1]))
+        self.assertEqual(len(history), 2)
+        self.assertIn('grok', history)
+
+    def test_random_entry_reaches_every_entry(self):
+        history = History(self.history_path)
+        self.assertIsNone(history.random_entry())
+        for each in data.HISTORY + data.HISTORY:
+            history.record(each)
+        words = set(history.random_entry()['word'] for _ in range(100))
+        self.assertEqual(words, set(each['word'] for each in data.HISTORY))
+
+    def test_migrates_legacy_meanings_file(self):
+        legacy_path = os.path.join(self.directory, 'meanings.json')
+        with open(legacy_path, 'w') as f:
+            json.dump(data.HISTORY, f, indent=2)
+        history = History(self.history_path, legacy_path=legacy_path)
+        self.assertEqual(len(history), len(data.HISTORY))
+        self.assertFalse(history.record(data.HISTORY[1]))
+
+    def test_legacy_entries_are_read_before_the_store_exists(self):
+        legacy_path = os.path.join(self.directory, 'meanings.json')
+        with open(legacy_path, 'w') as f:
+            json.dump(data.HISTORY, f, indent=2)
+        history = History(self.history_path, legacy_path=legacy_path)
+        self.assertEqual(list(history.words()), [each['word'] for each in data.HISTORY])
+
+    def test_batch_commits_once_at_the_end(self):
+        history = History(self.history_path)
+        with mock.patch.object(history, 'record_many', wraps=history.record_many) as record_many:
+            with history.batch():
+                for each in data.HISTORY + data.HISTORY:
+                    history.record(each)
+                self.assertEqual(len(History(self.history_path)), 0)
+        self.assertEqual(record_many.call_count, 1)
+        self.assertEqual(len(History(self.history_path)), len(data.HISTORY))
+
+    def test_concurrent_writers_lose_nothing(self):
+        def write(worker):
+            history = History(self.history_path)
+            for i in range(25):
+                history.record({'word': 'word{}-{}'.format(worker, i), 'meaning': [': meaning']})
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(History(self.history_path)), 200)
+
+    def test_legacy_file_is_migrated_once(self):
+        legacy_path = os.path.join(self.directory, 'meanings.json')
+        with open(legacy_path, 'w') as f:
+            json.dump(data.HISTORY, f)
+        self.assertEqual(len(History(self.history_path, legacy_path=legacy_path)), len(data.HISTORY))
+        with open(legacy_path, 'w') as f:
+            json.dump(data.HISTORY + [{'word': 'late', 'meaning': [': after']}], f)
+        self.assertNotIn('late', History(self.history_path, legacy_path=legacy_path))
+
+    def test_write_and_find_meaning_from_history(self):
+        greb.write_meaning_to_file(data.HISTORY[0], file_path=self.history_path)
+        searched_meaning = greb.find_meaning_from_history(file_path=self.history_path)
+        self.assertEqual(list(searched_meaning.keys()), ['word', 'meaning'])
+        self.assertEqual(dict(searched_meaning), data.HISTORY[0])
+
+    def test_find_meaning_from_missing_history(self):
+        self.assertEqual(greb.find_meaning_from_history(file_path=self.history_path), {})
+        self.assertFalse(os.path.exists(self.history_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+from __future__ import unicode_literals, absolute_import
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb.cache import LookupCache
+from greb.history import History
+from greb.offline import OfflineDictionary, build_dictionary, write_dictionary
+
+from . import data
+
+
+class TestOfflineDictionary(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'dictionary.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get(self):
+        entries = dict(('word{}'.format(i), {'meaning': [': sense {}'.format(i)]}) for i in range(500))
+        self.assertEqual(write_dictionary(entries, self.path), 500)
+        dictionary = OfflineDictionary(self.path)
+        self.assertEqual(len(dictionary), 500)
+        for i in (0, 1, 250, 499):
+            self.assertEqual(dictionary.get('Word{}'.format(i)), {'meaning': [': sense {}'.format(i)]})
+        self.assertIsNone(dictionary.get('word500'))
+        self.assertIsNone(dictionary.get('a'))
+        self.assertIsNone(dictionary.get('zzz'))
+        self.assertEqual(list(dictionary.words())[:2], ['word0', 'word1'])
+        dictionary.close()
+
+    def test_build_merges_sources(self):
+        word_list = os.path.join(self.directory, 'words.jsonl')
+        with io.open(word_list, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'word': 'darn', 'meaning': [': to mend']}) + '\n')
+        history = History(os.path.join(self.directory, 'history.sqlite3'))
+        for each in data.HISTORY:
+            history.record(each)
+        cache = LookupCache(os.path.join(self.directory, 'cache.sqlite3'))
+        cache.put(data.CACHE['url'], 200, data.CACHE['sections'])
+        cache.put(greb.HOME_PAGE_URL, 200, {'trending words': []})
+
+        count = build_dictionary(self.path, word_lists=[word_list], cache=cache, history=history)
+        self.assertEqual(count, 3)
+        dictionary = OfflineDictionary(self.path)
+        self.assertEqual(dictionary.get('awesome'), data.CACHE['sections'])
+        self.assertEqual(dictionary.get('darn'), {'meaning': [': to mend']})
+
+    def test_offline_lookup_skips_network(self):
+        write_dictionary({'grok': {'meaning': data.HISTORY[1]['meaning']}}, self.path)
+        options = {'word': 'grok', 'meaning': True, 'offline': True, 'offline_path': self.path, 'no_cache': True,
+                   'file_path': os.path.join(self.directory, 'history.sqlite3')}
+        with mock.patch.object(greb, 'make_parse_tree') as make_parse_tree:
+            result = greb.find_result(**options)
+        self.assertEqual(make_parse_tree.call_count, 0)
+        self.assertEqual(result.meaning, data.HISTORY[1]['meaning'])
+
+    def test_offline_lookup_falls_back_to_network(self):
+        write_dictionary({'grok': {'meaning': data.HISTORY[1]['meaning']}}, self.path)
+        options = {'word': 'grok', 'meaning': True, 'synonym': True, 'offline': True, 'offline_path': self.path,
+                   'no_cache': True, 'file_path': os.path.join(self.directory, 'history.sqlite3')}
+        with mock.patch.object(greb, 'make_parse_tree', return_value=(None, False)) as make_parse_tree:
+            result = greb.find_result(**options)
+        self.assertEqual(make_parse_tree.call_count, 1)
+        self.assertEqual(result.meaning, data.HISTORY[1]['meaning'])
+        self.assertEqual(result.synonym, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
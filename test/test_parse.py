@@ -0,0 +1,78 @@
+from __future__ import unicode_literals, absolute_import
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+
+from . import data
+
+NOISY_PAGE_HTML = data.WORD_PAGE_HTML.replace(
+    '<body>', '<body><nav><ul><li><a href="/">Home</a></li></ul></nav><p class="ad">buy now</p>')
+NOT_FOUND_PAGE_HTML = (
+    '<html><body><p>Click on a spelling suggestion below or try again.</p>'
+    '<p class="definition-inner-item with-sense"><a href="/dictionary/awesome">awesome</a> '
+    '<a href="/dictionary/aweless">aweless</a></p></body></html>')
+
+
+class TestRestrictedParse(unittest.TestCase):
+
+    def test_restricted_parse_keeps_extractor_output(self):
+        full_tree = greb.parse_page(NOISY_PAGE_HTML)
+        for sections in (['meaning'], ['meaning', 'sentence'], ['synonym', 'antonym'],
+                         ['meaning', 'sentence', 'synonym', 'antonym']):
+            tree = greb.parse_page(NOISY_PAGE_HTML, sections)
+            for section in sections:
+                self.assertEqual(greb.EXTRACTORS[section](tree, 'awesome'),
+                                 greb.EXTRACTORS[section](full_tree, 'awesome'))
+
+    def test_restricted_parse_skips_other_elements(self):
+        tree = greb.parse_page(NOISY_PAGE_HTML, ['synonym'])
+        self.assertIsNone(tree.find('nav'))
+        self.assertIsNone(tree.find('div', {'class': 'card-primary-content'}))
+        self.assertIsNotNone(tree.find('div', {'class': 'definition-block'}))
+
+    def test_make_strainer_needs_known_sections(self):
+        self.assertIsNone(greb.make_strainer([]))
+        self.assertIsNone(greb.make_strainer(['meaning', 'unknown']))
+        self.assertIsNotNone(greb.make_strainer(['meaning']))
+
+
+class TestParsers(unittest.TestCase):
+
+    def setUp(self):
+        greb.set_parser(None)
+
+    def tearDown(self):
+        greb.set_parser(None)
+
+    def extract(self, parser, html, sections, parse_sections=None):
+        greb.set_parser(parser)
+        tree = greb.parse_page(html, parse_sections)
+        return [greb.EXTRACTORS[section](tree, 'awesome') for section in sections]
+
+    def test_parsers_keep_extractor_output(self):
+        from bs4.builder import builder_registry
+        parsers = [parser for parser in greb.PARSERS if builder_registry.lookup(parser)]
+        word_sections = ['meaning', 'sentence', 'synonym', 'antonym']
+        cases = [(html, sections, parse_sections) for html in (data.WORD_PAGE_HTML, NOISY_PAGE_HTML)
+                 for sections in (['meaning'], word_sections) for parse_sections in (None, sections)]
+        cases.append((data.HOME_PAGE_HTML, ['trending words', 'word of the day'], None))
+        for html, sections, parse_sections in cases:
+            expected = self.extract('html.parser', html, sections)
+            for parser in parsers:
+                self.assertEqual(self.extract(parser, html, sections, parse_sections), expected)
+        for parser in parsers:
+            greb.set_parser(parser)
+            self.assertEqual(greb.find_suggestions(greb.parse_page(NOT_FOUND_PAGE_HTML))['suggestion'],
+                             ['awesome, aweless'])
+
+    def test_configured_parser_wins(self):
+        with mock.patch('greb.opts.HTML_PARSER', 'html.parser'):
+            self.assertEqual(greb.get_parser(), 'html.parser')
+
+
+if __name__ == '__main__':
+    unittest.main()
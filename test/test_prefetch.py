@@ -0,0 +1,74 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from bs4 import BeautifulSoup
+
+from greb import meaning as greb
+from greb import prefetch
+from greb.cache import LookupCache
+from greb.result import Result
+
+from . import data
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = LookupCache(path=os.path.join(self.directory, 'cache.sqlite3'))
+        self.tree = BeautifulSoup(data.WORD_PAGE_HTML, 'html.parser')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_related_words(self):
+        result = Result('awesome', 200, sections={'synonym': ['great, grand, Awesome '], 'antonym': ['awful, grand']})
+        self.assertEqual(prefetch.related_words(result), ['great', 'grand', 'awful'])
+        self.assertEqual(prefetch.related_words(result, limit=1), ['great'])
+
+    def test_rate_limiter_spaces_out_requests_to_a_host(self):
+        limiter = prefetch.RateLimiter(rate=20)
+        start = time.time()
+        for host in ('a', 'a', 'a', 'b'):
+            limiter.wait(host)
+        self.assertGreaterEqual(time.time() - start, 0.09)
+        self.assertLess(time.time() - start, 1)
+
+    def test_prefetcher_fills_the_cache(self):
+        self.cache.put(greb.word_url('grand'), 200, {'meaning': [': large']})
+        prefetcher = prefetch.Prefetcher(self.cache, rate=100)
+        with mock.patch.object(greb, 'make_parse_tree', return_value=(self.tree, 200)) as make_parse_tree:
+            prefetcher.prefetch(['great', 'grand'], ['meaning'])
+            prefetcher.close()
+        self.assertEqual(make_parse_tree.call_count, 1)
+        self.assertEqual(self.cache.get(greb.word_url('great'))[1]['meaning'], [': extremely good'])
+
+    def test_greb_prefetches_after_rendering(self):
+        options = {'word': 'awesome', 'meaning': True, 'synonym': True, 'prefetch': True,
+                   'cache_path': self.cache.path, 'file_path': os.path.join(self.directory, 'history.sqlite3')}
+        sys.stdout = StringIO()
+        try:
+            with mock.patch.object(greb, 'make_parse_tree', return_value=(self.tree, 200)), \
+                    mock.patch.object(prefetch, 'prefetch_in_background') as prefetch_in_background:
+                greb.greb(**options)
+        finally:
+            sys.stdout = sys.__stdout__
+        words, sections, cache = prefetch_in_background.call_args[0]
+        self.assertEqual(words, ['great', 'grand'])
+        self.assertEqual(sections, ['meaning', 'synonym'])
+
+
+if __name__ == '__main__':
+    unittest.main()
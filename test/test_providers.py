@@ -0,0 +1,158 @@
+from __future__ import unicode_literals, absolute_import
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from collections import OrderedDict
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb import providers
+from greb.cache import LookupCache
+
+FREE_DICTIONARY_JSON = json.dumps([{
+    'word': 'awesome',
+    'meanings': [{
+        'partOfSpeech': 'adjective',
+        'definitions': [
+            {'definition': 'Causing awe.', 'example': 'an awesome sight', 'synonyms': ['awe-inspiring']},
+            {'definition': 'Excellent.', 'synonyms': ['great'], 'antonyms': []},
+        ],
+        'synonyms': ['great', 'grand'],
+        'antonyms': ['awful'],
+    }],
+}])
+
+
+class FakeProvider(providers.Provider):
+
+    def __init__(self, name, answer, delay=0, cache=None):
+        self.name = name
+        self.answer = answer
+        self.delay = delay
+        self.cache = cache
+        self.asked = threading.Event()
+        self.answered = threading.Event()
+
+    def lookup(self, word, sections):
+        self.asked.set()
+        time.sleep(self.delay)
+        if self.cache is not None and self.answer[0] == 200:
+            providers.store(self.cache, word, self.answer[1])
+        self.answered.set()
+        return self.answer
+
+
+class TestProviders(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = LookupCache(path=os.path.join(self.directory, 'cache.sqlite3'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_first_complete_answer_in_order_wins(self):
+        down = FakeProvider('down', (False, OrderedDict()))
+        missing = FakeProvider('missing', (404, OrderedDict()))
+        found = FakeProvider('found', (200, OrderedDict([('meaning', [': good'])])))
+        unused = FakeProvider('unused', (200, OrderedDict([('meaning', [': bad'])])))
+        answer = providers.lookup('good', ['meaning'], [down, missing, found, unused])
+        self.assertEqual(answer, (200, OrderedDict([('meaning', [': good'])])))
+        self.assertFalse(unused.asked.is_set())
+
+    def test_not_found_beats_no_connection(self):
+        answer = providers.lookup('goood', ['meaning'], [FakeProvider('missing', (404, OrderedDict())),
+                                                         FakeProvider('down', (False, OrderedDict()))])
+        self.assertEqual(answer[0], 404)
+
+    def test_parallel_lookup_does_not_wait_for_a_slow_provider(self):
+        slow = FakeProvider('slow', (200, OrderedDict([('meaning', [': slow'])])), delay=1)
+        fast = FakeProvider('fast', (200, OrderedDict([('meaning', [': fast'])])), delay=0.05)
+        start = time.time()
+        answer = providers.lookup('good', ['meaning'], [slow, fast], parallel=True)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(answer[1]['meaning'], [': fast'])
+        self.assertTrue(slow.asked.is_set())
+
+    def test_only_the_winner_of_a_parallel_lookup_is_cached(self):
+        slow = FakeProvider('slow', (200, OrderedDict([('meaning', [': slow'])])), delay=0.2, cache=self.cache)
+        fast = FakeProvider('fast', (200, OrderedDict([('meaning', [': fast'])])), cache=self.cache)
+        providers.lookup('good', ['meaning'], [slow, fast], parallel=True, cache=self.cache)
+        self.assertTrue(slow.answered.wait(5))
+        self.assertEqual(self.cache.get(greb.word_url('good'))[1], OrderedDict([('meaning', [': fast'])]))
+
+    def test_cache_provider_answers_before_remote_ones(self):
+        self.cache.put(greb.word_url('awesome'), 200, {'meaning': [': extremely good']})
+        remote = FakeProvider('remote', (False, OrderedDict()))
+        answer = providers.lookup('awesome', ['meaning'], [providers.CacheProvider(self.cache), remote])
+        self.assertEqual(answer, (200, OrderedDict([('meaning', [': extremely good'])])))
+        self.assertFalse(remote.asked.is_set())
+
+    def test_providers_are_skipped_for_sections_they_lack(self):
+        free_dictionary = providers.FreeDictionary()
+        with mock.patch.object(greb, 'read_page') as read_page:
+            answer = providers.lookup(None, ['trending words'], [free_dictionary])
+        self.assertEqual(answer, (False, OrderedDict()))
+        self.assertFalse(read_page.called)
+
+    def test_open_providers(self):
+        opened = providers.open_providers(['free-dictionary', 'merriam-webster'], cache=self.cache)
+        self.assertEqual([provider.name for provider in opened],
+                         ['cache', 'daily', 'free-dictionary', 'merriam-webster'])
+        self.assertRaises(ValueError, providers.open_providers, ['nowhere'])
+
+    def test_free_dictionary(self):
+        response = mock.Mock(text=FREE_DICTIONARY_JSON, status_code=200)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 200)):
+            status_code, found = providers.FreeDictionary(cache=self.cache).lookup(
+                'awesome', ['meaning', 'sentence', 'synonym', 'antonym'])
+        self.assertEqual(status_code, 200)
+        self.assertEqual(found, OrderedDict([
+            ('meaning', [': Causing awe.', ': Excellent.']),
+            ('sentence', ['an awesome sight']),
+            ('synonym', ['great, grand, awe-inspiring']),
+            ('antonym', ['awful']),
+        ]))
+        self.assertEqual(self.cache.get(greb.word_url('awesome'))[1], found)
+
+    def test_free_dictionary_not_found(self):
+        response = mock.Mock(text='{"title": "No Definitions Found"}', status_code=404)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 404)):
+            answer = providers.FreeDictionary(cache=self.cache).lookup('qwxzv', ['meaning'])
+        self.assertEqual(answer, (404, OrderedDict([('info_msg', greb.NOT_FOUND_INFO_MSG)])))
+
+    def test_free_dictionary_answer_that_is_not_json(self):
+        response = mock.Mock(text='<html><body>sign in to the wifi</body></html>', status_code=200)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 200)):
+            answer = providers.FreeDictionary(cache=self.cache).lookup('awesome', ['meaning'])
+        self.assertEqual(answer, (False, OrderedDict()))
+        self.assertIsNone(self.cache.get(greb.word_url('awesome')))
+
+    def test_find_result_with_providers(self):
+        response = mock.Mock(text=FREE_DICTIONARY_JSON, status_code=200)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 200)):
+            result = greb.find_result(word='awesome', meaning=True, providers=['free-dictionary'],
+                                      cache_path=self.cache.path,
+                                      file_path=os.path.join(self.directory, 'history.sqlite3'))
+        self.assertEqual(result.meaning, [': Causing awe.', ': Excellent.'])
+
+    def test_unknown_provider_is_a_usage_error(self):
+        with mock.patch('sys.argv', ['greb', '--providers=bogus', 'awesome']), \
+                mock.patch.object(greb, 'print_error_messages') as printed, \
+                mock.patch.object(greb, 'greb') as lookup:
+            with self.assertRaises(SystemExit) as exit:
+                greb.main()
+        self.assertEqual(exit.exception.code, 2)
+        self.assertIn('unknown provider bogus', printed.call_args[0][0])
+        self.assertFalse(lookup.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
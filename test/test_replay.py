@@ -0,0 +1,64 @@
+from __future__ import unicode_literals, absolute_import
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb.replay import PageStore, ReplayResponse, store_from_environment
+
+from . import data
+
+
+class TestPageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.previous_store = greb.get_page_store()
+
+    def tearDown(self):
+        greb.set_page_store(self.previous_store)
+        shutil.rmtree(self.directory)
+
+    def fetch(self, url, timeout=5):
+        return (ReplayResponse(url, data.WORD_PAGE_HTML, 200), 200)
+
+    def test_record_then_replay(self):
+        PageStore(self.directory, mode='record').read_page(data.CACHE['url'], self.fetch)
+        fetch = mock.Mock()
+        response, status_code = PageStore(self.directory, mode='replay').read_page(
+            data.CACHE['url'].replace('http://', 'https://'), fetch)
+        self.assertEqual(fetch.call_count, 0)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(response.text, data.WORD_PAGE_HTML)
+
+    def test_replay_without_snapshot(self):
+        fetch = mock.Mock()
+        self.assertEqual(PageStore(self.directory, mode='replay').read_page(data.CACHE['url'], fetch), (None, False))
+        self.assertEqual(fetch.call_count, 0)
+
+    def test_auto_fetches_missing_pages_without_saving(self):
+        store = PageStore(self.directory, mode='auto')
+        self.assertEqual(store.read_page(data.CACHE['url'], self.fetch)[1], 200)
+        self.assertIsNone(store.load(data.CACHE['url']))
+
+    def test_parse_tree_from_replayed_page(self):
+        PageStore(self.directory, mode='record').save(data.CACHE['url'], data.WORD_PAGE_HTML, 200)
+        greb.set_page_store(PageStore(self.directory, mode='replay'))
+        with mock.patch.object(greb, 'fetch_page') as fetch_page:
+            tree, status_code = greb.make_parse_tree(data.CACHE['url'])
+        self.assertEqual(fetch_page.call_count, 0)
+        self.assertEqual(greb.find_meaning(tree), [': extremely good'])
+
+    def test_store_from_environment(self):
+        self.assertIsNone(store_from_environment({}))
+        store = store_from_environment({'GREB_REPLAY_DIR': self.directory, 'GREB_REPLAY_MODE': 'replay'})
+        self.assertEqual((store.directory, store.mode), (self.directory, 'replay'))
+        self.assertRaises(ValueError, PageStore, self.directory, 'sometimes')
+
+
+if __name__ == '__main__':
+    unittest.main()
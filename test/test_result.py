@@ -0,0 +1,62 @@
+from __future__ import unicode_literals, absolute_import
+import json
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+from bs4 import BeautifulSoup
+
+from greb import meaning as greb
+from greb.result import Result, TrendingWord, WordOfTheDay
+
+from . import data
+
+
+class TestResult(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.options = {'cache_path': os.path.join(self.directory, 'cache.sqlite3'),
+                        'file_path': os.path.join(self.directory, 'history.sqlite3')}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_define_returns_plain_text(self):
+        tree = BeautifulSoup(data.WORD_PAGE_HTML, 'html.parser')
+        with mock.patch.object(greb, 'make_parse_tree', return_value=(tree, 200)):
+            result = greb.define('awesome', sentence=True, synonym=True, **self.options)
+        self.assertTrue(result.found)
+        self.assertEqual(result.meaning, [': extremely good'])
+        self.assertEqual(result.sentence, ['an awesome sight'])
+        self.assertIsNone(result.antonym)
+        self.assertEqual(list(result.sections()), ['meaning', 'sentence', 'synonym'])
+        self.assertNotIn('\x1b', json.dumps(result.to_dict()))
+
+    def test_records_survive_json(self):
+        result = Result(status_code=200, sections={'trending words': [TrendingWord('grok', 'understand')],
+                                                   'word of the day': [WordOfTheDay('darn', 'to mend')]})
+        sections = json.loads(json.dumps(result.sections()))
+        self.assertEqual(Result(status_code=200, sections=sections), result)
+        self.assertEqual(result.to_dict()['word of the day'], [{'word': 'darn', 'meaning': 'to mend'}])
+
+    def test_render_result(self):
+        result = Result('awesome', 200, sections={'meaning': [': extremely good'],
+                                                  'sentence': ['an awesome sight'],
+                                                  'trending words': [TrendingWord('grok', 'understand')]})
+        rendered = greb.render_result(result)
+        self.assertEqual(list(rendered), ['word', 'meaning', 'sentence', 'trending words'])
+        self.assertEqual(rendered['sentence'], ['\x1b[36m1. \x1b[39man \x1b[36mawesome\x1b[39m sight'])
+        self.assertEqual(rendered['trending words'], ['\x1b[31m1 grok\x1b[39m --> \x1b[33munderstand\x1b[39m'])
+
+    def test_render_missing_section(self):
+        rendered = greb.render_result(Result('awesome', 200, sections={'meaning': None}))
+        self.assertEqual(rendered['meaning'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+from __future__ import unicode_literals, absolute_import
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb import server
+from greb.cache import LookupCache, MemoryCache
+from greb.server import LookupService
+
+from . import data
+
+
+class FakeResponse(object):
+
+    def __init__(self, text):
+        self.text = text
+
+
+class TestLookupService(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.service = LookupService(MemoryCache(backend=LookupCache(os.path.join(self.directory, 'cache.sqlite3'))))
+        patcher = mock.patch.object(greb, 'get_page_store', return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get(self, path, query=''):
+        responses = []
+
+        def start_response(status, headers):
+            responses.append((status, dict(headers)))
+        body = b''.join(self.service({'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query},
+                                     start_response))
+        status, headers = responses[0]
+        self.assertEqual(headers['Content-Type'], 'application/json')
+        return (status, json.loads(body.decode('utf-8')))
+
+    def test_define_is_cached_and_counted(self):
+        with mock.patch.object(server, 'fetch', return_value=(FakeResponse(data.WORD_PAGE_HTML), 200)) as fetch, \
+                mock.patch.object(greb, 'write_meaning_to_file') as write_meaning_to_file:
+            status, body = self.get('/define/Awesome', 'synonym=1')
+            self.assertEqual(self.get('/define/awesome', 'synonym=1'), (status, body))
+        self.assertEqual(fetch.call_count, 1)
+        self.assertFalse(write_meaning_to_file.called)
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(body['meaning'], [': extremely good'])
+        self.assertEqual(body['synonym'], ['great, grand '])
+        status, stats = self.get('/stats')
+        self.assertEqual((stats['cache_hits'], stats['cache_misses'], stats['hit_rate']), (1, 1, 0.5))
+        self.assertEqual(stats['upstream_latency_ms']['samples'], 1)
+
+    def test_upstream_failure(self):
+        with mock.patch.object(server, 'fetch', return_value=(None, False)):
+            status, body = self.get('/trending')
+        self.assertEqual(status, '502 Bad Gateway')
+        self.assertEqual(body['info'], greb.NO_CONNECTION_INFO_MSG)
+        self.assertEqual(self.get('/stats')[1]['upstream_errors'], 1)
+
+    def test_trending_is_revalidated(self):
+        headers = {'ETag': '"home-1"'}
+        with mock.patch.object(server, 'fetch', return_value=(mock.Mock(text=data.HOME_PAGE_HTML, headers=headers),
+                                                              200)):
+            status, body = self.get('/trending')
+        later = time.time() + greb.opts.HOME_PAGE_TTL + 60
+        with mock.patch('greb.cache.time.time', return_value=later), \
+                mock.patch.object(server, 'fetch', return_value=(mock.Mock(text='', headers=headers), 304)) as fetch:
+            self.assertEqual(self.get('/trending'), (status, body))
+        self.assertEqual(fetch.call_args[1]['headers'], {'If-None-Match': '"home-1"'})
+        self.assertEqual(self.get('/stats')[1]['upstream_latency_ms']['samples'], 2)
+
+    def test_words_that_would_change_the_url_are_rejected(self):
+        with mock.patch.object(server, 'fetch') as fetch:
+            for path in ('/define/a%3Fb', '/define/a%23b', '/define/ice%20cream', '/define/a%2Fb',
+                         '/define/..', '/define/.', '/define/%2E%2E'):
+                self.assertEqual(self.get(path), ('400 Bad Request', {'error': 'not a word'}))
+        self.assertFalse(fetch.called)
+
+    def test_unknown_endpoint(self):
+        self.assertEqual(self.get('/define/')[0], '404 Not Found')
+        self.assertEqual(self.get('/nothing')[0], '404 Not Found')
+
+
+if __name__ == '__main__':
+    unittest.main()
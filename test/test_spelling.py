@@ -0,0 +1,90 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb.history import History
+from greb.spelling import SpellingIndex, deletes, edit_distance
+
+from . import data
+
+
+class TestSpellingIndex(unittest.TestCase):
+
+    def test_edit_distance(self):
+        self.assertEqual(edit_distance('awesome', 'awesome'), 0)
+        self.assertEqual(edit_distance('awsome', 'awesome'), 1)
+        self.assertEqual(edit_distance('aewsome', 'awesome'), 1)
+        self.assertEqual(edit_distance('kitten', 'sitting'), 3)
+
+    def test_deletes(self):
+        self.assertEqual(deletes('abc'), set(['abc', 'bc', 'ac', 'ab']))
+
+    def test_suggest_ranks_closest_first(self):
+        index = SpellingIndex([lambda: ['awesome', 'awesomer', 'grok', 'awful']])
+        self.assertEqual(index.suggest('awesomr'), ['awesome', 'awesomer'])
+        self.assertEqual(index.suggest('zzz'), [])
+
+    def test_lexicons_are_probed_for_single_edits(self):
+        index = SpellingIndex(lexicons=[set(['awesome', 'grok'])])
+        self.assertIn('grok', index)
+        self.assertEqual(index.suggest('aewsome'), ['awesome'])
+
+    def test_sources_are_read_on_first_use(self):
+        source = mock.Mock(return_value=['grok'])
+        index = SpellingIndex([source])
+        index.add('awesome')
+        self.assertEqual(source.call_count, 0)
+        self.assertEqual(index.suggest('grokk'), ['grok'])
+        self.assertIn('awesome', index)
+        self.assertEqual(source.call_count, 1)
+
+
+class TestLocalSuggestions(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, 'history.sqlite3')
+        history = History(self.file_path)
+        for entry in data.HISTORY:
+            history.record(entry)
+        self.options = {'meaning': True, 'file_path': self.file_path,
+                        'cache_path': os.path.join(self.directory, 'cache.sqlite3')}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_not_found_page_is_not_parsed_when_history_knows_a_correction(self):
+        response = mock.Mock(text='<html><body>spelling suggestion below</body></html>', status_code=404)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 404)), \
+                mock.patch.object(greb, 'parse_response_text') as parse_response_text:
+            result = greb.find_result(word='awsome', **self.options)
+        self.assertEqual(parse_response_text.call_count, 0)
+        self.assertEqual(result.status_code, 404)
+        self.assertEqual(result.suggestion, ['awesome'])
+        self.assertEqual(result.info, greb.SUGGESTION_INFO_MSG)
+
+    def test_known_words_are_only_read_for_a_word_that_was_not_found(self):
+        source = mock.Mock(return_value=['awesome'])
+        response = mock.Mock(text=data.WORD_PAGE_HTML, status_code=200)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 200)):
+            greb.find_result(word='awesome', spelling=SpellingIndex([source]), **self.options)
+        self.assertEqual(source.call_count, 0)
+
+    def test_not_found_page_is_scraped_without_a_local_correction(self):
+        response = mock.Mock(text='<html><body>nothing to see</body></html>', status_code=404)
+        with mock.patch.object(greb, 'read_page', return_value=(response, 404)):
+            result = greb.find_result(word='qwxzv', **self.options)
+        self.assertEqual(result.status_code, 404)
+        self.assertIsNone(result.suggestion)
+        self.assertEqual(result.info, greb.NOT_FOUND_INFO_MSG)
+
+
+if __name__ == '__main__':
+    unittest.main()
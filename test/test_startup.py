@@ -0,0 +1,40 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from greb import meaning as greb
+
+from . import data
+
+HISTORY_PATH_SCRIPT = '''
+import sys
+from greb import meaning
+meaning.print_result(meaning.find_meaning_from_history(file_path=sys.argv[1]))
+print(sorted(name for name in ('requests', 'bs4', 'multiprocessing') if name in sys.modules))
+'''
+
+
+class TestStartup(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.history_path = os.path.join(self.directory, 'history.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_history_path_skips_network_imports(self):
+        greb.write_meaning_to_file(data.HISTORY[0], file_path=self.history_path)
+        output = subprocess.check_output([sys.executable, '-c', HISTORY_PATH_SCRIPT, self.history_path],
+                                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        lines = output.decode('utf-8').strip().splitlines()
+        self.assertIn('AWESOME', output.decode('utf-8'))
+        self.assertEqual(lines[-1], '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
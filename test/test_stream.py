@@ -0,0 +1,109 @@
+from __future__ import unicode_literals, absolute_import
+import unittest
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import fetch
+from greb import meaning as greb
+from greb.stream import PageStream, SectionScanner
+
+from . import data
+
+# the word page, and as much markup again after the containers greb reads
+PAGE = data.WORD_PAGE_HTML.replace('</body>', '<div class="footer">' + 'x' * 4096 + '</div></body>')
+
+# a page of two entries, the examples of the first between their definitions
+MULTI_ENTRY_PAGE = PAGE.replace('<div class="card-box', '<div class="card-primary-content"><ul><li>'
+                                '<p class="definition-inner-item">: inspiring awe</p></li></ul></div>'
+                                '<div class="card-primary-content def-text"><ul><li>awesome power</li></ul></div>'
+                                '<div class="card-box', 1)
+
+
+def chunks_of(text, size=64):
+    text = text.encode('utf-8')
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStream(unittest.TestCase):
+
+    def test_scanner_completes_sections_as_their_containers_close(self):
+        scanner = SectionScanner(['meaning', 'sentence', 'synonym'])
+        head, tail = PAGE.split('<div class="card-box')
+        scanner.feed(head)
+        self.assertEqual(scanner.complete(), set(['sentence']))
+        scanner.feed('<div class="card-box' + tail)
+        self.assertEqual(scanner.complete(), set(['meaning', 'sentence', 'synonym']))
+
+    def test_download_stops_once_sections_are_complete(self):
+        read = []
+
+        def iter_content(size):
+            for chunk in chunks_of(PAGE):
+                read.append(chunk)
+                yield chunk
+
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(status_code=200, encoding='utf-8', iter_content=iter_content)
+        fetch.get(session, data.CACHE['url'], 1, 5, on_chunk=PageStream(['meaning', 'synonym']))
+        downloaded = b''.join(read)
+        self.assertLess(len(downloaded), len(PAGE) // 2)
+        tree = greb.parse_page(downloaded.decode('utf-8'), ['meaning', 'synonym'])
+        self.assertEqual(greb.find_meaning(tree), [': extremely good'])
+        self.assertEqual(greb.find_synonyms(tree), ['great, grand '])
+
+    def test_meaning_of_every_entry_is_read(self):
+        read = []
+
+        def iter_content(size):
+            for chunk in chunks_of(MULTI_ENTRY_PAGE):
+                read.append(chunk)
+                yield chunk
+
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(status_code=200, encoding='utf-8', iter_content=iter_content)
+        fetch.get(session, data.CACHE['url'], 1, 5, on_chunk=PageStream(['meaning', 'sentence']))
+        downloaded = b''.join(read)
+        self.assertLess(len(downloaded), len(MULTI_ENTRY_PAGE) // 2)
+        tree = greb.parse_page(downloaded.decode('utf-8'), ['meaning', 'sentence'])
+        self.assertEqual(greb.find_meaning(tree), [': extremely good', ': inspiring awe'])
+        self.assertEqual(greb.find_sentences(tree, 'awesome'), ['an awesome sight'])
+
+    def test_hedged_lookup_downloads_the_whole_page(self):
+        events = []
+        stream = PageStream(['meaning'], 'awesome', lambda section, value: events.append(section))
+        response = mock.Mock(status_code=200, text=PAGE)
+        with mock.patch.object(greb.opts, 'FETCH_HEDGE_AFTER', 0.5), \
+                mock.patch.object(greb, 'get_page_store', return_value=None), \
+                mock.patch.object(fetch, 'hedged_get', return_value=response) as hedged_get:
+            tree, status_code = greb.make_parse_tree(data.CACHE['url'], ['meaning'], stream=stream)
+        self.assertEqual(hedged_get.call_args[0][5], 0.5)
+        self.assertEqual(greb.find_meaning(tree), [': extremely good'])
+        self.assertEqual(events, [])
+
+    def test_sections_are_reported_before_the_rest_arrives(self):
+        events = []
+        stream = PageStream(['sentence', 'synonym'], 'awesome', lambda section, value: events.append((section, value)))
+        response = mock.Mock(status_code=200, encoding='utf-8')
+        for chunk in chunks_of(PAGE):
+            events.append('chunk')
+            if stream(response, chunk):
+                break
+        reported = events.index(('sentence', ['an awesome sight']))
+        self.assertIn('chunk', events[reported:])
+        self.assertNotIn('synonym', [each[0] for each in events if each != 'chunk'])
+
+    def test_printer_prints_the_rest_of_the_result(self):
+        printer = greb.SectionPrinter('awesome', ['meaning', 'synonym'])
+        with mock.patch.object(greb, 'print_result') as print_result:
+            printer('meaning', [': extremely good'])
+            printer.finish(greb.Result('awesome', 200, sections={'meaning': [': extremely good'],
+                                                                 'synonym': ['great, grand ']}))
+        first, rest = [call[0][0] for call in print_result.call_args_list]
+        self.assertEqual(list(first), ['word', 'meaning'])
+        self.assertEqual(list(rest), ['synonym'])
+
+
+if __name__ == '__main__':
+    unittest.main()
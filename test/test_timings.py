@@ -0,0 +1,69 @@
+from __future__ import unicode_literals, absolute_import
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+from greb import meaning as greb
+from greb import timings
+
+from . import data
+
+
+class TestTimings(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_lookup_phases(self):
+        session = mock.Mock()
+        session.get.return_value = mock.Mock(text=data.WORD_PAGE_HTML, status_code=200, encoding='utf-8')
+        session.get.return_value.iter_content.return_value = [data.WORD_PAGE_HTML.encode('utf-8')]
+        options = {'word': 'awesome', 'meaning': True, 'synonym': True,
+                   'cache_path': os.path.join(self.directory, 'cache.sqlite3'),
+                   'file_path': os.path.join(self.directory, 'history.sqlite3')}
+        captured_output = StringIO()
+        sys.stdout = captured_output
+        with mock.patch.object(greb, 'get_page_store', return_value=None), \
+                mock.patch.object(greb, 'get_session', return_value=session), \
+                timings.Timings() as collected:
+            greb.greb(**options)
+        sys.stdout = sys.__stdout__
+        self.assertEqual(list(collected.totals()), ['cache read', 'connect', 'download', 'parse',
+                                                    'extract meaning', 'extract synonym', 'cache write',
+                                                    'history write', 'render'])
+
+    def test_listener(self):
+        spans = []
+        timings.add_listener(lambda name, seconds: spans.append(name))
+        try:
+            with timings.span('parse'):
+                pass
+        finally:
+            timings.remove_listener(timings._listeners[-1])
+        with timings.span('render'):
+            pass
+        self.assertEqual(spans, ['parse'])
+
+    def test_totals(self):
+        collected = timings.Timings()
+        collected('parse', 0.5)
+        collected('render', 0.25)
+        collected('parse', 0.5)
+        self.assertEqual(list(collected.totals().items()), [('parse', 1.0), ('render', 0.25)])
+
+
+if __name__ == '__main__':
+    unittest.main()